@@ -0,0 +1,98 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+
+# Characters that end the literal head of a pattern
+_REGEX_SPECIAL = set(".^$*+?{}[]|()\\")
+_OPTIONAL_QUANTIFIERS = set("*?{")
+
+# FORM - A / B / C headings identify IFR, CR and CFR claims
+FORM_SUBTYPES = {"a": "IFR", "b": "CR", "c": "CFR"}
+
+
+def literal_prefix(pattern: str) -> str:
+    """
+    Leading literal text every match of `pattern` must start with
+    Used to jump straight to candidate positions instead of running the regex everywhere
+    """
+    if pattern.startswith("(") and not pattern.startswith("(?"):
+        pattern = pattern[1:]  # A capture group opening consumes no text
+
+    prefix = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            escaped = pattern[i + 1:i + 2]
+            if not escaped or escaped.isalnum():
+                break  # \s, \d, \b ... are classes/assertions, not literals
+            literal, i = escaped, i + 2
+        elif char in _REGEX_SPECIAL:
+            break
+        else:
+            literal, i = char, i + 1
+
+        if i < len(pattern) and pattern[i] in _OPTIONAL_QUANTIFIERS:
+            break  # Quantified char may be absent
+        prefix.append(literal)
+        if i < len(pattern) and pattern[i] == "+":
+            break
+    return "".join(prefix)
+
+
+class FieldExtractor:
+    """
+    Compiled field extraction engine for one FRA form type
+    Patterns are compiled once; every field regex is only tried from the first
+    occurrence of its label, found in a single case-folded copy of the text
+    """
+
+    SUBTYPE_PATTERN = re.compile(r"form\s*-\s*([abc])")
+
+    def __init__(self, field_patterns: Dict[str, str], detect_subtype: bool = False):
+        self.detect_subtype = detect_subtype
+        self.fields: List[Tuple[str, "re.Pattern", str]] = [
+            (field, re.compile(pattern, re.IGNORECASE), literal_prefix(pattern).casefold())
+            for field, pattern in field_patterns.items()
+        ]
+
+    def extract(self, text: str) -> Tuple[Dict[str, str], Optional[str]]:
+        """Return (fields, form subtype) for OCR text"""
+        folded = text.casefold()
+        # Case folding can change length (e.g. "ß" -> "ss") and leaves dotless "ı",
+        # which IGNORECASE matches to "i" - offsets are unusable in either case
+        aligned = len(folded) == len(text) and "ı" not in folded
+
+        extracted = {}
+        for field, regex, label in self.fields:
+            start = 0
+            if aligned and label:
+                start = folded.find(label)
+                if start < 0:
+                    extracted[field] = ""
+                    continue
+            match = regex.search(text, start)
+            extracted[field] = match.group(1).strip() if match else ""
+
+        subtype = self._form_subtype(folded) if self.detect_subtype else None
+        return extracted, subtype
+
+    def form_subtype(self, text: str) -> Optional[str]:
+        """Detect IFR, CR, or CFR form types"""
+        return self._form_subtype(text.casefold())
+
+    def _form_subtype(self, folded: str) -> Optional[str]:
+        """FORM - A wins over B, B over C, wherever they appear"""
+        start = folded.find("form")
+        if start < 0:
+            return None
+        seen = set()
+        for match in self.SUBTYPE_PATTERN.finditer(folded, start):
+            letter = match.group(1)
+            if letter == "a":
+                return FORM_SUBTYPES["a"]
+            seen.add(letter)
+        for letter in ("b", "c"):
+            if letter in seen:
+                return FORM_SUBTYPES[letter]
+        return None
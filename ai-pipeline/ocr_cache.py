@@ -0,0 +1,100 @@
+import os
+import json
+import time
+import hashlib
+import tempfile
+from typing import Dict, Any, Optional
+
+
+class OCRResultCache:
+    """
+    Content-addressed disk cache for LLMWhisperer extraction text
+    Keyed by document bytes + OCR settings, evicted by age and total size
+    """
+
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, cache_dir: str, max_bytes: int = 512 * 1024 * 1024, max_age_seconds: int = 30 * 86400):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def document_key(self, file_path: str, params: Dict[str, Any]) -> str:
+        """SHA-256 of the document bytes and the OCR parameters that shaped the text"""
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as document:
+            for chunk in iter(lambda: document.read(self.CHUNK_SIZE), b""):
+                digest.update(chunk)
+        digest.update(json.dumps(params, sort_keys=True).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry, or None on miss/expiry"""
+        path = self._entry_path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age_seconds:
+                os.unlink(path)
+                return None
+            with open(path, "r", encoding="utf-8") as entry_file:
+                entry = json.load(entry_file)
+            # Bump access time so size eviction drops least recently used entries first
+            os.utime(path, (time.time(), os.path.getmtime(path)))
+            return entry
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, result_text: str, timestamp: Optional[str] = None):
+        """Store extraction text atomically, then enforce the cache limits"""
+        path = self._entry_path(key)
+        entry = {
+            "result_text": result_text,
+            "timestamp": timestamp,
+            "cached_at": time.time()
+        }
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=os.path.dirname(path), delete=False) as tmp:
+                json.dump(entry, tmp)
+            os.replace(tmp.name, path)
+            self.evict()
+        except OSError as e:
+            print(f"⚠ OCR cache write failed: {str(e)}")
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones until under max_bytes"""
+        now = time.time()
+        entries = []
+        total_bytes = 0
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                if now - stat.st_mtime > self.max_age_seconds:
+                    self._remove(entry.path)
+                    continue
+                entries.append((stat.st_atime, stat.st_size, entry.path))
+                total_bytes += stat.st_size
+
+        if total_bytes <= self.max_bytes:
+            return
+        for _, size, path in sorted(entries):
+            self._remove(path)
+            total_bytes -= size
+            if total_bytes <= self.max_bytes:
+                break
+
+    def _remove(self, path: str):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
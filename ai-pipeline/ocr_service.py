@@ -2,10 +2,14 @@ import re
 import requests
 import json
 import os
+import asyncio
 import tempfile
-from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Tuple
 from unstract.llmwhisperer import LLMWhispererClientV2
 from unstract.llmwhisperer.client_v2 import LLMWhispererClientException
+from ocr_cache import OCRResultCache
+from field_extractor import FieldExtractor
 
 
 class FRAOCRService:
@@ -15,72 +19,79 @@ class FRAOCRService:
     Focus: Odisha state pilot implementation
     """
     
-    def __init__(self, api_key: str = None):
+    OCR_MODE = "form"
+    OCR_OUTPUT_MODE = "layout_preserving"
+    
+    # Enhanced field patterns for FRA forms
+    NEW_CLAIM_FIELDS = {
+        "FullName": r"Name of the claimant \(s\):\s*([^\n]+)",
+        "Spouse": r"Name of the spouse\s*:\s*([^\n]+)",
+        "Parent": r"Name of father/ mother\s*:?\s*([^\n]+)",
+        "Address": r"Address:\s*([^\n]+)",
+        "Village": r"Village:\s*([^\n]+)",
+        "GramPanchayat": r"Gram Panchayat:\s*([^\n]+)",
+        "Tehsil": r"Tehsil/ Taluka:\s*([^\n]+)",
+        "District": r"District:\s*([^\n]+)",
+        "State": r"State:\s*([^\n]+)",
+        "ScheduledTribe": r"Scheduled Tribe:\s*([^\n]+)",
+        "OtherForestDweller": r"Other Traditional Forest Dweller:\s*([^\n]+)",
+        "FamilyMembers": r"Name of other members in the family with age:\s*([^\n]+)",
+        "HabitationArea": r"for habitation\s*:\s*([^\n]+)",
+        "CultivationArea": r"for self-cultivation.*?:\s*([^\n]+)",
+        "DisputedLands": r"Disputed lands if any:\s*([^\n]+)",
+        "PattasLeasesGrants": r"Pattas/ leases/ grants, if any:\s*([^\n]+)",
+        "Evidence": r"Evidence in support:\s*([^\n]+)",
+        "FormHeading": r"(FORM\s*-\s*[A-Z])"
+    }
+    
+    LEGACY_CLAIM_FIELDS = {
+        "HolderNames": r"Name\(s\) of holder \(s\) of forest rights:\s*([^\n]+)",
+        "ParentNames": r"Name of the father/ mother:\s*([^\n]+)", 
+        "Address": r"Address:\s*([^\n]+)",
+        "VillageOrGramSabha": r"Village/gram sabha:\s*([^\n]+)",
+        "District": r"District:\s*([^\n]+)",
+        "State": r"State:\s*([^\n]+)",
+        "Area": r"Area\s*:\s*([^\n]+)",
+        "Boundaries": r"Description of boundaries.*:\s*([^\n]+)"
+    }
+    
+    def __init__(self, api_key: str = None, max_workers: int = 4, cache: Optional[OCRResultCache] = None):
         if api_key is None:
             api_key = os.getenv("LLMWHISPERER_API_KEY", "xjltT5sclQmrRobjlnbNDiNjcC0Q2L25jQxVpaV1u9M")
         self.client = LLMWhispererClientV2(api_key=api_key)
         self.api_key = api_key
         
-        # Enhanced field patterns for FRA forms
-        self.NEW_CLAIM_FIELDS = {
-            "FullName": r"Name of the claimant \(s\):\s*([^\n]+)",
-            "Spouse": r"Name of the spouse\s*:\s*([^\n]+)",
-            "Parent": r"Name of father/ mother\s*:?\s*([^\n]+)",
-            "Address": r"Address:\s*([^\n]+)",
-            "Village": r"Village:\s*([^\n]+)",
-            "GramPanchayat": r"Gram Panchayat:\s*([^\n]+)",
-            "Tehsil": r"Tehsil/ Taluka:\s*([^\n]+)",
-            "District": r"District:\s*([^\n]+)",
-            "State": r"State:\s*([^\n]+)",
-            "ScheduledTribe": r"Scheduled Tribe:\s*([^\n]+)",
-            "OtherForestDweller": r"Other Traditional Forest Dweller:\s*([^\n]+)",
-            "FamilyMembers": r"Name of other members in the family with age:\s*([^\n]+)",
-            "HabitationArea": r"for habitation\s*:\s*([^\n]+)",
-            "CultivationArea": r"for self-cultivation.*?:\s*([^\n]+)",
-            "DisputedLands": r"Disputed lands if any:\s*([^\n]+)",
-            "PattasLeasesGrants": r"Pattas/ leases/ grants, if any:\s*([^\n]+)",
-            "Evidence": r"Evidence in support:\s*([^\n]+)",
-            "FormHeading": r"(FORM\s*-\s*[A-Z])"
-        }
+        # LLMWhisperer client is blocking - run it on a bounded pool, never on the event loop
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fra-ocr")
+        
+        # Optional result cache - re-uploads of the same scan skip LLMWhisperer
+        self.cache = cache
         
-        self.LEGACY_CLAIM_FIELDS = {
-            "HolderNames": r"Name\(s\) of holder \(s\) of forest rights:\s*([^\n]+)",
-            "ParentNames": r"Name of the father/ mother:\s*([^\n]+)", 
-            "Address": r"Address:\s*([^\n]+)",
-            "VillageOrGramSabha": r"Village/gram sabha:\s*([^\n]+)",
-            "District": r"District:\s*([^\n]+)",
-            "State": r"State:\s*([^\n]+)",
-            "Area": r"Area\s*:\s*([^\n]+)",
-            "Boundaries": r"Description of boundaries.*:\s*([^\n]+)"
+        # Patterns are compiled once per form type
+        self.extractors = {
+            "new_claim": FieldExtractor(self.NEW_CLAIM_FIELDS, detect_subtype=True),
+            "legacy_claim": FieldExtractor(self.LEGACY_CLAIM_FIELDS)
         }
 
     def detect_form_subtype(self, result_text: str) -> Optional[str]:
         """Detect IFR, CR, or CFR form types"""
-        if re.search(r"FORM\s*-\s*A", result_text, re.IGNORECASE):
-            return "IFR"  # Individual Forest Rights
-        elif re.search(r"FORM\s*-\s*B", result_text, re.IGNORECASE):
-            return "CR"   # Community Rights
-        elif re.search(r"FORM\s*-\s*C", result_text, re.IGNORECASE):
-            return "CFR"  # Community Forest Rights
-        return None
+        return self.extractors["new_claim"].form_subtype(result_text)
 
     def extract_fields(self, result_text: str, form_type: str) -> Dict[str, str]:
         """Extract structured data from OCR text based on form type"""
-        target_fields = (
-            self.NEW_CLAIM_FIELDS if form_type == "new_claim" 
-            else self.LEGACY_CLAIM_FIELDS if form_type == "legacy_claim"
-            else {}
-        )
-        
-        if not target_fields:
-            raise ValueError(f"Unknown form_type: {form_type}")
+        return self.extract_document(result_text, form_type)[0]
 
-        extracted = {}
-        for field, pattern in target_fields.items():
-            match = re.search(pattern, result_text, re.IGNORECASE)
-            extracted[field] = match.group(1).strip() if match else ""
+    def extract_document(self, result_text: str, form_type: str) -> Tuple[Dict[str, str], Optional[str]]:
+        """Extract fields and form subtype in one pass over the OCR text"""
+        extractor = self.extractors.get(form_type)
+        if extractor is None:
+            raise ValueError(f"Unknown form_type: {form_type}")
         
-        return extracted
+        fields, subtype = extractor.extract(result_text)
+        if form_type == "legacy_claim":
+            subtype = "Granted Title"
+        return fields, subtype
 
     def map_to_atlas_claim_structure(self, extracted_fields: Dict[str, str], 
                                    form_type: str, form_subtype: Optional[str]) -> Dict[str, Any]:
@@ -123,28 +134,47 @@ class FRAOCRService:
             "form_subtype": form_subtype
         }
 
+    def _whisper(self, file_path: str) -> Dict[str, Any]:
+        """Blocking LLMWhisperer call - executed on the OCR thread pool"""
+        return self.client.whisper(
+            file_path=file_path,
+            wait_for_completion=True,
+            wait_timeout=300,
+            mode=self.OCR_MODE,
+            output_mode=self.OCR_OUTPUT_MODE
+        )
+
     async def process_fra_document(self, file_path: str, form_type: str) -> Dict[str, Any]:
         """
         Main FRA document processing for Aṭavī Atlas
         Returns atlas-ready claim data
         """
         try:
-            # Process with LLMWhisperer
-            result = self.client.whisper(
-                file_path=file_path,
-                wait_for_completion=True,
-                wait_timeout=300,
-                mode="form",
-                output_mode="layout_preserving"
-            )
+            loop = asyncio.get_running_loop()
             
-            result_text = result.get("extraction", {}).get("result_text", "")
+            # Same document + OCR settings means same text - reuse it when cached
+            cache_key = None
+            cached = None
+            if self.cache is not None:
+                cache_params = {"mode": self.OCR_MODE, "output_mode": self.OCR_OUTPUT_MODE, "form_type": form_type}
+                cache_key = await loop.run_in_executor(None, self.cache.document_key, file_path, cache_params)
+                cached = await loop.run_in_executor(None, self.cache.get, cache_key)
             
-            # Extract fields
-            fields = self.extract_fields(result_text, form_type)
+            if cached is not None:
+                result_text = cached.get("result_text", "")
+                processing_timestamp = cached.get("timestamp")
+            else:
+                # Process with LLMWhisperer off the event loop
+                result = await loop.run_in_executor(self.executor, self._whisper, file_path)
+                
+                result_text = result.get("extraction", {}).get("result_text", "")
+                processing_timestamp = result.get("extraction", {}).get("timestamp")
+                
+                if cache_key and result_text:
+                    await loop.run_in_executor(None, self.cache.put, cache_key, result_text, processing_timestamp)
             
-            # Detect form subtype
-            subtype = self.detect_form_subtype(result_text) if form_type == "new_claim" else "Granted Title"
+            # Extract fields and detect form subtype
+            fields, subtype = self.extract_document(result_text, form_type)
             
             # Map to atlas structure
             atlas_claim = self.map_to_atlas_claim_structure(fields, form_type, subtype)
@@ -157,7 +187,8 @@ class FRAOCRService:
                     "extracted_fields": fields,
                     "form_type": form_type,
                     "form_subtype": subtype,
-                    "processing_timestamp": result.get("extraction", {}).get("timestamp"),
+                    "processing_timestamp": processing_timestamp,
+                    "cache_hit": cached is not None,
                     "atlas_version": "1.0.0",
                     "pilot_state": "Odisha"
                 }
@@ -177,6 +208,10 @@ class FRAOCRService:
                 "message": str(e)
             }
 
+    def shutdown(self):
+        """Stop the OCR worker pool"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
     def get_fra_form_types(self) -> Dict[str, Any]:
         """Get FRA form types supported by Aṭavī Atlas"""
         return {
@@ -1,14 +1,14 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Query, Path
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Query, Path, Request, Body
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from contextlib import asynccontextmanager
+from starlette.concurrency import run_in_threadpool
 import uvicorn
 import os
-import boto3
 from botocore.exceptions import ClientError
 import json
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from dotenv import load_dotenv
 from pydantic import BaseModel, ValidationError
 import logging
@@ -25,7 +25,17 @@ except ImportError:
     print("⚠ AI Pipeline not available")
 
 try:
-    from services.claims_service import claims_service
+    from services.ocr_jobs import ocr_job_queue
+    OCR_JOBS_AVAILABLE = ocr_job_queue is not None
+    print("✅ OCR job queue loaded successfully")
+except ImportError:
+    OCR_JOBS_AVAILABLE = False
+    print("⚠ OCR job queue not available")
+
+try:
+    from services.claims_service import claims_service, get_pool_status, claim_filters, InvalidCursorError
+    from services.async_claims_service import async_claims_service, async_engine, get_async_pool_status
+    from services.bulk_ingest import ingest_claims, iter_ndjson, iter_json_array, BULK_INSERT_BATCH_SIZE
     CLAIMS_SERVICE_AVAILABLE = True
     print("✅ Claims service loaded successfully")
 except ImportError:
@@ -33,22 +43,56 @@ except ImportError:
     print("⚠ Claims service not available")
 
 try:
-    from services.webgis_service import webgis_service
+    from services.claim_export import export_stream, EXPORT_FORMATS
+    EXPORT_AVAILABLE = True
+except ImportError as e:
+    EXPORT_AVAILABLE = False
+    print(f"⚠ Claim export not available: {e}")
+
+try:
+    from services.vector_tiles import get_tile, MVT_CONTENT_TYPE, TILE_MAX_ZOOM
+    TILES_AVAILABLE = True
+except ImportError as e:
+    TILES_AVAILABLE = False
+    TILE_MAX_ZOOM = 22
+    print(f"⚠ Vector tiles not available: {e}")
+
+try:
+    from services.stats_cache import stats_cache, etag_matches
+    STATS_CACHE_AVAILABLE = True
+    print("✅ Stats cache loaded successfully")
+except ImportError as e:
+    STATS_CACHE_AVAILABLE = False
+    print(f"⚠ Stats cache not available: {e}")
+
+try:
+    from services.webgis_service import webgis_service, GEEQuotaError
     WEBGIS_AVAILABLE = True
     print("✅ WebGIS service loaded successfully")
 except ImportError as e:
     WEBGIS_AVAILABLE = False
     print(f"⚠ WebGIS service not available: {e}")
 
+try:
+    from services.gee_jobs import gee_executor
+    GEE_JOBS_AVAILABLE = gee_executor is not None
+    print("✅ GEE analysis executor loaded successfully")
+except ImportError as e:
+    GEE_JOBS_AVAILABLE = False
+    print(f"⚠ GEE analysis executor not available: {e}")
+
+try:
+    from services.storage_service import s3_storage
+    S3_AVAILABLE = True
+    print("✅ S3 storage service loaded successfully")
+except ImportError as e:
+    S3_AVAILABLE = False
+    print(f"⚠ S3 storage service not available: {e}")
+
 load_dotenv()
 
-s3_Client = boto3.client(
-    's3',
-    aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-    aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-    region_name=os.getenv("AWS_REGION")
-)
-S3_BUCKET_NAME = os.getenv("S3_BUCKET_NAME", "fra-docs")
+MAX_FILE_SIZE_MB = int(os.getenv("MAX_FILE_SIZE_MB", "50"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "500"))
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -57,9 +101,21 @@ async def lifespan(app: FastAPI):
     print(f"📡 AI Pipeline: {'✅ Available' if AI_PIPELINE_AVAILABLE else '❌ Unavailable'}")
     print(f"🗃 Claims Service: {'✅ Available' if CLAIMS_SERVICE_AVAILABLE else '❌ Unavailable'}")
     print(f"🗺 WebGIS Service: {'✅ Available' if WEBGIS_AVAILABLE else '❌ Unavailable'}")
+    if OCR_JOBS_AVAILABLE:
+        await ocr_job_queue.start()
     print("✅ Aṭavī Atlas API Gateway Online!")
     yield
     print("🛑 Shutting down Aṭavī Atlas...")
+    if OCR_JOBS_AVAILABLE:
+        await ocr_job_queue.stop()
+    if AI_PIPELINE_AVAILABLE and ai_pipeline is not None:
+        ai_pipeline.shutdown()
+    if S3_AVAILABLE:
+        s3_storage.shutdown()
+    if GEE_JOBS_AVAILABLE:
+        gee_executor.shutdown()
+    if CLAIMS_SERVICE_AVAILABLE:
+        await async_engine.dispose()
 
 app = FastAPI(
     title="🌳 Aṭavī Atlas - FRA Decision Support System",
@@ -80,6 +136,21 @@ app.add_middleware(
     allow_headers=["*"]
 )
 
+UPLOAD_PATHS = ("/api/v1/ocr/process-document", "/api/v1/ocr/jobs", "/api/v1/upload/s3")
+
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    """Reject oversized uploads from Content-Length before the body is read"""
+    if request.method == "POST" and request.url.path in UPLOAD_PATHS:
+        content_length = request.headers.get("content-length")
+        # Allow some headroom for multipart boundaries and form fields
+        if content_length and content_length.isdigit() and int(content_length) > (MAX_FILE_SIZE_MB + 1) * 1024 * 1024:
+            return JSONResponse(
+                status_code=413,
+                content={"detail": f"File exceeds the {MAX_FILE_SIZE_MB} MB upload limit"}
+            )
+    return await call_next(request)
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     return JSONResponse(
@@ -136,17 +207,66 @@ async def api_v1_info():
         }
     }
 
+@app.get("/api/v1/system/db-pool")
+async def database_pool_status():
+    if not CLAIMS_SERVICE_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Claims service unavailable")
+    return {
+        "status": "success",
+        "pool": get_pool_status(),
+        "async_pool": get_async_pool_status(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+async def stats_response(request: Request, name: str, compute) -> Response:
+    """Cached statistic with ETag; 304 when the client already holds the current version"""
+    if not (CLAIMS_SERVICE_AVAILABLE and STATS_CACHE_AVAILABLE):
+        raise HTTPException(status_code=503, detail="Statistics service unavailable")
+    payload, etag = await stats_cache.get(name, compute)
+    if "error" in payload:
+        raise HTTPException(status_code=500, detail=f"Error computing {name} statistics: {payload['error']}")
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content={"status": "success", name: payload}, headers=headers)
+
+@app.get("/api/v1/stats/dashboard")
+async def dashboard_stats(request: Request):
+    """Claim counts by status, district, form type and priority, verification and GIS coverage"""
+    return await stats_response(request, "dashboard", claims_service.get_dashboard_stats)
+
+@app.get("/api/v1/stats/summary")
+async def claims_summary_stats(request: Request):
+    """Total, pending and processed claim counts"""
+    return await stats_response(request, "summary", claims_service.get_claims_summary)
+
+@app.get("/api/v1/stats/gis")
+async def gis_summary_stats(request: Request):
+    """Analyzed area, forest coverage and land class breakdown across all claims"""
+    return await stats_response(request, "gis", claims_service.get_gis_analytics_summary)
+
 @app.get("/api/v1/claims")
-async def get_all_claims(full_details: bool = Query(False, description="Include full claim data")):
+async def get_all_claims(
+    full_details: bool = Query(False, description="Include full claim data"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE, description="Claims per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    status: Optional[str] = Query(None, description="Filter by claim status"),
+    district: Optional[str] = Query(None, description="Filter by district (partial match)")
+):
     if not CLAIMS_SERVICE_AVAILABLE:
         raise HTTPException(status_code=503, detail="Claims service unavailable")
     try:
-        claims = claims_service.get_all_claims(include_full_data=full_details)
+        page = await async_claims_service.get_claims_page(
+            limit=limit, cursor=cursor, status=status, district=district, include_full_data=full_details
+        )
         return {
             "status": "success",
-            "claims": claims,
-            "count": len(claims)
+            "claims": page["claims"],
+            "count": len(page["claims"]),
+            "next_cursor": page["next_cursor"]
         }
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching claims: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error fetching claims: {str(e)}")
@@ -154,22 +274,29 @@ async def get_all_claims(full_details: bool = Query(False, description="Include
 @app.get("/api/v1/claims/search")
 async def search_claims(
     q: str = Query(..., description="Search query"), 
-    full_details: bool = Query(False, description="Include full claim data")
+    full_details: bool = Query(False, description="Include full claim data"),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE, description="Claims per page, most relevant first"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
 ):
-    """Search claims - returns empty array if no results found"""
+    """Search claims by name, village, district, file name or ID - Odia/Hindi and Latin spellings match each other"""
     if not CLAIMS_SERVICE_AVAILABLE:
         raise HTTPException(status_code=503, detail="Claims service unavailable")
     
     try:
         # Always return success with empty array if no results
-        claims = claims_service.search_claims(query=q, include_full_data=full_details)
+        page = await async_claims_service.search_claims_page(
+            query=q, limit=limit, cursor=cursor, include_full_data=full_details
+        )
         
         return {
             "status": "success",
-            "claims": claims,  # Will be empty array if no matches
-            "count": len(claims),
-            "query": q
+            "claims": page["claims"],  # Will be empty array if no matches
+            "count": len(page["claims"]),
+            "query": q,
+            "next_cursor": page["next_cursor"]
         }
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error searching claims: {str(e)}")
         # Even on error, return empty results instead of 500 error
@@ -178,15 +305,80 @@ async def search_claims(
             "claims": [],
             "count": 0,
             "query": q,
+            "next_cursor": None,
             "note": "Search encountered an issue but returned safely"
         }
     
+def parse_bbox(bbox: str) -> Tuple[float, float, float, float]:
+    """Leaflet "west,south,east,north" -> (south, west, north, east)"""
+    try:
+        west, south, east, north = (float(value) for value in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox must be west,south,east,north")
+    if not (-180 <= west <= east <= 180 and -90 <= south <= north <= 90):
+        raise HTTPException(status_code=400, detail="bbox out of range or crossing the antimeridian")
+    return south, west, north, east
+
+@app.get("/api/v1/claims/map")
+async def get_claims_on_map(
+    bbox: Optional[str] = Query(None, description="Viewport as west,south,east,north (Leaflet toBBoxString)"),
+    lat: Optional[float] = Query(None, ge=-90, le=90, description="Radius query center latitude"),
+    lon: Optional[float] = Query(None, ge=-180, le=180, description="Radius query center longitude"),
+    radius_m: Optional[float] = Query(None, gt=0, le=100000, description="Radius query distance in meters"),
+    zoom: int = Query(12, ge=0, le=22, description="Map zoom level - sets how many claims are returned"),
+    status: Optional[str] = Query(None, description="Filter by claim status"),
+    district: Optional[str] = Query(None, description="Filter by district (partial match)")
+):
+    """Claims in a map viewport (bbox) or around a point (lat, lon, radius_m), via the spatial index"""
+    if not CLAIMS_SERVICE_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Claims service unavailable")
+    if bbox:
+        south, west, north, east = parse_bbox(bbox)
+        result = await async_claims_service.get_claims_in_bbox(south, west, north, east, zoom, status, district)
+    elif lat is not None and lon is not None and radius_m is not None:
+        result = await async_claims_service.get_claims_near(lat, lon, radius_m, zoom, status, district)
+    else:
+        raise HTTPException(status_code=400, detail="Provide bbox, or lat, lon and radius_m")
+    return {"status": "success", "count": len(result["claims"]), **result}
+
+@app.get("/api/v1/claims/clusters")
+async def get_claim_clusters(
+    bbox: str = Query(..., description="Viewport as west,south,east,north (Leaflet toBBoxString)"),
+    zoom: int = Query(..., ge=0, le=22, description="Map zoom level - sets the cluster cell size")
+):
+    """Pre-aggregated claim clusters (count, status breakdown, centroid) per geohash cell for low-zoom views"""
+    if not CLAIMS_SERVICE_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Claims service unavailable")
+    result = await async_claims_service.get_claim_clusters(*parse_bbox(bbox), zoom)
+    return {"status": "success", "count": len(result["clusters"]), **result}
+
+@app.get("/api/v1/claims/export")
+async def export_claims(
+    format: str = Query("ndjson", pattern="^(ndjson|csv|geojson)$", description="ndjson, csv or geojson"),
+    district: Optional[str] = Query(None, description="Filter by district (partial match)"),
+    status: Optional[str] = Query(None, description="Filter by claim status"),
+    form_subtype: Optional[str] = Query(None, description="Filter by form subtype (IFR, CR, CFR)"),
+    submitted_from: Optional[datetime] = Query(None, description="Submitted on or after (ISO 8601)"),
+    submitted_to: Optional[datetime] = Query(None, description="Submitted before (ISO 8601)")
+):
+    """Stream matching claims row by row - memory stays flat for a full-state export"""
+    if not (CLAIMS_SERVICE_AVAILABLE and EXPORT_AVAILABLE):
+        raise HTTPException(status_code=503, detail="Claims export unavailable")
+    filters = claim_filters(status, district, form_subtype, submitted_from, submitted_to)
+    media_type, extension = EXPORT_FORMATS[format]
+    filename = f"atavi_claims_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+    return StreamingResponse(
+        export_stream(async_claims_service.stream_claims(filters), format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @app.get("/api/v1/claims/{claim_id}")
 async def get_claim_by_id(claim_id: int = Path(..., description="Claim ID"), full_details: bool = Query(True, description="Include full claim data")):
     if not CLAIMS_SERVICE_AVAILABLE:
         raise HTTPException(status_code=503, detail="Claims service unavailable")
     try:
-        claim = claims_service.get_claim_by_id(claim_id=claim_id, include_full_data=full_details)
+        claim = await async_claims_service.get_claim_by_id(claim_id=claim_id, include_full_data=full_details)
         if not claim:
             raise HTTPException(status_code=404, detail=f"Claim {claim_id} not found")
         return {
@@ -204,7 +396,7 @@ async def update_claim_status(claim_id: int = Path(..., description="Claim ID"),
     if not CLAIMS_SERVICE_AVAILABLE:
         raise HTTPException(status_code=503, detail="Claims service unavailable")
     try:
-        result = claims_service.update_claim_status(claim_id=claim_id, new_status=status, notes=notes)
+        result = await async_claims_service.update_claim_status(claim_id=claim_id, new_status=status, notes=notes)
         if not result.get("success"):
             raise HTTPException(status_code=400, detail=result.get("error"))
         return result
@@ -214,12 +406,22 @@ async def update_claim_status(claim_id: int = Path(..., description="Claim ID"),
         logger.error(f"Error updating claim status: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error updating claim status: {str(e)}")
 
+@app.put("/api/v1/claims/{claim_id}/geometry")
+async def set_claim_geometry(claim_id: int = Path(..., description="Claim ID"), geojson: dict = Body(..., description="GeoJSON parcel boundary")):
+    """Store a claim's parcel boundary (Polygon/MultiPolygon, Feature or FeatureCollection) for the vector tiles"""
+    if not CLAIMS_SERVICE_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Claims service unavailable")
+    result = await async_claims_service.set_claim_geometry(claim_id, geojson)
+    if not result.get("success"):
+        raise HTTPException(status_code=404 if result.get("error") == "Claim not found" else 400, detail=result.get("error"))
+    return result
+
 @app.delete("/api/v1/claims/{claim_id}")
 async def delete_claim(claim_id: int = Path(..., description="Claim ID")):
     if not CLAIMS_SERVICE_AVAILABLE:
         raise HTTPException(status_code=503, detail="Claims service unavailable")
     try:
-        result = claims_service.delete_claim(claim_id=claim_id)
+        result = await async_claims_service.delete_claim(claim_id=claim_id)
         if not result.get("success"):
             raise HTTPException(status_code=404, detail=result.get("error"))
         return result
@@ -229,6 +431,20 @@ async def delete_claim(claim_id: int = Path(..., description="Claim ID")):
         logger.error(f"Error deleting claim: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error deleting claim: {str(e)}")
 
+@app.get("/tiles/{z}/{x}/{y}.mvt")
+async def get_vector_tile(
+    z: int = Path(..., ge=0, le=TILE_MAX_ZOOM),
+    x: int = Path(..., ge=0),
+    y: int = Path(..., ge=0)
+):
+    """Claim points ("claims" layer) and parcel boundaries ("parcels" layer) as a Mapbox Vector Tile"""
+    if not (CLAIMS_SERVICE_AVAILABLE and TILES_AVAILABLE):
+        raise HTTPException(status_code=503, detail="Vector tiles unavailable")
+    if x >= 1 << z or y >= 1 << z:
+        raise HTTPException(status_code=404, detail="Tile out of range")
+    tile = await run_in_threadpool(get_tile, z, x, y)
+    return Response(content=tile, media_type=MVT_CONTENT_TYPE, headers={"Cache-Control": "public, max-age=60"})
+
 @app.get("/api/v1/ai-pipeline/status")
 async def ai_pipeline_status():
     if not AI_PIPELINE_AVAILABLE:
@@ -248,16 +464,19 @@ async def get_supported_form_types():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving form types: {str(e)}")
 
-@app.post("/api/v1/ocr/process-document")
-async def process_fra_document(file: UploadFile = File(...), form_type: str = Form(...)):
-    if not AI_PIPELINE_AVAILABLE:
-        raise HTTPException(status_code=503, detail="AI Pipeline service unavailable")
+def validate_ocr_upload(file: UploadFile, form_type: str):
     valid_forms = ["new_claim", "legacy_claim"]
     if form_type not in valid_forms:
         raise HTTPException(status_code=400, detail=f"Invalid form_type '{form_type}'")
     allowed_types = ["application/pdf", "image/jpeg", "image/png", "image/jpg"]
     if file.content_type not in allowed_types:
         raise HTTPException(status_code=400, detail=f"Invalid file type '{file.content_type}'")
+
+@app.post("/api/v1/ocr/process-document")
+async def process_fra_document(file: UploadFile = File(...), form_type: str = Form(...)):
+    if not AI_PIPELINE_AVAILABLE:
+        raise HTTPException(status_code=503, detail="AI Pipeline service unavailable")
+    validate_ocr_upload(file, form_type)
     try:
         result = await ai_pipeline.process_document(file, form_type)
         if not result.get("success"):
@@ -268,8 +487,41 @@ async def process_fra_document(file: UploadFile = File(...), form_type: str = Fo
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Document processing failed: {str(e)}")
     
+@app.post("/api/v1/ocr/jobs", status_code=202)
+async def submit_ocr_job(file: UploadFile = File(...), form_type: str = Form(...)):
+    """Queue a document for background OCR - poll the returned job for the result"""
+    if not OCR_JOBS_AVAILABLE:
+        raise HTTPException(status_code=503, detail="OCR job queue unavailable")
+    validate_ocr_upload(file, form_type)
+    try:
+        job = await ocr_job_queue.submit(file, form_type)
+        return {
+            "status": "accepted",
+            "job": job,
+            "status_url": f"/api/v1/ocr/jobs/{job['job_id']}"
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error queuing OCR job: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error queuing OCR job: {str(e)}")
+
+@app.get("/api/v1/ocr/jobs/{job_id}")
+async def get_ocr_job(job_id: str = Path(..., description="OCR job ID")):
+    if not OCR_JOBS_AVAILABLE:
+        raise HTTPException(status_code=503, detail="OCR job queue unavailable")
+    job = ocr_job_queue.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"OCR job {job_id} not found")
+    return {
+        "status": "success",
+        "job": job
+    }
+
 @app.post("/api/v1/upload/s3")
 async def upload_to_s3(file: UploadFile = File(...), fileName: str = Form(...)):
+    if not S3_AVAILABLE:
+        raise HTTPException(status_code=503, detail="S3 storage unavailable")
     try:
         logger.debug(f"Uploading file: {fileName}, Content-Type: {file.content_type}")
         
@@ -286,25 +538,23 @@ async def upload_to_s3(file: UploadFile = File(...), fileName: str = Form(...)):
         elif content_type not in allowed_types:
             raise HTTPException(status_code=400, detail=f"Invalid file type '{content_type}'")
         
+        if file.size is not None and file.size > MAX_FILE_SIZE_MB * 1024 * 1024:
+            raise HTTPException(status_code=413, detail=f"File exceeds the {MAX_FILE_SIZE_MB} MB upload limit")
+        
         unique_file_key = f"uploads/{datetime.now().strftime('%Y%m%d%H%M%S')}_{fileName}"
-        logger.debug(f"Uploading to S3 bucket: {S3_BUCKET_NAME}, Key: {unique_file_key}")
+        logger.debug(f"Uploading to S3 bucket: {s3_storage.bucket}, Key: {unique_file_key}")
         
         upload_content_type = 'application/geo+json' if fileName.lower().endswith('.geojson') else content_type
         
-        s3_Client.upload_fileobj(
-            file.file,
-            S3_BUCKET_NAME,
-            unique_file_key,
-            ExtraArgs={'ContentType': upload_content_type}
-        )
-        
-        s3_url = f"https://{S3_BUCKET_NAME}.s3.{os.getenv('AWS_REGION')}.amazonaws.com/{unique_file_key}"
+        s3_url = await s3_storage.upload_fileobj(file.file, unique_file_key, upload_content_type)
         logger.debug(f"File uploaded successfully, S3 URL: {s3_url}")
         
         return JSONResponse(status_code=200, content={
             "status": "success",
             "s3_url": s3_url
         })
+    except HTTPException:
+        raise
     except ClientError as e:
         logger.error(f"S3 upload failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"S3 upload failed: {str(e)}")
@@ -324,6 +574,22 @@ class FinalizeClaimData(BaseModel):
     supporting_doc_urls: Optional[List[str]] = None
     ocr_metadata: Optional[dict] = None
 
+def finalize_claim_info(claim_data: FinalizeClaimData) -> dict:
+    """Claim record for a finalized claim submission"""
+    return {
+        "claimant_name": claim_data.claimant_name,
+        "district": claim_data.district,
+        "village_name": claim_data.village_name,
+        "form_type": claim_data.form_type,
+        "status": claim_data.status,
+        "extracted_fields": claim_data.extracted_fields,
+        "form_doc_url": claim_data.form_doc_url,
+        "geojson_file_url": claim_data.geojson_file_url,
+        "supporting_doc_urls": claim_data.supporting_doc_urls or [],
+        "ocr_metadata": claim_data.ocr_metadata or {},
+        "comments": f"Finalized with files: main={claim_data.form_doc_url}, geojson={claim_data.geojson_file_url}, supporting={len(claim_data.supporting_doc_urls or [])} docs"
+    }
+
 @app.post("/api/v1/claims/finalize")
 async def finalize_claim(claim_data: FinalizeClaimData):
     try:
@@ -332,22 +598,10 @@ async def finalize_claim(claim_data: FinalizeClaimData):
         if not CLAIMS_SERVICE_AVAILABLE:
             raise HTTPException(status_code=503, detail="Claims service unavailable")
 
-        claim_info = {
-            "claimant_name": claim_data.claimant_name,
-            "district": claim_data.district,
-            "village_name": claim_data.village_name,
-            "form_type": claim_data.form_type,
-            "status": claim_data.status,
-            "extracted_fields": claim_data.extracted_fields,
-            "form_doc_url": claim_data.form_doc_url,
-            "geojson_file_url": claim_data.geojson_file_url,
-            "supporting_doc_urls": claim_data.supporting_doc_urls or [],
-            "ocr_metadata": claim_data.ocr_metadata or {},
-            "comments": f"Finalized with files: main={claim_data.form_doc_url}, geojson={claim_data.geojson_file_url}, supporting={len(claim_data.supporting_doc_urls or [])} docs"
-        }
+        claim_info = finalize_claim_info(claim_data)
         
         logger.debug(f"Creating new claim with: {claim_info}")
-        result = claims_service.create_claim(claim_info)
+        result = await async_claims_service.create_claim(claim_info)
         if not result.get("success"):
             raise HTTPException(status_code=400, detail=result.get("error"))
         
@@ -375,14 +629,107 @@ async def finalize_claim(claim_data: FinalizeClaimData):
         logger.error(f"Finalize failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Finalize failed: {str(e)}")
 
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+@app.post("/api/v1/claims/bulk")
+async def bulk_ingest_claims(
+    request: Request,
+    batch_size: int = Query(BULK_INSERT_BATCH_SIZE, ge=1, le=10000, description="Claims inserted per transaction")
+):
+    """
+    Bulk claim ingestion for legacy registers
+    Body is NDJSON (Content-Type: application/x-ndjson) or a JSON array, read as a stream.
+    Each record is validated as FinalizeClaimData; returns a result per row.
+    """
+    if not CLAIMS_SERVICE_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Claims service unavailable")
+
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    parse = iter_ndjson if content_type in NDJSON_CONTENT_TYPES else iter_json_array
+    try:
+        summary = await ingest_claims(
+            parse(request.stream()),
+            prepare=lambda record: finalize_claim_info(FinalizeClaimData.model_validate(record)),
+            insert_batch=async_claims_service.bulk_create_claims,
+            batch_size=batch_size
+        )
+        logger.info(f"Bulk ingestion: {summary['created']} created, {summary['failed']} failed")
+        return {"status": "success", **summary}
+    except Exception as e:
+        logger.error(f"Bulk ingestion failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Bulk ingestion failed: {str(e)}")
+
+@app.get("/api/v1/webgis/cache")
+async def get_webgis_cache_status():
+    if not WEBGIS_AVAILABLE or webgis_service.result_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, "model_version": webgis_service.model_version, **webgis_service.result_cache.status()}
+
+@app.delete("/api/v1/webgis/cache")
+async def clear_webgis_cache(model_id: Optional[str] = Query(None, description="Only results of this classifier asset")):
+    """Drop cached GEE classification results, e.g. after retraining the classifier"""
+    if not WEBGIS_AVAILABLE or webgis_service.result_cache is None:
+        raise HTTPException(status_code=503, detail="GEE result cache unavailable")
+    return {"status": "success", "removed": webgis_service.result_cache.invalidate(model_id)}
+
+def queued_analysis(claim_id: int, geojson_data: dict) -> JSONResponse:
+    """202 with the (possibly already running) analysis job for a claim"""
+    if not GEE_JOBS_AVAILABLE:
+        raise HTTPException(status_code=503, detail="GEE analysis executor unavailable")
+    job, deduplicated = gee_executor.submit(claim_id, geojson_data)
+    return JSONResponse(status_code=202, content={
+        "status": "accepted",
+        "deduplicated": deduplicated,
+        "job": job,
+        "status_url": f"/api/v1/webgis/jobs/{job['job_id']}"
+    })
+
+def gee_quota_exceeded(e: Exception) -> HTTPException:
+    return HTTPException(status_code=503, detail=f"Earth Engine quota exceeded: {str(e)}", headers={"Retry-After": "60"})
+
+async def run_analysis(claim_id: int, geojson_data: dict) -> dict:
+    """Analysis result, computed on the GEE executor so the event loop stays free"""
+    if GEE_JOBS_AVAILABLE:
+        return await gee_executor.run(claim_id, geojson_data)
+    try:
+        return await run_in_threadpool(webgis_service.analyze_geojson_for_claim, geojson_data, claim_id)
+    except GEEQuotaError as e:
+        raise gee_quota_exceeded(e)  # Not retried without the executor
+
+@app.get("/api/v1/webgis/jobs")
+async def get_webgis_jobs_status():
+    if not GEE_JOBS_AVAILABLE:
+        raise HTTPException(status_code=503, detail="GEE analysis executor unavailable")
+    return gee_executor.status()
+
+@app.get("/api/v1/webgis/jobs/{job_id}")
+async def get_webgis_job(job_id: str = Path(..., description="GEE analysis job ID")):
+    if not GEE_JOBS_AVAILABLE:
+        raise HTTPException(status_code=503, detail="GEE analysis executor unavailable")
+    job = gee_executor.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"GEE analysis job {job_id} not found")
+    return {
+        "status": "success",
+        "job": job
+    }
+
 @app.post("/api/v1/webgis/analyze-for-claim/{claim_id}")
-async def analyze_for_claim(claim_id: int = Path(...), file: UploadFile = File(...)):
+async def analyze_for_claim(
+    claim_id: int = Path(...),
+    file: UploadFile = File(...),
+    wait: bool = Query(True, description="Wait for the result; false returns a job to poll")
+):
     if not file.filename.endswith('.geojson'):
         raise HTTPException(400, "Please upload a GeoJSON file")
     try:
         contents = await file.read()
         geojson_data = json.loads(contents)
-        results = webgis_service.analyze_geojson_for_claim(geojson_data, claim_id)
+        if CLAIMS_SERVICE_AVAILABLE:
+            await async_claims_service.set_claim_geometry(claim_id, geojson_data)  # Boundary for the vector tiles
+        if not wait:
+            return queued_analysis(claim_id, geojson_data)
+        results = await run_analysis(claim_id, geojson_data)
         return {
             "status": "success",
             "results": {
@@ -391,9 +738,35 @@ async def analyze_for_claim(claim_id: int = Path(...), file: UploadFile = File(.
         }
     except json.JSONDecodeError:
         raise HTTPException(400, "Invalid GeoJSON format")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(500, f"Analysis failed: {str(e)}")
 
+class BatchAnalysisRequest(BaseModel):
+    claim_ids: Optional[List[int]] = None
+    village_name: Optional[str] = None
+    district: Optional[str] = None
+
+@app.post("/api/v1/webgis/analyze-batch")
+async def analyze_claims_batch(request: BatchAnalysisRequest):
+    """Classify every claim with a stored boundary in a village / district (or id list) in one GEE pass"""
+    if not WEBGIS_AVAILABLE:
+        raise HTTPException(status_code=503, detail="WebGIS service unavailable")
+    if not (request.claim_ids or request.village_name or request.district):
+        raise HTTPException(status_code=400, detail="Provide claim_ids, village_name or district")
+    args = (request.claim_ids, request.village_name, request.district)
+    try:
+        if GEE_JOBS_AVAILABLE:
+            result = await gee_executor.call(webgis_service.analyze_claims_batch, *args)
+        else:
+            result = await run_in_threadpool(webgis_service.analyze_claims_batch, *args)
+    except GEEQuotaError as e:
+        raise gee_quota_exceeded(e)
+    if not result.get("success"):
+        raise HTTPException(status_code=422, detail=result.get("error"))
+    return result
+
 @app.get("/api/v1/webgis/claim/{claim_id}")
 async def get_claim_webgis(claim_id: int):
     try:
@@ -424,11 +797,14 @@ async def get_claim_webgis(claim_id: int):
         raise HTTPException(500, f"Error retrieving WebGIS data: {str(e)}")
 
 @app.post("/api/v1/webgis/analyze-claim-auto/{claim_id}")
-async def analyze_claim_auto(claim_id: int = Path(...)):
+async def analyze_claim_auto(
+    claim_id: int = Path(...),
+    wait: bool = Query(True, description="Wait for the result; false returns a job to poll")
+):
     """Auto-fetch GeoJSON from claim and analyze"""
     try:
         # Get claim data
-        claim = claims_service.get_claim_by_id(claim_id, include_full_data=False)
+        claim = await async_claims_service.get_claim_by_id(claim_id, include_full_data=False)
         if not claim:
             raise HTTPException(404, f"Claim {claim_id} not found")
         
@@ -441,9 +817,13 @@ async def analyze_claim_auto(claim_id: int = Path(...)):
             response = await client.get(claim["geojson_file_url"])
             response.raise_for_status()
             geojson_data = response.json()
+        await async_claims_service.set_claim_geometry(claim_id, geojson_data)  # Boundary for the vector tiles
         
+        if not wait:
+            return queued_analysis(claim_id, geojson_data)
+
         # Analyze it
-        results = webgis_service.analyze_geojson_for_claim(geojson_data, claim_id)
+        results = await run_analysis(claim_id, geojson_data)
         
         # DEBUG: Log the full response
         print("🔍 Full results:", json.dumps(results, indent=2))
@@ -453,6 +833,8 @@ async def analyze_claim_auto(claim_id: int = Path(...)):
             "success" : True,
             "gee_analysis": results["gee_analysis"]
         }
+    except HTTPException:
+        raise
     except httpx.HTTPError as e:
         raise HTTPException(500, f"Failed to fetch GeoJSON: {str(e)}")
     except Exception as e:
@@ -2,17 +2,34 @@
 import os
 import sys
 import tempfile
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from fastapi import UploadFile, HTTPException
+from starlette.concurrency import run_in_threadpool
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# OCR backpressure: at most OCR_MAX_CONCURRENCY documents at LLMWhisperer,
+# OCR_MAX_QUEUE more waiting for a slot, anything beyond that gets a 429
+OCR_MAX_CONCURRENCY = int(os.getenv("OCR_MAX_CONCURRENCY", "4"))
+OCR_MAX_QUEUE = int(os.getenv("OCR_MAX_QUEUE", "16"))
+
+# Uploads are streamed to disk in chunks and rejected as soon as they pass the limit
+MAX_FILE_SIZE_MB = int(os.getenv("MAX_FILE_SIZE_MB", "50"))
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# OCR result cache (set OCR_CACHE_ENABLED=false to always call LLMWhisperer)
+OCR_CACHE_ENABLED = os.getenv("OCR_CACHE_ENABLED", "true").lower() == "true"
+OCR_CACHE_DIR = os.getenv("OCR_CACHE_DIR", os.path.join(os.path.dirname(__file__), '..', 'ocr_cache'))
+OCR_CACHE_MAX_MB = int(os.getenv("OCR_CACHE_MAX_MB", "512"))
+OCR_CACHE_MAX_AGE_DAYS = int(os.getenv("OCR_CACHE_MAX_AGE_DAYS", "30"))
+
 # Add ai-pipeline to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'ai-pipeline'))
 
 from ocr_service import FRAOCRService
+from ocr_cache import OCRResultCache
 
 # Import claims service for database integration (not used for OCR processing)
 try:
@@ -35,13 +52,36 @@ class AtaviAIPipeline:
         self.api_key = os.getenv("LLMWHISPERER_API_KEY")
         
         # Initialize OCR service
-        self.ocr_service = FRAOCRService(api_key=self.api_key)
+        self.ocr_cache = OCRResultCache(
+            cache_dir=OCR_CACHE_DIR,
+            max_bytes=OCR_CACHE_MAX_MB * 1024 * 1024,
+            max_age_seconds=OCR_CACHE_MAX_AGE_DAYS * 86400
+        ) if OCR_CACHE_ENABLED else None
+        self.ocr_service = FRAOCRService(
+            api_key=self.api_key,
+            max_workers=OCR_MAX_CONCURRENCY,
+            cache=self.ocr_cache
+        )
+        
+        # Documents accepted but not yet finished (running + waiting for a worker)
+        self.max_pending = OCR_MAX_CONCURRENCY + OCR_MAX_QUEUE
+        self.pending_documents = 0
         
         print(f"🔑 LLMWhisperer API Key loaded: {'✅' if self.api_key else '❌'}")
+        print(f"⚙  OCR concurrency: {OCR_MAX_CONCURRENCY} workers, queue of {OCR_MAX_QUEUE}")
+        print(f"🗄  OCR result cache: {'✅ ' + self.ocr_cache.cache_dir if self.ocr_cache else '❌ Disabled'}")
         print(f"🗃  Database integration: {'✅ Available' if DATABASE_INTEGRATION else '❌ Unavailable'}")
 
     async def process_document(self, file: UploadFile, form_type: str) -> Dict[str, Any]:
         """Process FRA document through OCR pipeline without saving to database"""
+        if self.pending_documents >= self.max_pending:
+            raise HTTPException(
+                status_code=429,
+                detail="OCR queue is full, please retry shortly",
+                headers={"Retry-After": "30"}
+            )
+        
+        self.pending_documents += 1
         temp_path = None
         try:
             # Validate file
@@ -49,41 +89,22 @@ class AtaviAIPipeline:
                 raise HTTPException(status_code=400, detail="No file provided")
             
             # Save uploaded file temporarily
-            with tempfile.NamedTemporaryFile(delete=False, suffix=f"_{file.filename}") as temp_file:
-                content = await file.read()
-                temp_file.write(content)
-                temp_path = temp_file.name
+            temp_path = await self.save_upload(file)
 
             print(f"📄 Processing document: {file.filename} (Type: {form_type})")
 
             # Process through atlas OCR
             result = await self.ocr_service.process_fra_document(temp_path, form_type)
             
-            # Handle OCR results
-            if result.get("success"):
-                print(f"✅ OCR processing successful for {file.filename}")
-            else:
-                print(f"❌ OCR processing failed for {file.filename}")
-                result["database_info"] = {
-                    "saved": False,
-                    "message": "OCR processing failed, no data to save"
-                }
-            
-            # Add processing metadata
-            result["processing_info"] = {
-                "filename": file.filename,
-                "form_type": form_type,
-                "ocr_success": result.get("success", False),
-                "database_available": DATABASE_INTEGRATION,
-                "atlas_version": "1.0.0"
-            }
-            
-            return result
+            return self.finalize_result(result, file.filename, form_type)
 
+        except HTTPException:
+            raise
         except Exception as e:
             print(f"🔥 AI Pipeline error: {str(e)}")
             raise HTTPException(status_code=500, detail=f"AI Pipeline error: {str(e)}")
         finally:
+            self.pending_documents -= 1
             # Cleanup temporary file
             if temp_path and os.path.exists(temp_path):
                 try:
@@ -92,6 +113,65 @@ class AtaviAIPipeline:
                 except:
                     pass  # Ignore cleanup errors
 
+    async def save_upload(self, file: UploadFile, directory: Optional[str] = None) -> str:
+        """Stream an uploaded document to disk in fixed-size chunks and return its path"""
+        max_bytes = MAX_FILE_SIZE_MB * 1024 * 1024
+        written = 0
+        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=f"_{file.filename}", dir=directory)
+        try:
+            with temp_file:
+                while True:
+                    chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    written += len(chunk)
+                    if written > max_bytes:
+                        raise HTTPException(
+                            status_code=413,
+                            detail=f"File exceeds the {MAX_FILE_SIZE_MB} MB upload limit"
+                        )
+                    await run_in_threadpool(temp_file.write, chunk)
+        except Exception:
+            os.unlink(temp_file.name)
+            raise
+        return temp_file.name
+
+    def finalize_result(self, result: Dict[str, Any], filename: str, form_type: str) -> Dict[str, Any]:
+        """Attach pipeline metadata to an OCR result"""
+        # Handle OCR results
+        if result.get("success"):
+            print(f"✅ OCR processing successful for {filename}")
+        else:
+            print(f"❌ OCR processing failed for {filename}")
+            result["database_info"] = {
+                "saved": False,
+                "message": "OCR processing failed, no data to save"
+            }
+        
+        # Add processing metadata
+        result["processing_info"] = {
+            "filename": filename,
+            "form_type": form_type,
+            "ocr_success": result.get("success", False),
+            "database_available": DATABASE_INTEGRATION,
+            "atlas_version": "1.0.0"
+        }
+        
+        return result
+
+    def get_ocr_load(self) -> Dict[str, Any]:
+        """Current OCR queue usage"""
+        return {
+            "in_progress": min(self.pending_documents, OCR_MAX_CONCURRENCY),
+            "queued": max(self.pending_documents - OCR_MAX_CONCURRENCY, 0),
+            "max_concurrency": OCR_MAX_CONCURRENCY,
+            "max_queue": OCR_MAX_QUEUE
+        }
+
+    def shutdown(self):
+        """Release OCR workers on application shutdown"""
+        self.ocr_service.shutdown()
+
     def get_form_types(self) -> Dict[str, Any]:
         """Get supported form types"""
         try:
@@ -113,6 +193,8 @@ class AtaviAIPipeline:
                 "claims_storage": "✅ Active" if DATABASE_INTEGRATION else "❌ Inactive"
             },
             "api_key_configured": "✅" if self.api_key else "❌",
+            "ocr_load": self.get_ocr_load(),
+            "ocr_cache": "✅ Enabled" if self.ocr_cache else "❌ Disabled",
             "pilot_state": "Odisha",
             "supported_operations": [
                 "Document OCR processing",
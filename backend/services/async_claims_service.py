@@ -0,0 +1,393 @@
+# services/async_claims_service.py
+import os
+from contextlib import asynccontextmanager
+from typing import Dict, Any, AsyncIterator, List, Optional
+from sqlalchemy import desc, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import selectinload
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from dotenv import load_dotenv
+
+from .claims_service import (
+    Claim,
+    GISAsset,
+    DATABASE_URL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    InvalidCursorError,
+    claim_filters,
+    SEARCH_RESULT_LIMIT,
+    claims_page,
+    viewport_limit,
+    spatial_filters,
+    radius_rank,
+    select_claims_in_area,
+    area_page,
+    ClaimGeometry,
+    GEOMETRY_BOUND_COLUMNS,
+    claim_geometry_values,
+    cluster_precision,
+    select_claim_clusters,
+    clusters_page,
+    apply_cluster_deltas,
+    inserted_cluster_changes,
+    claim_insert_rows,
+    select_export_claims,
+    insert_claims,
+    search_page,
+    select_claims_page,
+    select_search_page,
+    select_all_claims,
+    select_claim_by_id,
+    select_search_claims,
+    select_claims_by_status,
+    select_claims_by_district
+)
+
+load_dotenv()
+
+# Async drivers for the sync DATABASE_URL dialects
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite"
+}
+
+
+def to_async_url(database_url: str) -> str:
+    """postgresql://... -> postgresql+asyncpg://... (ASYNC_DATABASE_URL wins if set)"""
+    url = make_url(database_url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername)).render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or to_async_url(DATABASE_URL)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=False,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=True
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+
+
+@asynccontextmanager
+async def async_session_scope() -> AsyncIterator[AsyncSession]:
+    """Async unit of work: committed on success, rolled back on error"""
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+
+
+def get_async_pool_status() -> Dict[str, Any]:
+    """Async engine pool statistics for monitoring"""
+    pool = async_engine.pool
+    status = {"pool_class": type(pool).__name__, "status": pool.status()}
+    if hasattr(pool, "checkedout"):
+        status.update({
+            "pool_size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow()
+        })
+    return status
+
+
+class AsyncClaimsService:
+    """
+    asyncio counterpart of ClaimsService for the API handlers
+    Same methods and return shapes; queries never block the event loop
+    """
+
+    def __init__(self):
+        print("✅ Async claims service initialized")
+
+    async def get_all_claims(self, skip: int = 0, limit: int = 100, include_full_data: bool = False) -> List[Dict[str, Any]]:
+        try:
+            async with async_session_scope() as db:
+                claims = (await db.execute(select_all_claims(skip, limit, include_full_data))).scalars().all()
+                return [claim.to_dict(include_full_data=include_full_data) for claim in claims]
+        except Exception as e:
+            print(f"❌ Error fetching claims: {e}")
+            return []
+
+    async def get_claims_page(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        status: Optional[str] = None,
+        district: Optional[str] = None,
+        include_full_data: bool = False
+    ) -> Dict[str, Any]:
+        try:
+            async with async_session_scope() as db:
+                stmt = select_claims_page(claim_filters(status, district), limit, cursor, include_full_data)
+                return claims_page((await db.execute(stmt)).scalars().all(), limit, include_full_data)
+        except InvalidCursorError:
+            raise
+        except Exception as e:
+            print(f"❌ Error fetching claims page: {e}")
+            return {"claims": [], "next_cursor": None}
+
+    async def stream_claims(self, filters: list, batch_size: int = 1000) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Export rows through a server-side cursor, batch_size rows at a time
+        Memory stays flat however many claims match; the connection is held until exhausted
+        """
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(select_export_claims(filters).execution_options(yield_per=batch_size))
+            async for partition in result.mappings().partitions():
+                for row in partition:
+                    yield dict(row)
+
+    async def get_claims_in_bbox(
+        self,
+        south: float,
+        west: float,
+        north: float,
+        east: float,
+        zoom: int,
+        status: Optional[str] = None,
+        district: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Newest claims inside a map viewport, at most viewport_limit(zoom) of them"""
+        limit = viewport_limit(zoom)
+        try:
+            async with async_session_scope() as db:
+                filters = spatial_filters(south, west, north, east) + claim_filters(status, district)
+                stmt = select_claims_in_area(filters, [desc(Claim.submission_date), desc(Claim.id)], limit)
+                return area_page((await db.execute(stmt)).scalars().all(), limit)
+        except Exception as e:
+            print(f"❌ Error fetching claims in bbox: {e}")
+            return {"claims": [], "limit": limit, "truncated": False}
+
+    async def get_claims_near(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_m: float,
+        zoom: int,
+        status: Optional[str] = None,
+        district: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Claims within radius_m of a point, nearest first, at most viewport_limit(zoom) of them"""
+        limit = viewport_limit(zoom)
+        try:
+            async with async_session_scope() as db:
+                distance, filters = radius_rank(latitude, longitude, radius_m)
+                stmt = select_claims_in_area(filters + claim_filters(status, district), [distance, Claim.id], limit)
+                return area_page((await db.execute(stmt)).scalars().all(), limit, origin=(latitude, longitude))
+        except Exception as e:
+            print(f"❌ Error fetching claims near point: {e}")
+            return {"claims": [], "limit": limit, "truncated": False}
+
+    async def get_claim_clusters(self, south: float, west: float, north: float, east: float, zoom: int) -> Dict[str, Any]:
+        """Pre-aggregated claim clusters for a map viewport, one per geohash cell"""
+        precision = cluster_precision(zoom)
+        try:
+            async with async_session_scope() as db:
+                rows = (await db.execute(select_claim_clusters(south, west, north, east, precision))).scalars().all()
+                return clusters_page(rows, precision)
+        except Exception as e:
+            print(f"❌ Error fetching claim clusters: {e}")
+            return {"precision": precision, "clusters": []}
+
+    async def get_claim_by_id(self, claim_id: int, include_full_data: bool = True) -> Optional[Dict[str, Any]]:
+        try:
+            async with async_session_scope() as db:
+                claim = (await db.execute(select_claim_by_id(claim_id, include_full_data))).scalars().first()
+                return claim.to_dict(include_full_data=include_full_data) if claim else None
+        except Exception as e:
+            print(f"❌ Error fetching claim {claim_id}: {e}")
+            return None
+
+    async def create_claim(self, claim_data: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            async with async_session_scope() as db:
+                new_claim = Claim.from_dict(claim_data)
+                db.add(new_claim)
+                await db.flush()
+                return {
+                    "success": True,
+                    "claim_id": new_claim.id,
+                    "message": f"Claim created for {new_claim.claimant_name}"
+                }
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    async def bulk_create_claims(self, claims: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        rows = claim_insert_rows(claims)
+        try:
+            async with async_session_scope() as db:
+                claim_ids = (await db.execute(insert_claims(), rows)).scalars().all()
+                await db.run_sync(lambda session: apply_cluster_deltas(session.connection(), inserted_cluster_changes(rows)))
+            return [{"success": True, "claim_id": claim_id} for claim_id in claim_ids]
+        except Exception as e:
+            print(f"⚠ Bulk insert of {len(rows)} claims failed, isolating bad rows: {e}")
+
+        results = []
+        async with async_session_scope() as db:
+            for row in rows:
+                try:
+                    async with db.begin_nested():
+                        claim_id = (await db.execute(insert_claims(), row)).scalar_one()
+                        await db.run_sync(lambda session: apply_cluster_deltas(session.connection(), inserted_cluster_changes([row])))
+                    results.append({"success": True, "claim_id": claim_id})
+                except Exception as e:
+                    results.append({"success": False, "error": str(getattr(e, "orig", e))})  # Driver error, without the SQL
+        return results
+
+    async def _get_claim(self, db: AsyncSession, claim_id: int, with_gis: bool = False) -> Optional[Claim]:
+        stmt = select(Claim).where(Claim.id == claim_id)
+        if with_gis:
+            # Delete cascades through GIS rows; lazy loads aren't possible under asyncio
+            stmt = stmt.options(
+                selectinload(Claim.gis_assets).selectinload(GISAsset.analytics),
+                selectinload(Claim.gis_analytics)
+            )
+        return (await db.execute(stmt)).scalars().first()
+
+    async def update_claim_status(self, claim_id: int, new_status: str, notes: str = "") -> Dict[str, Any]:
+        try:
+            async with async_session_scope() as db:
+                claim = await self._get_claim(db, claim_id)
+                if not claim:
+                    return {"success": False, "error": "Claim not found"}
+                old_status = claim.status
+                claim.status = new_status
+                if notes:
+                    claim.verification_notes = notes
+                return {
+                    "success": True,
+                    "status": "success",  # Added for frontend compatibility
+                    "message": f"Claim {claim_id} status updated from '{old_status}' to '{new_status}'"
+                }
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    async def update_claim(self, claim_id: int, updates: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            async with async_session_scope() as db:
+                claim = await self._get_claim(db, claim_id)
+                if not claim:
+                    return {"success": False, "error": "Claim not found"}
+                for field, value in updates.items():
+                    if hasattr(claim, field):
+                        setattr(claim, field, value)
+                return {
+                    "success": True,
+                    "message": f"Claim {claim_id} updated successfully",
+                    "updated_fields": list(updates.keys())
+                }
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    async def delete_claim(self, claim_id: int) -> Dict[str, Any]:
+        try:
+            async with async_session_scope() as db:
+                claim = await self._get_claim(db, claim_id, with_gis=True)
+                if not claim:
+                    return {"success": False, "error": "Claim not found"}
+                claimant_name = claim.claimant_name
+                await db.delete(claim)
+                return {
+                    "success": True,
+                    "status": "success",  # Added for frontend compatibility
+                    "message": f"Claim {claim_id} for {claimant_name} deleted successfully"
+                }
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    async def set_claim_geometry(self, claim_id: int, geojson: Dict[str, Any]) -> Dict[str, Any]:
+        """Store (or replace) a claim's parcel boundary from GeoJSON"""
+        try:
+            values = claim_geometry_values(geojson)
+        except (ValueError, TypeError, KeyError, IndexError) as e:
+            return {"success": False, "error": f"Invalid boundary: {e}"}
+        try:
+            async with async_session_scope() as db:
+                if await db.scalar(select(Claim.id).where(Claim.id == claim_id)) is None:
+                    return {"success": False, "error": "Claim not found"}
+                boundary = await db.get(ClaimGeometry, claim_id)
+                if boundary is None:
+                    db.add(ClaimGeometry(claim_id=claim_id, **values))
+                else:
+                    for column, value in values.items():
+                        setattr(boundary, column, value)
+                return {
+                    "success": True,
+                    "claim_id": claim_id,
+                    "polygons": len(values["geometry"]["coordinates"]),
+                    "bounds": [values[column] for column in GEOMETRY_BOUND_COLUMNS]
+                }
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    async def assign_claim_to_officer(self, claim_id: int, officer_name: str) -> Dict[str, Any]:
+        try:
+            async with async_session_scope() as db:
+                claim = await self._get_claim(db, claim_id)
+                if not claim:
+                    return {"success": False, "error": "Claim not found"}
+                claim.assigned_officer = officer_name
+                return {
+                    "success": True,
+                    "message": f"Claim {claim_id} assigned to {officer_name}"
+                }
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    async def search_claims_page(
+        self,
+        query: str,
+        limit: int = SEARCH_RESULT_LIMIT,
+        cursor: Optional[str] = None,
+        include_full_data: bool = False
+    ) -> Dict[str, Any]:
+        try:
+            async with async_session_scope() as db:
+                rows = (await db.execute(select_search_page(query, limit, cursor, include_full_data))).all()
+                return search_page(rows, limit, include_full_data)
+        except InvalidCursorError:
+            raise
+        except Exception as e:
+            print(f"❌ Search error: {e}")
+            return {"claims": [], "next_cursor": None}
+
+    async def search_claims(self, query: str, include_full_data: bool = False) -> List[Dict[str, Any]]:
+        try:
+            async with async_session_scope() as db:
+                claims = (await db.execute(select_search_claims(query, include_full_data))).scalars().all()
+                return [claim.to_dict(include_full_data=include_full_data) for claim in claims]
+        except Exception as e:
+            print(f"❌ Search error: {e}")
+            return []
+
+    async def get_claims_by_status(self, status: str, include_full_data: bool = False) -> List[Dict[str, Any]]:
+        try:
+            async with async_session_scope() as db:
+                claims = (await db.execute(select_claims_by_status(status, include_full_data))).scalars().all()
+                return [claim.to_dict(include_full_data=include_full_data) for claim in claims]
+        except Exception as e:
+            print(f"❌ Error filtering by status: {e}")
+            return []
+
+    async def get_claims_by_district(self, district: str, include_full_data: bool = False) -> List[Dict[str, Any]]:
+        try:
+            async with async_session_scope() as db:
+                claims = (await db.execute(select_claims_by_district(district, include_full_data))).scalars().all()
+                return [claim.to_dict(include_full_data=include_full_data) for claim in claims]
+        except Exception as e:
+            print(f"❌ Error filtering by district: {e}")
+            return []
+
+
+async_claims_service = AsyncClaimsService()
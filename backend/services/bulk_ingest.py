@@ -0,0 +1,156 @@
+# services/bulk_ingest.py
+"""
+Bulk claim ingestion from streamed request bodies
+
+Records are parsed incrementally from NDJSON or a top-level JSON array, so a
+register of tens of thousands of claims never sits in memory as one document.
+Valid records are inserted in batches, one transaction per batch.
+"""
+import os
+import json
+import codecs
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+BULK_INSERT_BATCH_SIZE = int(os.getenv("BULK_INSERT_BATCH_SIZE", "1000"))
+BULK_INGEST_MAX_ROWS = int(os.getenv("BULK_INGEST_MAX_ROWS", "100000"))
+
+# (record, parse error) - exactly one is set
+ParsedRecord = Tuple[Optional[Any], Optional[str]]
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRecord]:
+    """One record per non-empty line; a malformed line fails only that row"""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            if line.strip():
+                yield _parse_line(line)
+    buffer += decoder.decode(b"", final=True)
+    if buffer.strip():
+        yield _parse_line(buffer)
+
+
+def _parse_line(line: str) -> ParsedRecord:
+    try:
+        return json.loads(line), None
+    except json.JSONDecodeError as e:
+        return None, f"Invalid JSON: {e}"
+
+
+async def iter_json_array(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRecord]:
+    """
+    Elements of a top-level JSON array, decoded as soon as each one is complete
+    A syntax error ends the stream - there is no way to resynchronize
+    """
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    json_decoder = json.JSONDecoder()
+    chunks = chunks.__aiter__()
+    buffer = ""
+    position = 0
+    final = False
+    expect = "["  # "[" -> value or "]" -> "," or "]" -> value ...
+
+    while True:
+        while position < len(buffer) and buffer[position].isspace():
+            position += 1
+
+        need_more = position == len(buffer)
+        if not need_more and expect == "value":
+            try:
+                record, end = json_decoder.raw_decode(buffer, position)
+                # A value running into the end of the buffer may continue in the next chunk
+                need_more = end == len(buffer) and not final
+            except json.JSONDecodeError as e:
+                if final:
+                    yield None, f"Invalid JSON: {e}"
+                    return
+                need_more = True
+
+        if need_more:
+            if final:
+                yield None, "Unexpected end of JSON array"
+                return
+            try:
+                buffer = buffer[position:] + text_decoder.decode(await chunks.__anext__())
+            except StopAsyncIteration:
+                buffer = buffer[position:] + text_decoder.decode(b"", final=True)
+                final = True
+            position = 0
+            continue
+
+        char = buffer[position]
+        if expect == "value":
+            yield record, None
+            position = end
+            expect = ","
+        elif char == "]" and expect in ("first", ","):
+            return
+        elif expect == "[" and char == "[":
+            position += 1
+            expect = "first"
+        elif expect == "first":
+            expect = "value"
+        elif expect == "," and char == ",":
+            position += 1
+            expect = "value"
+        else:
+            yield None, "Request body must be a JSON array" if expect == "[" else f"Expected ',' or ']' in JSON array, found {char!r}"
+            return
+
+
+async def ingest_claims(
+    records: AsyncIterator[ParsedRecord],
+    prepare: Callable[[Any], Dict[str, Any]],
+    insert_batch: Callable[[List[Dict[str, Any]]], Awaitable[List[Dict[str, Any]]]],
+    batch_size: int = BULK_INSERT_BATCH_SIZE,
+    max_rows: int = BULK_INGEST_MAX_ROWS
+) -> Dict[str, Any]:
+    """
+    Validate each record with prepare() and insert valid ones through insert_batch()
+    Returns per-row results (1-based row numbers) in input order
+    """
+    results: List[Dict[str, Any]] = []
+    batch: List[Tuple[int, Dict[str, Any]]] = []
+    row = 0
+    truncated = False
+
+    async def flush():
+        outcomes = await insert_batch([claim for _, claim in batch])
+        for (batch_row, _), outcome in zip(batch, outcomes):
+            results.append({"row": batch_row, **outcome})
+        batch.clear()
+
+    async for record, parse_error in records:
+        row += 1
+        if row > max_rows:
+            truncated = True
+            break
+        if parse_error:
+            results.append({"row": row, "success": False, "error": parse_error})
+            continue
+        try:
+            batch.append((row, prepare(record)))
+        except (ValueError, TypeError) as e:
+            results.append({"row": row, "success": False, "error": str(e)})
+            continue
+        if len(batch) >= batch_size:
+            await flush()
+
+    if batch:
+        await flush()
+
+    results.sort(key=lambda result: result["row"])
+    created = sum(1 for result in results if result["success"])
+    return {
+        "received": len(results),
+        "created": created,
+        "failed": len(results) - created,
+        "truncated": truncated,
+        "results": results
+    }
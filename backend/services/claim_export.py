@@ -0,0 +1,89 @@
+# services/claim_export.py
+"""
+Row-by-row claim export serializers (NDJSON, CSV, GeoJSON)
+
+Each serializer consumes an async iterator of export rows and yields text
+chunks for a StreamingResponse, so nothing beyond the current cursor batch is
+held in memory.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Dict
+
+from .claims_service import EXPORT_COLUMNS
+
+# Rows serialized per yielded chunk - fewer, larger writes to the socket
+ROWS_PER_CHUNK = 200
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "geojson": ("application/geo+json", "geojson")
+}
+
+
+def _json_value(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, (datetime, date)) else value
+
+
+async def _chunked(lines: AsyncIterator[str]) -> AsyncIterator[str]:
+    buffer = []
+    async for line in lines:
+        buffer.append(line)
+        if len(buffer) >= ROWS_PER_CHUNK:
+            yield "".join(buffer)
+            buffer.clear()
+    if buffer:
+        yield "".join(buffer)
+
+
+async def _ndjson_lines(rows: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    async for row in rows:
+        yield json.dumps({key: _json_value(value) for key, value in row.items()}, ensure_ascii=False) + "\n"
+
+
+async def _csv_lines(rows: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    async for row in rows:
+        writer.writerow({key: _json_value(value) for key, value in row.items()})
+        yield output.getvalue()
+        output.seek(0)
+        output.truncate()
+    yield output.getvalue()
+
+
+async def _geojson_lines(rows: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    """FeatureCollection of claim points; claims without coordinates have null geometry"""
+    yield '{"type": "FeatureCollection", "features": [\n'
+    separator = ""
+    async for row in rows:
+        latitude, longitude = row.get("latitude"), row.get("longitude")
+        geometry = (
+            {"type": "Point", "coordinates": [longitude, latitude]}
+            if latitude is not None and longitude is not None else None
+        )
+        feature = {
+            "type": "Feature",
+            "id": row["id"],
+            "geometry": geometry,
+            "properties": {key: _json_value(value) for key, value in row.items() if key not in ("latitude", "longitude")}
+        }
+        yield separator + json.dumps(feature, ensure_ascii=False)
+        separator = ",\n"
+    yield "\n]}\n"
+
+
+SERIALIZERS = {
+    "ndjson": _ndjson_lines,
+    "csv": _csv_lines,
+    "geojson": _geojson_lines
+}
+
+
+def export_stream(rows: AsyncIterator[Dict[str, Any]], export_format: str) -> AsyncIterator[str]:
+    """Text chunks of the export in the requested format"""
+    return _chunked(SERIALIZERS[export_format](rows))
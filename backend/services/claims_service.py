@@ -1,21 +1,90 @@
-from sqlalchemy import create_engine, desc, func, and_, or_, Column, Integer, String, DateTime, Text, Float, JSON, Boolean, ForeignKey
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy import create_engine, desc, func, delete, insert, and_, or_, case, literal, literal_column, false, true, tuple_, select, event, inspect, DDL, Index, Select, Column, Integer, String, DateTime, Text, Float, JSON, Boolean, ForeignKey
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import sessionmaker, relationship, column_property, deferred, defer, undefer_group, object_session, Session
 from sqlalchemy.sql import func
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+from contextlib import contextmanager
 import os
 import json
+import base64
+import math
 from dotenv import load_dotenv
+
+from .transliteration import phonetic_key, search_document
+from . import geohash
  
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL, echo=False)
+# Connection pool sizing - per worker process
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+# Upper bound on ranked search results per request
+SEARCH_RESULT_LIMIT = int(os.getenv("SEARCH_RESULT_LIMIT", "50"))
+
+# Dashboard statistics are read from claim_stats_summary, rebuilt once it is older than this
+STATS_MAX_STALENESS_SECONDS = int(os.getenv("STATS_MAX_STALENESS_SECONDS", "60"))
+RECENT_CLAIMS_DAYS = 7
+
+# Map viewport queries: "postgis" uses claims.geom (004_add_gis_extensions.sql), "geohash" the Claim.geohash prefixes
+CLAIMS_SPATIAL_INDEX = os.getenv("CLAIMS_SPATIAL_INDEX", "geohash")
+# Claims per viewport: MAP_MIN_POINTS up to MAP_DETAIL_ZOOM, doubling per zoom level beyond, capped at MAP_MAX_POINTS
+MAP_MIN_POINTS = int(os.getenv("MAP_MIN_POINTS", "250"))
+MAP_MAX_POINTS = int(os.getenv("MAP_MAX_POINTS", "5000"))
+MAP_DETAIL_ZOOM = 6
+
+# Geohash lengths claim_clusters is kept at; 7 characters is a cell of about 150 m
+CLUSTER_PRECISIONS = range(1, 8)
+
+engine = create_engine(
+    DATABASE_URL,
+    echo=False,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=True
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+
+@contextmanager
+def session_scope() -> Iterator[Session]:
+    """Unit of work: a fresh session per call, committed on success and rolled back on error"""
+    db = SessionLocal()
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def get_pool_status() -> Dict[str, Any]:
+    """Connection pool statistics for monitoring"""
+    pool = engine.pool
+    status = {"pool_class": type(pool).__name__, "status": pool.status()}
+    if hasattr(pool, "checkedout"):
+        status.update({
+            "pool_size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "max_overflow": DB_MAX_OVERFLOW,
+            "pool_timeout_seconds": DB_POOL_TIMEOUT
+        })
+    return status
+
 class Claim(Base):
     __tablename__ = "claims"
 
@@ -30,7 +99,7 @@ class Claim(Base):
     
     status = Column(String(50), default="Pending", index=True)
     priority = Column(String(20), default="Medium")
-    submission_date = Column(DateTime, default=func.now())
+    submission_date = Column(DateTime, default=datetime.now, nullable=False)  # Python-side: cursors compare equal on SQLite
     
     is_verified = Column(Boolean, default=False)
     verification_notes = Column(Text)
@@ -49,10 +118,62 @@ class Claim(Base):
     
     latitude = Column(Float)
     longitude = Column(Float)
+    # Geohash of (latitude, longitude) - maintained by _update_geohash
+    geohash = Column(String(12))
+
+    # Phonetic keys of the searchable names - maintained by _update_search_text
+    search_text = deferred(Column(Text))
+
+    # Computed in SQL for full claim data (see _with_full_data) - the OCR text itself isn't needed
+    raw_text_length = column_property(
+        func.coalesce(func.length(ocr_metadata["raw_text"].as_string()), 0),
+        deferred=True,
+        group="full_data"
+    )
     
     gis_assets = relationship("GISAsset", back_populates="claim", cascade="all, delete-orphan")
     gis_analytics = relationship("GISAnalytics", back_populates="claim", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Keyset pagination order - see select_claims_page
+        Index("ix_claims_submission_date_id", "submission_date", "id"),
+        # Serves the <% word-similarity match in search_rank (pg_trgm)
+        Index(
+            "ix_claims_search_text_trgm", "search_text",
+            postgresql_using="gin", postgresql_ops={"search_text": "gin_trgm_ops"}
+        ),
+        # Prefix (LIKE 'abc%') scans in spatial_filters
+        Index("ix_claims_geohash", "geohash", postgresql_ops={"geohash": "varchar_pattern_ops"}),
+    )
+
+    @classmethod
+    def from_dict(cls, claim_data: Dict[str, Any]) -> "Claim":
+        """Build a new claim from API/OCR claim data, applying defaults"""
+        return cls(**cls.column_values(claim_data))
+
+    @staticmethod
+    def column_values(claim_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Column values for a new claim from API/OCR claim data, applying defaults"""
+        return {
+            "claimant_name": claim_data.get("claimant_name", "Unknown"),
+            "village_name": claim_data.get("village_name"),
+            "district": claim_data.get("district", "Unknown"),
+            "state": claim_data.get("state", "Odisha"),
+            "form_type": claim_data.get("form_type", "Unknown"),
+            "form_subtype": claim_data.get("form_subtype"),
+            "status": claim_data.get("status", "OCR Processed"),
+            "priority": claim_data.get("priority", "Medium"),
+            "comments": claim_data.get("comments", ""),
+            "document_filename": claim_data.get("document_filename"),
+            "ocr_metadata": claim_data.get("ocr_metadata", {}),
+            "extracted_fields": claim_data.get("extracted_fields", {}),
+            "latitude": claim_data.get("latitude"),
+            "longitude": claim_data.get("longitude"),
+            "form_doc_url": claim_data.get("form_doc_url"),
+            "geojson_file_url": claim_data.get("geojson_file_url"),
+            "supporting_doc_urls": claim_data.get("supporting_doc_urls")
+        }
+
     def to_dict(self, include_full_data=False):
         """Enhanced to_dict with proper field mapping"""
         basic_data = {
@@ -96,15 +217,15 @@ class Claim(Base):
                 "full_name": extracted_data.get("FullName"),
                 "holder_names": extracted_data.get("HolderNames"),
                 "gis_analysis": {
-                    "has_analysis": len(self.gis_assets) > 0,
-                    "assets_count": len(self.gis_assets),
-                    "analytics_count": len(self.gis_analytics)
+                    "has_analysis": self.gis_assets_count > 0,
+                    "assets_count": self.gis_assets_count,
+                    "analytics_count": self.gis_analytics_count
                 },
                 "processing_info": {
                     "atlas_version": ocr_data.get("atlas_version", "1.0.0"),
                     "form_detection": ocr_data.get("form_subtype"),
                     "ocr_confidence": ocr_data.get("confidence"),
-                    "raw_text_length": len(ocr_data.get("raw_text", ""))
+                    "raw_text_length": self.raw_text_length
                 }
             })
         
@@ -143,69 +264,772 @@ class GISAnalytics(Base):
     claim = relationship("Claim", back_populates="gis_analytics")
     asset = relationship("GISAsset", back_populates="analytics")
 
+class ClaimStatsSummary(Base):
+    """Claim counts per (status, district, form subtype, priority) - rebuilt by refresh_claim_stats"""
+    __tablename__ = "claim_stats_summary"
+
+    id = Column(Integer, primary_key=True)
+    status = Column(String(50))
+    district = Column(String(100))
+    form_subtype = Column(String(50))
+    priority = Column(String(20))
+    total = Column(Integer, nullable=False, default=0)
+    verified = Column(Integer, nullable=False, default=0)
+    recent = Column(Integer, nullable=False, default=0)
+    gis_analyzed = Column(Integer, nullable=False, default=0)
+
+class ClaimStatsRefresh(Base):
+    """Single row recording when claim_stats_summary was last rebuilt"""
+    __tablename__ = "claim_stats_refresh"
+
+    id = Column(Integer, primary_key=True)
+    refreshed_at = Column(DateTime)
+
+class ClaimCluster(Base):
+    """
+    Claim count and coordinate sums per (geohash cell, status) at every
+    CLUSTER_PRECISIONS length - kept current by apply_cluster_deltas
+    """
+    __tablename__ = "claim_clusters"
+
+    precision = Column(Integer, primary_key=True)
+    cell = Column(String(12), primary_key=True)
+    status = Column(String(50), primary_key=True)
+    claim_count = Column(Integer, nullable=False, default=0)
+    latitude_sum = Column(Float, nullable=False, default=0.0)
+    longitude_sum = Column(Float, nullable=False, default=0.0)
+
+    __table_args__ = (
+        # Prefix (LIKE 'abc%') scans in select_claim_clusters
+        Index("ix_claim_clusters_precision_cell", "precision", "cell", postgresql_ops={"cell": "varchar_pattern_ops"}),
+    )
+
+class ClaimGeometry(Base):
+    """Parcel boundary of a claim, as a GeoJSON MultiPolygon - set by set_claim_geometry"""
+    __tablename__ = "claim_geometries"
+
+    claim_id = Column(Integer, ForeignKey("claims.id", ondelete="CASCADE"), primary_key=True)
+    geometry = Column(JSON, nullable=False)
+    min_latitude = Column(Float, nullable=False)
+    min_longitude = Column(Float, nullable=False)
+    max_latitude = Column(Float, nullable=False)
+    max_longitude = Column(Float, nullable=False)
+    # Smallest geohash cell containing the whole boundary ("" for continent-sized ones)
+    cell = Column(String(12), nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_claim_geometries_cell", "cell", postgresql_ops={"cell": "varchar_pattern_ops"}),
+    )
+
+    @property
+    def bounds(self) -> Tuple[float, float, float, float]:
+        return self.min_latitude, self.min_longitude, self.max_latitude, self.max_longitude
+
+# GIS row counts as correlated subqueries, loaded with the claim instead of both relationships
+Claim.gis_assets_count = column_property(
+    select(func.count(GISAsset.id)).where(GISAsset.claim_id == Claim.id).correlate_except(GISAsset).scalar_subquery(),
+    deferred=True,
+    group="full_data"
+)
+Claim.gis_analytics_count = column_property(
+    select(func.count(GISAnalytics.id)).where(GISAnalytics.claim_id == Claim.id).correlate_except(GISAnalytics).scalar_subquery(),
+    deferred=True,
+    group="full_data"
+)
+
+SEARCHABLE_FIELDS = ("claimant_name", "village_name", "district", "document_filename")
+
+@event.listens_for(Claim, "before_insert")
+@event.listens_for(Claim, "before_update")
+def _update_search_text(mapper, connection, claim: Claim):
+    claim.search_text = search_document(getattr(claim, field) for field in SEARCHABLE_FIELDS)
+
+def claim_geohash(latitude: Optional[float], longitude: Optional[float]) -> Optional[str]:
+    return geohash.encode(latitude, longitude) if latitude is not None and longitude is not None else None
+
+@event.listens_for(Claim, "before_insert")
+@event.listens_for(Claim, "before_update")
+def _update_geohash(mapper, connection, claim: Claim):
+    claim.geohash = claim_geohash(claim.latitude, claim.longitude)
+
+event.listen(
+    Claim.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
+
+# Claim SELECTs shared by ClaimsService and AsyncClaimsService
+
+class InvalidCursorError(ValueError):
+    """Raised for a pagination cursor that wasn't issued by encode_cursor"""
+
+def _encode_position(*values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+def _decode_position(cursor: str) -> list:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded))
+
+def encode_cursor(claim: Claim) -> str:
+    """Opaque keyset cursor for the (submission_date, id) position of a claim"""
+    return _encode_position(claim.submission_date.isoformat(), claim.id)
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        submission_date, claim_id = _decode_position(cursor)
+        return datetime.fromisoformat(submission_date), int(claim_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+
+def decode_search_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        score, claim_id = _decode_position(cursor)
+        return float(score), int(claim_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+
+# Large JSON payloads (OCR raw text, extracted fields) only shown in full claim data
+HEAVY_COLUMNS = (Claim.ocr_metadata, Claim.extracted_fields)
+
+def _with_full_data(stmt: Select, include_full_data: bool) -> Select:
+    """
+    Full claim data adds GIS counts and raw text length - fetched in the same query
+    Summaries leave the heavy JSON columns in the database; touching one raises
+    instead of silently lazy-loading it row by row
+    """
+    if include_full_data:
+        return stmt.options(undefer_group("full_data"))
+    return stmt.options(*(defer(column, raiseload=True) for column in HEAVY_COLUMNS))
+
+def _claim_id_query(query: str) -> Optional[int]:
+    """Claim ID searches (e.g., "FRA-001" or "001")"""
+    clean_query = query.upper().replace("FRA-", "").strip()
+    return int(clean_query) if clean_query.isdigit() else None
+
+def search_rank(query: str):
+    """
+    (relevance score, WHERE clause) for a search query
+    The query is reduced to the same phonetic key as Claim.search_text, so Odia,
+    Devanagari and variant Latin spellings meet; PostgreSQL ranks by pg_trgm
+    word similarity through the GIN index, other databases fall back to LIKE
+    """
+    key = phonetic_key(query)
+    if not key:
+        score, match = literal(0.0), false()
+    elif engine.dialect.name == "postgresql":
+        score = func.word_similarity(key, Claim.search_text)
+        match = literal(key).op("<%")(Claim.search_text)
+    else:
+        score = case((Claim.search_text.like(f"{key}%"), 1.0), else_=0.5)
+        match = Claim.search_text.like(f"%{key}%")
+
+    claim_id = _claim_id_query(query)
+    if claim_id is not None:
+        score = case((Claim.id == claim_id, 2.0), else_=score)  # Exact ID hit ranks first
+        match = or_(match, Claim.id == claim_id)
+    return score, match
+
+def claim_filters(
+    status: Optional[str] = None,
+    district: Optional[str] = None,
+    form_subtype: Optional[str] = None,
+    submitted_from: Optional[datetime] = None,
+    submitted_to: Optional[datetime] = None
+) -> list:
+    """WHERE clauses for the claim listing filters that are set"""
+    filters = []
+    if status:
+        filters.append(Claim.status == status)
+    if district:
+        filters.append(Claim.district.ilike(f"%{district}%"))
+    if form_subtype:
+        filters.append(Claim.form_subtype == form_subtype)
+    if submitted_from:
+        filters.append(Claim.submission_date >= submitted_from)
+    if submitted_to:
+        filters.append(Claim.submission_date < submitted_to)
+    return filters
+
+def select_claims_page(filters: list, limit: int = 100, cursor: Optional[str] = None, include_full_data: bool = False) -> Select:
+    """
+    Newest-first keyset page: seeks past the cursor on ix_claims_submission_date_id
+    instead of OFFSET, so every page costs the same however deep it is.
+    Fetches limit + 1 rows; see claims_page.
+    """
+    stmt = select(Claim).where(*filters)
+    if cursor:
+        stmt = stmt.where(tuple_(Claim.submission_date, Claim.id) < tuple_(*decode_cursor(cursor)))
+    stmt = stmt.order_by(desc(Claim.submission_date), desc(Claim.id)).limit(limit + 1)
+    return _with_full_data(stmt, include_full_data)
+
+def claims_page(claims: List[Claim], limit: int, include_full_data: bool = False) -> Dict[str, Any]:
+    """Serialize a select_claims_page result; next_cursor is None on the last page"""
+    page = claims[:limit]
+    return {
+        "claims": [claim.to_dict(include_full_data=include_full_data) for claim in page],
+        "next_cursor": encode_cursor(page[-1]) if len(claims) > limit else None
+    }
+
+def select_search_page(query: str, limit: int = SEARCH_RESULT_LIMIT, cursor: Optional[str] = None, include_full_data: bool = False) -> Select:
+    """Most relevant claims first, keyset-paged on (score, id); rows are (Claim, score)"""
+    score, match = search_rank(query)
+    score = score.label("score")
+    stmt = select(Claim, score).where(match)
+    if cursor:
+        stmt = stmt.where(tuple_(score, Claim.id) < tuple_(*decode_search_cursor(cursor)))
+    stmt = stmt.order_by(desc(score), desc(Claim.id)).limit(limit + 1)
+    return _with_full_data(stmt, include_full_data)
+
+def search_page(rows: list, limit: int, include_full_data: bool = False) -> Dict[str, Any]:
+    """Serialize a select_search_page result, with each claim's relevance"""
+    page = rows[:limit]
+    claims = []
+    for claim, score in page:
+        claim_dict = claim.to_dict(include_full_data=include_full_data)
+        claim_dict["search_score"] = round(float(score), 4)
+        claims.append(claim_dict)
+    return {
+        "claims": claims,
+        "next_cursor": _encode_position(float(page[-1][1]), page[-1][0].id) if len(rows) > limit else None
+    }
+
+# Summary columns written by the claim exports - no JSON payloads
+EXPORT_COLUMNS = (
+    "id", "claimant_name", "village_name", "district", "state", "form_type", "form_subtype",
+    "status", "priority", "submission_date", "is_verified", "assigned_officer",
+    "document_filename", "latitude", "longitude"
+)
+
+def select_export_claims(filters: list) -> Select:
+    """Plain rows (not ORM objects) in id order, for server-side cursor streaming"""
+    return select(*(getattr(Claim, column) for column in EXPORT_COLUMNS)).where(*filters).order_by(Claim.id)
+
+# Map viewport and radius queries
+
+# Generated point column added by 004_add_gis_extensions.sql - not mapped, PostGIS only
+CLAIM_GEOM = literal_column("claims.geom")
+
+def viewport_limit(zoom: int) -> int:
+    """Most claims a map view at this zoom level gets - the more zoomed out, the fewer"""
+    return min(MAP_MAX_POINTS, MAP_MIN_POINTS << max(zoom - MAP_DETAIL_ZOOM, 0))
+
+def _postgis_enabled() -> bool:
+    return CLAIMS_SPATIAL_INDEX == "postgis" and engine.dialect.name == "postgresql"
+
+def spatial_filters(south: float, west: float, north: float, east: float) -> list:
+    """
+    WHERE clauses for claims inside a bbox, served by the GiST index on
+    claims.geom, or else by geohash prefix scans narrowed by exact coordinates
+    """
+    if _postgis_enabled():
+        return [func.ST_Intersects(CLAIM_GEOM, func.ST_MakeEnvelope(west, south, east, north, 4326))]
+    filters = [Claim.latitude.between(south, north), Claim.longitude.between(west, east)]
+    cells = geohash.covering_cells(south, west, north, east)
+    if cells:
+        filters.insert(0, or_(*(Claim.geohash.like(f"{cell}%") for cell in cells)))
+    return filters
+
+def radius_rank(latitude: float, longitude: float, radius_m: float):
+    """
+    (distance ordering, WHERE clauses) for claims within radius_m of a point
+    Without PostGIS the distance is equirectangular - plain arithmetic any
+    database can evaluate, accurate to well under 1% at district scale
+    """
+    filters = spatial_filters(*geohash.radius_bbox(latitude, longitude, radius_m))
+    if _postgis_enabled():
+        origin = func.ST_SetSRID(func.ST_MakePoint(longitude, latitude), 4326)
+        distance = func.ST_Distance(func.geography(CLAIM_GEOM), func.geography(origin))
+        filters.append(func.ST_DWithin(func.geography(CLAIM_GEOM), func.geography(origin), radius_m))
+        return distance, filters
+    # Squared distance in degrees of latitude; ordering doesn't need the square root
+    x_scale = math.cos(math.radians(latitude))
+    dx = (Claim.longitude - longitude) * x_scale
+    dy = Claim.latitude - latitude
+    distance = dx * dx + dy * dy
+    filters.append(distance <= (radius_m / geohash.METERS_PER_DEGREE) ** 2)
+    return distance, filters
+
+def select_claims_in_area(filters: list, order_by: list, limit: int) -> Select:
+    """Summary claims for a map query; fetches limit + 1 rows, see area_page"""
+    stmt = select(Claim).where(*filters).order_by(*order_by).limit(limit + 1)
+    return _with_full_data(stmt, False)
+
+def area_page(claims: List[Claim], limit: int, origin: Optional[Tuple[float, float]] = None) -> Dict[str, Any]:
+    """Serialize a select_claims_in_area result; truncated when the area held more than limit claims"""
+    page = []
+    for claim in claims[:limit]:
+        claim_dict = claim.to_dict()
+        if origin:
+            claim_dict["distance_m"] = round(geohash.haversine_m(*origin, claim.latitude, claim.longitude), 1)
+        page.append(claim_dict)
+    return {"claims": page, "limit": limit, "truncated": len(claims) > limit}
+
+# Map clusters - claim_clusters is maintained incrementally on every claim insert, update and delete
+
+def cluster_precision(zoom: int) -> int:
+    """Geohash length giving a few dozen clusters across a map view at this zoom level"""
+    return min(max((2 * zoom + 4) // 5, CLUSTER_PRECISIONS[0]), CLUSTER_PRECISIONS[-1])
+
+def _cluster_status(status: Optional[str]) -> str:
+    return status or "Unknown"
+
+def cluster_deltas(changes: Iterable[Tuple[Optional[str], Optional[str], Optional[float], Optional[float], int]]) -> List[Dict[str, Any]]:
+    """
+    claim_clusters increments for (geohash, status, latitude, longitude, +1/-1)
+    claim changes, merged per row and sorted so concurrent writers lock rows in
+    the same order
+    """
+    deltas: Dict[Tuple[int, str, str], List[float]] = {}
+    for claim_geohash, status, latitude, longitude, sign in changes:
+        if not claim_geohash:
+            continue
+        for precision in CLUSTER_PRECISIONS:
+            delta = deltas.setdefault((precision, claim_geohash[:precision], _cluster_status(status)), [0, 0.0, 0.0])
+            delta[0] += sign
+            delta[1] += sign * latitude
+            delta[2] += sign * longitude
+    return [
+        {"precision": precision, "cell": cell, "status": status, "claim_count": count, "latitude_sum": latitude_sum, "longitude_sum": longitude_sum}
+        for (precision, cell, status), (count, latitude_sum, longitude_sum) in sorted(deltas.items())
+        if count or latitude_sum or longitude_sum
+    ]
+
+def upsert_claim_clusters():
+    """INSERT ... ON CONFLICT adding each cluster_deltas row to the stored counts"""
+    stmt = (sqlite_insert if engine.dialect.name == "sqlite" else postgresql_insert)(ClaimCluster)
+    return stmt.on_conflict_do_update(
+        index_elements=["precision", "cell", "status"],
+        set_={
+            column: getattr(ClaimCluster, column) + getattr(stmt.excluded, column)
+            for column in ("claim_count", "latitude_sum", "longitude_sum")
+        }
+    )
+
+def apply_cluster_deltas(connection, changes) -> None:
+    deltas = cluster_deltas(changes)
+    if deltas:
+        connection.execute(upsert_claim_clusters(), deltas)
+
+def inserted_cluster_changes(rows: List[Dict[str, Any]]):
+    """cluster_deltas changes for claim_insert_rows rows - bulk inserts skip the mapper events"""
+    return [(row["geohash"], row["status"], row["latitude"], row["longitude"], 1) for row in rows]
+
+@event.listens_for(Claim, "after_insert")
+def _cluster_insert(mapper, connection, claim: Claim):
+    apply_cluster_deltas(connection, [(claim.geohash, claim.status, claim.latitude, claim.longitude, 1)])
+
+@event.listens_for(Claim, "after_delete")
+def _cluster_delete(mapper, connection, claim: Claim):
+    apply_cluster_deltas(connection, [(claim.geohash, claim.status, claim.latitude, claim.longitude, -1)])
+
+@event.listens_for(Claim, "after_update")
+def _cluster_update(mapper, connection, claim: Claim):
+    state = inspect(claim)
+    fields = ("geohash", "status", "latitude", "longitude")
+    histories = [state.attrs[field].history for field in fields]
+    if not any(history.has_changes() for history in histories):
+        return
+    current = [getattr(claim, field) for field in fields]
+    previous = [
+        history.deleted[0] if history.deleted else value
+        for history, value in zip(histories, current)
+    ]
+    apply_cluster_deltas(connection, [(*previous, -1), (*current, 1)])
+
+# Parcel boundaries and geometry change tracking
+
+GEOMETRY_BOUND_COLUMNS = ("min_latitude", "min_longitude", "max_latitude", "max_longitude")
+
+def boundary_polygons(geojson: Dict[str, Any]) -> List[List[List[List[float]]]]:
+    """
+    Polygons ([exterior, *holes] rings of [lon, lat]) of a GeoJSON FeatureCollection,
+    Feature or geometry; anything other than (Multi)Polygons is ignored
+    """
+    if not isinstance(geojson, dict):
+        raise ValueError("GeoJSON must be an object")
+    geojson_type = geojson.get("type")
+    if geojson_type == "FeatureCollection":
+        return [polygon for feature in geojson.get("features") or [] for polygon in boundary_polygons(feature)]
+    if geojson_type == "Feature":
+        return boundary_polygons(geojson["geometry"]) if geojson.get("geometry") else []
+    if geojson_type == "GeometryCollection":
+        return [polygon for geometry in geojson.get("geometries") or [] for polygon in boundary_polygons(geometry)]
+    polygons = {"Polygon": [geojson.get("coordinates")], "MultiPolygon": geojson.get("coordinates")}.get(geojson_type) or []
+    return [
+        [[[float(point[0]), float(point[1])] for point in ring] for ring in polygon]
+        for polygon in polygons
+        if polygon and len(polygon[0]) >= 4
+    ]
+
+def claim_geometry_values(geojson: Dict[str, Any]) -> Dict[str, Any]:
+    """ClaimGeometry columns for a claim boundary; ValueError if it has no polygon"""
+    polygons = boundary_polygons(geojson)
+    if not polygons:
+        raise ValueError("GeoJSON contains no Polygon or MultiPolygon boundary")
+    longitudes = [point[0] for polygon in polygons for point in polygon[0]]
+    latitudes = [point[1] for polygon in polygons for point in polygon[0]]
+    bounds = min(latitudes), min(longitudes), max(latitudes), max(longitudes)
+    return {
+        "geometry": {"type": "MultiPolygon", "coordinates": polygons},
+        **dict(zip(GEOMETRY_BOUND_COLUMNS, bounds)),
+        "cell": geohash.common_cell(*bounds)
+    }
+
+def track_geometry_change(session: Optional[Session], bounds: Tuple[float, float, float, float]) -> None:
+    """
+    Record map bounds (south, west, north, east) whose rendering changed in this
+    transaction - session.info["geometry_changes"] is consumed on commit (vector tile cache)
+    """
+    if session is not None:
+        session.info.setdefault("geometry_changes", []).append(bounds)
+
+def _track_claim_point(claim: Claim, latitude: Optional[float], longitude: Optional[float]) -> None:
+    if latitude is not None and longitude is not None:
+        track_geometry_change(object_session(claim), (latitude, longitude, latitude, longitude))
+
+@event.listens_for(Claim, "after_insert")
+def _track_inserted_point(mapper, connection, claim: Claim):
+    _track_claim_point(claim, claim.latitude, claim.longitude)
+
+@event.listens_for(Claim, "after_update")
+def _track_updated_point(mapper, connection, claim: Claim):
+    state = inspect(claim)
+    if any(state.attrs[field].history.has_changes() for field in ("latitude", "longitude", "status")):
+        previous = [
+            history.deleted[0] if history.deleted else getattr(claim, field)
+            for field, history in ((field, state.attrs[field].history) for field in ("latitude", "longitude"))
+        ]
+        _track_claim_point(claim, *previous)
+        _track_claim_point(claim, claim.latitude, claim.longitude)
+
+@event.listens_for(Claim, "after_delete")
+def _delete_claim_geometry(mapper, connection, claim: Claim):
+    """The boundary goes with the claim (SQLite doesn't enforce the ON DELETE CASCADE)"""
+    _track_claim_point(claim, claim.latitude, claim.longitude)
+    deleted = connection.execute(
+        delete(ClaimGeometry).where(ClaimGeometry.claim_id == claim.id)
+        .returning(*(getattr(ClaimGeometry, column) for column in GEOMETRY_BOUND_COLUMNS))
+    ).all()
+    for bounds in deleted:
+        track_geometry_change(object_session(claim), tuple(bounds))
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_inserted_points(orm_execute_state):
+    """insert_claims batches bypass the mapper events"""
+    mapper = orm_execute_state.bind_mapper
+    if orm_execute_state.is_insert and mapper is not None and mapper.class_ is Claim:
+        parameters = orm_execute_state.parameters
+        for row in parameters if isinstance(parameters, list) else [parameters or {}]:
+            if row.get("latitude") is not None and row.get("longitude") is not None:
+                track_geometry_change(orm_execute_state.session, (row["latitude"], row["longitude"]) * 2)
+
+@event.listens_for(ClaimGeometry, "after_insert")
+@event.listens_for(ClaimGeometry, "after_delete")
+def _track_boundary(mapper, connection, boundary: ClaimGeometry):
+    track_geometry_change(object_session(boundary), boundary.bounds)
+
+@event.listens_for(ClaimGeometry, "after_update")
+def _track_updated_boundary(mapper, connection, boundary: ClaimGeometry):
+    state = inspect(boundary)
+    previous = tuple(
+        history.deleted[0] if history.deleted else getattr(boundary, column)
+        for column, history in ((column, state.attrs[column].history) for column in GEOMETRY_BOUND_COLUMNS)
+    )
+    track_geometry_change(object_session(boundary), previous)
+    track_geometry_change(object_session(boundary), boundary.bounds)
+
+def _tile_cell_filter(column, south: float, west: float, north: float, east: float):
+    """
+    Rows whose geohash cell overlaps the bbox: cells inside a covering cell,
+    or containing one (its prefixes)
+    """
+    cover = geohash.covering_cells(south, west, north, east)
+    if not cover:
+        return true()
+    prefixes = {cell[:length] for cell in cover for length in range(len(cell))}
+    return or_(column.in_(sorted(prefixes)), *(column.like(f"{cell}%") for cell in cover))
+
+def select_claim_geometries(south: float, west: float, north: float, east: float) -> Select:
+    """Parcel boundaries overlapping a bbox, with their claim's status"""
+    return (
+        select(ClaimGeometry.claim_id, ClaimGeometry.geometry, Claim.status)
+        .join(Claim, Claim.id == ClaimGeometry.claim_id)
+        .where(
+            _tile_cell_filter(ClaimGeometry.cell, south, west, north, east),
+            ClaimGeometry.min_latitude <= north, ClaimGeometry.max_latitude >= south,
+            ClaimGeometry.min_longitude <= east, ClaimGeometry.max_longitude >= west
+        )
+        .order_by(ClaimGeometry.claim_id)
+    )
+
+def select_claim_points(south: float, west: float, north: float, east: float, limit: int) -> Select:
+    """Newest claim points inside a bbox - plain rows for vector tiles"""
+    return (
+        select(Claim.id, Claim.latitude, Claim.longitude, Claim.status, Claim.form_subtype)
+        .where(*spatial_filters(south, west, north, east))
+        .order_by(desc(Claim.submission_date), desc(Claim.id))
+        .limit(limit)
+    )
+
+def select_claim_clusters(south: float, west: float, north: float, east: float, precision: int) -> Select:
+    """claim_clusters rows at this precision for cells touching the bbox"""
+    prefixes = {cell[:precision] for cell in geohash.covering_cells(south, west, north, east)}
+    stmt = select(ClaimCluster).where(ClaimCluster.precision == precision, ClaimCluster.claim_count > 0)
+    if prefixes:
+        stmt = stmt.where(or_(
+            ClaimCluster.cell.in_([prefix for prefix in prefixes if len(prefix) == precision]),
+            *(ClaimCluster.cell.like(f"{prefix}%") for prefix in prefixes if len(prefix) < precision)
+        ))
+    return stmt.order_by(ClaimCluster.cell)
+
+def clusters_page(rows: List[ClaimCluster], precision: int) -> Dict[str, Any]:
+    """One cluster per cell: claim count, status breakdown and centroid of its claims"""
+    clusters: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        cluster = clusters.setdefault(row.cell, {"geohash": row.cell, "count": 0, "status_breakdown": {}, "sums": [0.0, 0.0]})
+        cluster["count"] += row.claim_count
+        cluster["status_breakdown"][row.status] = row.claim_count
+        cluster["sums"][0] += row.latitude_sum
+        cluster["sums"][1] += row.longitude_sum
+    for cluster in clusters.values():
+        latitude_sum, longitude_sum = cluster.pop("sums")
+        cluster["centroid"] = {
+            "latitude": round(latitude_sum / cluster["count"], 6),
+            "longitude": round(longitude_sum / cluster["count"], 6)
+        }
+        cluster["bounds"] = geohash.decode_bbox(cluster["geohash"])
+    return {"precision": precision, "clusters": list(clusters.values())}
+
+def rebuild_claim_clusters(db: Session) -> None:
+    """Recompute claim_clusters from scratch (initial population, or after bulk SQL edits)"""
+    db.execute(delete(ClaimCluster))
+    for precision in CLUSTER_PRECISIONS:
+        cell = func.substr(Claim.geohash, 1, precision)
+        status = func.coalesce(Claim.status, "Unknown")
+        db.execute(insert(ClaimCluster).from_select(
+            ["precision", "cell", "status", "claim_count", "latitude_sum", "longitude_sum"],
+            select(
+                literal(precision), cell, status, func.count(), func.sum(Claim.latitude), func.sum(Claim.longitude)
+            ).where(Claim.geohash.is_not(None)).group_by(cell, status)
+        ))
+
+def claim_insert_rows(claims: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Parameter sets for insert_claims; bulk inserts skip ORM events, so search keys are set here"""
+    rows = []
+    for claim_data in claims:
+        values = Claim.column_values(claim_data)
+        values["search_text"] = search_document(values[field] for field in SEARCHABLE_FIELDS)
+        values["geohash"] = claim_geohash(values["latitude"], values["longitude"])
+        rows.append(values)
+    return rows
+
+def insert_claims():
+    """executemany INSERT returning new ids in parameter order (batched into multi-row VALUES)"""
+    return insert(Claim).returning(Claim.id, sort_by_parameter_order=True)
+
+def select_all_claims(skip: int = 0, limit: int = 100, include_full_data: bool = False) -> Select:
+    stmt = select(Claim).order_by(desc(Claim.submission_date)).offset(skip).limit(limit)
+    return _with_full_data(stmt, include_full_data)
+
+def select_claim_by_id(claim_id: int, include_full_data: bool = True) -> Select:
+    return _with_full_data(select(Claim).where(Claim.id == claim_id), include_full_data)
+
+def select_search_claims(query: str, include_full_data: bool = False, limit: int = SEARCH_RESULT_LIMIT) -> Select:
+    score, match = search_rank(query)
+    stmt = select(Claim).where(match).order_by(desc(score), desc(Claim.id)).limit(limit)
+    return _with_full_data(stmt, include_full_data)
+
+def select_claims_by_status(status: str, include_full_data: bool = False) -> Select:
+    stmt = select(Claim).where(*claim_filters(status=status)).order_by(desc(Claim.submission_date))
+    return _with_full_data(stmt, include_full_data)
+
+def select_claims_by_district(district: str, include_full_data: bool = False) -> Select:
+    stmt = select(Claim).where(*claim_filters(district=district)).order_by(desc(Claim.submission_date))
+    return _with_full_data(stmt, include_full_data)
+
+# Dashboard statistics
+
+STATS_DIMENSIONS = ("status", "district", "form_subtype", "priority")
+STATS_MEASURES = ("total", "verified", "recent", "gis_analyzed")
+
+def select_claim_stats() -> Select:
+    """Every dashboard aggregate in one pass over claims, grouped by the breakdown dimensions"""
+    recent_since = datetime.now() - timedelta(days=RECENT_CLAIMS_DAYS)
+    has_gis = select(GISAsset.id).where(GISAsset.claim_id == Claim.id).exists()
+    dimensions = [getattr(Claim, dimension) for dimension in STATS_DIMENSIONS]
+    return select(
+        *dimensions,
+        func.count().label("total"),
+        func.count().filter(Claim.is_verified == True).label("verified"),
+        func.count().filter(Claim.submission_date >= recent_since).label("recent"),
+        func.count().filter(has_gis).label("gis_analyzed")
+    ).group_by(*dimensions)
+
+def refresh_claim_stats(db: Session, max_staleness: int = STATS_MAX_STALENESS_SECONDS) -> datetime:
+    """
+    Rebuild claim_stats_summary unless it is fresher than max_staleness seconds
+    Returns the time the summary reflects. Rebuilds are serialized on the
+    claim_stats_refresh row, so concurrent callers wait and reuse the result.
+    """
+    def is_fresh(marker: Optional[ClaimStatsRefresh]) -> bool:
+        return bool(marker and marker.refreshed_at) and (datetime.now() - marker.refreshed_at).total_seconds() < max_staleness
+
+    marker = db.get(ClaimStatsRefresh, 1)
+    if is_fresh(marker):
+        return marker.refreshed_at
+    if marker is None:
+        # Seeded by migration 007, but tables from create_all start empty - two
+        # first refreshes must not both insert it
+        insert_marker = (sqlite_insert if engine.dialect.name == "sqlite" else postgresql_insert)(ClaimStatsRefresh)
+        db.execute(insert_marker.values(id=1, refreshed_at=None).on_conflict_do_nothing(index_elements=["id"]))
+
+    marker = db.execute(
+        select(ClaimStatsRefresh).where(ClaimStatsRefresh.id == 1).with_for_update().execution_options(populate_existing=True)
+    ).scalar_one()
+    if is_fresh(marker):
+        return marker.refreshed_at  # Another worker rebuilt it while we waited
+
+    refreshed_at = datetime.now()
+    db.execute(delete(ClaimStatsSummary))
+    db.execute(insert(ClaimStatsSummary).from_select(STATS_DIMENSIONS + STATS_MEASURES, select_claim_stats()))
+    marker.refreshed_at = refreshed_at
+    db.flush()
+    return refreshed_at
+
 class ClaimsService:
     def __init__(self):
-        self.db = SessionLocal()
         print("✅ Claims service initialized (PostgreSQL)")
 
-    def close(self):
-        self.db.close()
-
     def get_all_claims(self, skip: int = 0, limit: int = 100, include_full_data: bool = False) -> List[Dict[str, Any]]:
         try:
-            claims = (
-                self.db.query(Claim)
-                .order_by(desc(Claim.submission_date))
-                .offset(skip)
-                .limit(limit)
-                .all()
-            )
-            return [claim.to_dict(include_full_data=include_full_data) for claim in claims]
+            with session_scope() as db:
+                claims = db.execute(select_all_claims(skip, limit, include_full_data)).scalars().all()
+                return [claim.to_dict(include_full_data=include_full_data) for claim in claims]
         except Exception as e:
             print(f"❌ Error fetching claims: {e}")
             return []
 
+    def get_claims_page(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        status: Optional[str] = None,
+        district: Optional[str] = None,
+        include_full_data: bool = False
+    ) -> Dict[str, Any]:
+        """One keyset page of claims matching the filters, with next_cursor for the following page"""
+        try:
+            with session_scope() as db:
+                stmt = select_claims_page(claim_filters(status, district), limit, cursor, include_full_data)
+                return claims_page(db.execute(stmt).scalars().all(), limit, include_full_data)
+        except InvalidCursorError:
+            raise
+        except Exception as e:
+            print(f"❌ Error fetching claims page: {e}")
+            return {"claims": [], "next_cursor": None}
+
+    def get_claims_in_bbox(
+        self,
+        south: float,
+        west: float,
+        north: float,
+        east: float,
+        zoom: int,
+        status: Optional[str] = None,
+        district: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Newest claims inside a map viewport, at most viewport_limit(zoom) of them"""
+        limit = viewport_limit(zoom)
+        try:
+            with session_scope() as db:
+                filters = spatial_filters(south, west, north, east) + claim_filters(status, district)
+                stmt = select_claims_in_area(filters, [desc(Claim.submission_date), desc(Claim.id)], limit)
+                return area_page(db.execute(stmt).scalars().all(), limit)
+        except Exception as e:
+            print(f"❌ Error fetching claims in bbox: {e}")
+            return {"claims": [], "limit": limit, "truncated": False}
+
+    def get_claims_near(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_m: float,
+        zoom: int,
+        status: Optional[str] = None,
+        district: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Claims within radius_m of a point, nearest first, at most viewport_limit(zoom) of them"""
+        limit = viewport_limit(zoom)
+        try:
+            with session_scope() as db:
+                distance, filters = radius_rank(latitude, longitude, radius_m)
+                stmt = select_claims_in_area(filters + claim_filters(status, district), [distance, Claim.id], limit)
+                return area_page(db.execute(stmt).scalars().all(), limit, origin=(latitude, longitude))
+        except Exception as e:
+            print(f"❌ Error fetching claims near point: {e}")
+            return {"claims": [], "limit": limit, "truncated": False}
+
+    def get_claim_clusters(self, south: float, west: float, north: float, east: float, zoom: int) -> Dict[str, Any]:
+        """Pre-aggregated claim clusters for a map viewport, one per geohash cell"""
+        precision = cluster_precision(zoom)
+        try:
+            with session_scope() as db:
+                rows = db.execute(select_claim_clusters(south, west, north, east, precision)).scalars().all()
+                return clusters_page(rows, precision)
+        except Exception as e:
+            print(f"❌ Error fetching claim clusters: {e}")
+            return {"precision": precision, "clusters": []}
+
     def get_claim_by_id(self, claim_id: int, include_full_data: bool = True) -> Optional[Dict[str, Any]]:
         try:
-            claim = self.db.query(Claim).filter(Claim.id == claim_id).first()
-            return claim.to_dict(include_full_data=include_full_data) if claim else None
+            with session_scope() as db:
+                claim = db.execute(select_claim_by_id(claim_id, include_full_data)).scalars().first()
+                return claim.to_dict(include_full_data=include_full_data) if claim else None
         except Exception as e:
             print(f"❌ Error fetching claim {claim_id}: {e}")
             return None
 
     def create_claim(self, claim_data: Dict[str, Any]) -> Dict[str, Any]:
         try:
-            new_claim = Claim(
-                claimant_name=claim_data.get("claimant_name", "Unknown"),
-                village_name=claim_data.get("village_name"),
-                district=claim_data.get("district", "Unknown"),
-                state=claim_data.get("state", "Odisha"),
-                form_type=claim_data.get("form_type", "Unknown"),
-                form_subtype=claim_data.get("form_subtype"),
-                status=claim_data.get("status", "OCR Processed"),
-                priority=claim_data.get("priority", "Medium"),
-                comments=claim_data.get("comments", ""),
-                document_filename=claim_data.get("document_filename"),
-                ocr_metadata=claim_data.get("ocr_metadata", {}),
-                extracted_fields=claim_data.get("extracted_fields", {}),
-                latitude=claim_data.get("latitude"),
-                longitude=claim_data.get("longitude"),
-                form_doc_url=claim_data.get("form_doc_url"),
-                geojson_file_url=claim_data.get("geojson_file_url"),
-                supporting_doc_urls=claim_data.get("supporting_doc_urls")
-            )
-            self.db.add(new_claim)
-            self.db.commit()
-            self.db.refresh(new_claim)
-            return {
-                "success": True,
-                "claim_id": new_claim.id,
-                "message": f"Claim created for {new_claim.claimant_name}"
-            }
+            with session_scope() as db:
+                new_claim = Claim.from_dict(claim_data)
+                db.add(new_claim)
+                db.flush()
+                return {
+                    "success": True,
+                    "claim_id": new_claim.id,
+                    "message": f"Claim created for {new_claim.claimant_name}"
+                }
         except Exception as e:
-            self.db.rollback()
             return {"success": False, "error": str(e)}
 
+    def bulk_create_claims(self, claims: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Insert a batch of claims in one transaction; results follow input order
+        If the batch fails, rows are retried one by one under savepoints so only the bad rows fail
+        """
+        rows = claim_insert_rows(claims)
+        try:
+            with session_scope() as db:
+                claim_ids = db.execute(insert_claims(), rows).scalars().all()
+                apply_cluster_deltas(db.connection(), inserted_cluster_changes(rows))
+            return [{"success": True, "claim_id": claim_id} for claim_id in claim_ids]
+        except Exception as e:
+            print(f"⚠ Bulk insert of {len(rows)} claims failed, isolating bad rows: {e}")
+
+        results = []
+        with session_scope() as db:
+            for row in rows:
+                try:
+                    with db.begin_nested():
+                        claim_id = db.execute(insert_claims(), row).scalar_one()
+                        apply_cluster_deltas(db.connection(), inserted_cluster_changes([row]))
+                    results.append({"success": True, "claim_id": claim_id})
+                except Exception as e:
+                    results.append({"success": False, "error": str(getattr(e, "orig", e))})  # Driver error, without the SQL
+        return results
+
     def create_claim_from_ocr(self, ocr_data: Dict[str, Any], document_filename: str = None) -> Dict[str, Any]:
         try:
             print("🔍 Processing OCR data for claim creation")
@@ -331,252 +1155,283 @@ class ClaimsService:
     
     def update_claim_status(self, claim_id: int, new_status: str, notes: str = "") -> Dict[str, Any]:
         try:
-            claim = self.db.query(Claim).filter(Claim.id == claim_id).first()
-            if not claim:
-                return {"success": False, "error": "Claim not found"}
-            old_status = claim.status
-            claim.status = new_status
-            if notes:
-                claim.verification_notes = notes
-            self.db.commit()
-            return {
-                "success": True,
-                "status": "success",  # Added for frontend compatibility
-                "message": f"Claim {claim_id} status updated from '{old_status}' to '{new_status}'"
-            }
+            with session_scope() as db:
+                claim = db.query(Claim).filter(Claim.id == claim_id).first()
+                if not claim:
+                    return {"success": False, "error": "Claim not found"}
+                old_status = claim.status
+                claim.status = new_status
+                if notes:
+                    claim.verification_notes = notes
+                return {
+                    "success": True,
+                    "status": "success",  # Added for frontend compatibility
+                    "message": f"Claim {claim_id} status updated from '{old_status}' to '{new_status}'"
+                }
         except Exception as e:
-            self.db.rollback()
             return {"success": False, "error": str(e)}
     
     def update_claim(self, claim_id: int, updates: Dict[str, Any]) -> Dict[str, Any]:
         try:
-            claim = self.db.query(Claim).filter(Claim.id == claim_id).first()
-            if not claim:
-                return {"success": False, "error": "Claim not found"}
-            for field, value in updates.items():
-                if hasattr(claim, field):
-                    setattr(claim, field, value)
-            self.db.commit()
-            return {
-                "success": True,
-                "message": f"Claim {claim_id} updated successfully",
-                "updated_fields": list(updates.keys())
-            }
+            with session_scope() as db:
+                claim = db.query(Claim).filter(Claim.id == claim_id).first()
+                if not claim:
+                    return {"success": False, "error": "Claim not found"}
+                for field, value in updates.items():
+                    if hasattr(claim, field):
+                        setattr(claim, field, value)
+                return {
+                    "success": True,
+                    "message": f"Claim {claim_id} updated successfully",
+                    "updated_fields": list(updates.keys())
+                }
         except Exception as e:
-            self.db.rollback()
             return {"success": False, "error": str(e)}
     
     def delete_claim(self, claim_id: int) -> Dict[str, Any]:
         try:
-            claim = self.db.query(Claim).filter(Claim.id == claim_id).first()
-            if not claim:
-                return {"success": False, "error": "Claim not found"}
-            claimant_name = claim.claimant_name
-            self.db.delete(claim)
-            self.db.commit()
-            return {
-                "success": True,
-                "status": "success",  # Added for frontend compatibility
-                "message": f"Claim {claim_id} for {claimant_name} deleted successfully"
-            }
+            with session_scope() as db:
+                claim = db.query(Claim).filter(Claim.id == claim_id).first()
+                if not claim:
+                    return {"success": False, "error": "Claim not found"}
+                claimant_name = claim.claimant_name
+                db.delete(claim)
+                return {
+                    "success": True,
+                    "status": "success",  # Added for frontend compatibility
+                    "message": f"Claim {claim_id} for {claimant_name} deleted successfully"
+                }
         except Exception as e:
-            self.db.rollback()
             return {"success": False, "error": str(e)}
     
+    def set_claim_geometry(self, claim_id: int, geojson: Dict[str, Any]) -> Dict[str, Any]:
+        """Store (or replace) a claim's parcel boundary from GeoJSON"""
+        try:
+            values = claim_geometry_values(geojson)
+        except (ValueError, TypeError, KeyError, IndexError) as e:
+            return {"success": False, "error": f"Invalid boundary: {e}"}
+        try:
+            with session_scope() as db:
+                if db.scalar(select(Claim.id).where(Claim.id == claim_id)) is None:
+                    return {"success": False, "error": "Claim not found"}
+                boundary = db.get(ClaimGeometry, claim_id)
+                if boundary is None:
+                    db.add(ClaimGeometry(claim_id=claim_id, **values))
+                else:
+                    for column, value in values.items():
+                        setattr(boundary, column, value)
+                return {
+                    "success": True,
+                    "claim_id": claim_id,
+                    "polygons": len(values["geometry"]["coordinates"]),
+                    "bounds": [values[column] for column in GEOMETRY_BOUND_COLUMNS]
+                }
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    def get_claim_boundaries(
+        self,
+        claim_ids: Optional[List[int]] = None,
+        village: Optional[str] = None,
+        district: Optional[str] = None,
+        limit: int = 1000
+    ) -> List[Tuple[int, Optional[Dict[str, Any]]]]:
+        """
+        (claim_id, boundary GeoJSON or None) for the claims selected by id, village
+        and/or district (exact, case-insensitive names), oldest claim first
+        """
+        filters = []
+        if claim_ids:
+            filters.append(Claim.id.in_(claim_ids))
+        if village:
+            filters.append(func.lower(Claim.village_name) == village.lower())
+        if district:
+            filters.append(func.lower(Claim.district) == district.lower())
+        stmt = (
+            select(Claim.id, ClaimGeometry.geometry)
+            .outerjoin(ClaimGeometry, ClaimGeometry.claim_id == Claim.id)
+            .where(*filters)
+            .order_by(Claim.id)
+            .limit(limit)
+        )
+        try:
+            with session_scope() as db:
+                return [(claim_id, geometry) for claim_id, geometry in db.execute(stmt)]
+        except Exception as e:
+            print(f"❌ Error fetching claim boundaries: {e}")
+            return []
+
     def assign_claim_to_officer(self, claim_id: int, officer_name: str) -> Dict[str, Any]:
         try:
-            claim = self.db.query(Claim).filter(Claim.id == claim_id).first()
-            if not claim:
-                return {"success": False, "error": "Claim not found"}
-            claim.assigned_officer = officer_name
-            self.db.commit()
-            return {
-                "success": True,
-                "message": f"Claim {claim_id} assigned to {officer_name}"
-            }
+            with session_scope() as db:
+                claim = db.query(Claim).filter(Claim.id == claim_id).first()
+                if not claim:
+                    return {"success": False, "error": "Claim not found"}
+                claim.assigned_officer = officer_name
+                return {
+                    "success": True,
+                    "message": f"Claim {claim_id} assigned to {officer_name}"
+                }
         except Exception as e:
-            self.db.rollback()
             return {"success": False, "error": str(e)}
     
+    def search_claims_page(
+        self,
+        query: str,
+        limit: int = SEARCH_RESULT_LIMIT,
+        cursor: Optional[str] = None,
+        include_full_data: bool = False
+    ) -> Dict[str, Any]:
+        """Relevance-ranked search page, with next_cursor for the following page"""
+        try:
+            with session_scope() as db:
+                rows = db.execute(select_search_page(query, limit, cursor, include_full_data)).all()
+                return search_page(rows, limit, include_full_data)
+        except InvalidCursorError:
+            raise
+        except Exception as e:
+            print(f"❌ Search error: {e}")
+            return {"claims": [], "next_cursor": None}
+    
     def search_claims(self, query: str, include_full_data: bool = False) -> List[Dict[str, Any]]:
         try:
-            filters = [
-                Claim.claimant_name.ilike(f"%{query}%"),
-                Claim.district.ilike(f"%{query}%"),
-                Claim.village_name.ilike(f"%{query}%"),
-                Claim.document_filename.ilike(f"%{query}%")
-            ]
-
-            # Handle claim ID search (e.g., "FRA-001" or "001")
-            clean_query = query.upper().replace("FRA-", "").strip()
-            if clean_query.isdigit():
-                filters.append(Claim.id == int(clean_query))
-            elif query.isdigit():
-                filters.append(Claim.id == int(query))
-
-            claims = (
-                self.db.query(Claim)
-                .filter(or_(*filters))
-                .order_by(desc(Claim.submission_date))
-                .all()
-            )
-            return [claim.to_dict(include_full_data=include_full_data) for claim in claims]
+            with session_scope() as db:
+                claims = db.execute(select_search_claims(query, include_full_data)).scalars().all()
+                return [claim.to_dict(include_full_data=include_full_data) for claim in claims]
         except Exception as e:
             print(f"❌ Search error: {e}")
             return []
     
     def get_claims_by_status(self, status: str, include_full_data: bool = False) -> List[Dict[str, Any]]:
         try:
-            claims = (
-                self.db.query(Claim)
-                .filter(Claim.status == status)
-                .order_by(desc(Claim.submission_date))
-                .all()
-            )
-            return [claim.to_dict(include_full_data=include_full_data) for claim in claims]
+            with session_scope() as db:
+                claims = db.execute(select_claims_by_status(status, include_full_data)).scalars().all()
+                return [claim.to_dict(include_full_data=include_full_data) for claim in claims]
         except Exception as e:
             print(f"❌ Error filtering by status: {e}")
             return []
     
     def get_claims_by_district(self, district: str, include_full_data: bool = False) -> List[Dict[str, Any]]:
         try:
-            claims = (
-                self.db.query(Claim)
-                .filter(Claim.district.ilike(f"%{district}%"))
-                .order_by(desc(Claim.submission_date))
-                .all()
-            )
-            return [claim.to_dict(include_full_data=include_full_data) for claim in claims]
+            with session_scope() as db:
+                claims = db.execute(select_claims_by_district(district, include_full_data)).scalars().all()
+                return [claim.to_dict(include_full_data=include_full_data) for claim in claims]
         except Exception as e:
             print(f"❌ Error filtering by district: {e}")
             return []
     
-    def get_dashboard_stats(self) -> Dict[str, Any]:
+    def get_dashboard_stats(self, max_staleness: int = STATS_MAX_STALENESS_SECONDS) -> Dict[str, Any]:
         try:
-            total_claims = self.db.query(Claim).count()
-            status_stats = (
-                self.db.query(Claim.status, func.count(Claim.id))
-                .group_by(Claim.status)
-                .all()
-            )
-            district_stats = (
-                self.db.query(Claim.district, func.count(Claim.id))
-                .group_by(Claim.district)
-                .all()
-            )
-            form_stats = (
-                self.db.query(Claim.form_subtype, func.count(Claim.id))
-                .group_by(Claim.form_subtype)
-                .all()
-            )
-            priority_stats = (
-                self.db.query(Claim.priority, func.count(Claim.id))
-                .group_by(Claim.priority)
-                .all()
-            )
-            seven_days_ago = datetime.now() - timedelta(days=7)
-            recent_claims = (
-                self.db.query(Claim)
-                .filter(Claim.submission_date >= seven_days_ago)
-                .count()
-            )
-            verified_claims = self.db.query(Claim).filter(Claim.is_verified == True).count()
-            unverified_claims = total_claims - verified_claims
-            gis_analyzed_claims = (
-                self.db.query(Claim)
-                .join(GISAsset, Claim.id == GISAsset.claim_id, isouter=True)
-                .filter(GISAsset.id.isnot(None))
-                .distinct(Claim.id)
-                .count()
-            )
+            with session_scope() as db:
+                as_of = refresh_claim_stats(db, max_staleness)
+                columns = [getattr(ClaimStatsSummary, column) for column in STATS_DIMENSIONS + STATS_MEASURES]
+                rows = db.execute(select(*columns)).all()
+
+            def breakdown(dimension: str) -> Dict[Any, int]:
+                counts: Dict[Any, int] = {}
+                for row in rows:
+                    key = getattr(row, dimension)
+                    counts[key] = counts.get(key, 0) + row.total
+                return counts
+
+            total_claims = sum(row.total for row in rows)
+            verified_claims = sum(row.verified for row in rows)
+            gis_analyzed_claims = sum(row.gis_analyzed for row in rows)
+            status_stats = breakdown("status").items()
             return {
                 "total_claims": total_claims,
                 "status_breakdown": {
                     "pending": sum(count for status, count in status_stats if status == "Pending"),
                     "ocr_processed": sum(count for status, count in status_stats if status == "OCR Processed"),
-                    "under_review": sum(count for status, count in status_stats if "Review" in status),
+                    "under_review": sum(count for status, count in status_stats if status and "Review" in status),
                     "approved": sum(count for status, count in status_stats if status == "Approved"),
                     "rejected": sum(count for status, count in status_stats if status == "Rejected")
                 },
                 "verification_status": {
                     "verified": verified_claims,
-                    "unverified": unverified_claims
+                    "unverified": total_claims - verified_claims
                 },
                 "recent_activity": {
-                    "claims_last_7_days": recent_claims
+                    "claims_last_7_days": sum(row.recent for row in rows)
                 },
-                "districts": [{"district": district, "count": count} for district, count in district_stats],
-                "form_types": [{"type": form_type or "Unknown", "count": count} for form_type, count in form_stats],
-                "priorities": [{"priority": priority, "count": count} for priority, count in priority_stats],
+                "districts": [{"district": district, "count": count} for district, count in breakdown("district").items()],
+                "form_types": [{"type": form_type or "Unknown", "count": count} for form_type, count in breakdown("form_subtype").items()],
+                "priorities": [{"priority": priority, "count": count} for priority, count in breakdown("priority").items()],
                 "gis_analysis": {
                     "analyzed_claims": gis_analyzed_claims,
                     "coverage_percent": round((gis_analyzed_claims / total_claims * 100) if total_claims > 0 else 0, 2)
-                }
+                },
+                "stats_as_of": as_of.isoformat()
             }
         except Exception as e:
             print(f"❌ Dashboard stats error: {e}")
             return {"error": str(e)}
     
-    def get_claims_summary(self) -> Dict[str, Any]:
+    def get_claims_summary(self, max_staleness: int = STATS_MAX_STALENESS_SECONDS) -> Dict[str, Any]:
         try:
-            total = self.db.query(Claim).count()
-            pending = self.db.query(Claim).filter(Claim.status == "Pending").count()
-            processed = self.db.query(Claim).filter(Claim.status.like("%Processed%")).count()
+            with session_scope() as db:
+                as_of = refresh_claim_stats(db, max_staleness)
+                rows = db.execute(select(ClaimStatsSummary.status, ClaimStatsSummary.total)).all()
+            total = sum(count for _, count in rows)
+            pending = sum(count for status, count in rows if status == "Pending")
+            processed = sum(count for status, count in rows if status and "Processed" in status)
             return {
                 "total_claims": total,
                 "pending_claims": pending,
                 "processed_claims": processed,
-                "completion_rate": round((processed / total * 100) if total > 0 else 0, 2)
+                "completion_rate": round((processed / total * 100) if total > 0 else 0, 2),
+                "stats_as_of": as_of.isoformat()
             }
         except Exception as e:
             return {"error": str(e)}
     
     def get_claims_with_gis_analysis(self) -> List[Dict[str, Any]]:
         try:
-            claims = (
-                self.db.query(Claim)
-                .join(GISAsset, Claim.id == GISAsset.claim_id)
-                .distinct(Claim.id)
-                .order_by(desc(Claim.submission_date))
-                .all()
-            )
-            return [claim.to_dict(include_full_data=True) for claim in claims]
+            with session_scope() as db:
+                stmt = (
+                    select(Claim)
+                    .where(select(GISAsset.id).where(GISAsset.claim_id == Claim.id).exists())
+                    .order_by(desc(Claim.submission_date))
+                )
+                claims = db.execute(_with_full_data(stmt, True)).scalars().all()
+                return [claim.to_dict(include_full_data=True) for claim in claims]
         except Exception as e:
             print(f"❌ Error fetching GIS claims: {e}")
             return []
     
     def get_gis_analytics_summary(self) -> Dict[str, Any]:
         try:
-            total_analyzed_area = (
-                self.db.query(func.sum(GISAnalytics.area_hectares))
-                .scalar() or 0
-            )
-            forest_area = (
-                self.db.query(func.sum(GISAnalytics.area_hectares))
-                .filter(GISAnalytics.land_class_name.like("%Forest%"))
-                .scalar() or 0
-            )
-            land_class_breakdown = (
-                self.db.query(
-                    GISAnalytics.land_class_name, 
-                    func.sum(GISAnalytics.area_hectares).label('total_area')
+            with session_scope() as db:
+                total_analyzed_area = (
+                    db.query(func.sum(GISAnalytics.area_hectares))
+                    .scalar() or 0
                 )
-                .group_by(GISAnalytics.land_class_name)
-                .all()
-            )
-            return {
-                "total_analyzed_area_hectares": round(total_analyzed_area, 2),
-                "total_forest_area_hectares": round(forest_area, 2),
-                "forest_coverage_percent": round((forest_area / total_analyzed_area * 100) if total_analyzed_area > 0 else 0, 2),
-                "land_class_breakdown": [
-                    {
-                        "land_class": land_class,
-                        "area_hectares": round(area, 2),
-                        "percentage": round((area / total_analyzed_area * 100) if total_analyzed_area > 0 else 0, 2)
-                    }
-                    for land_class, area in land_class_breakdown
-                ]
-            }
+                forest_area = (
+                    db.query(func.sum(GISAnalytics.area_hectares))
+                    .filter(GISAnalytics.land_class_name.like("%Forest%"))
+                    .scalar() or 0
+                )
+                land_class_breakdown = (
+                    db.query(
+                        GISAnalytics.land_class_name, 
+                        func.sum(GISAnalytics.area_hectares).label('total_area')
+                    )
+                    .group_by(GISAnalytics.land_class_name)
+                    .all()
+                )
+                return {
+                    "total_analyzed_area_hectares": round(total_analyzed_area, 2),
+                    "total_forest_area_hectares": round(forest_area, 2),
+                    "forest_coverage_percent": round((forest_area / total_analyzed_area * 100) if total_analyzed_area > 0 else 0, 2),
+                    "land_class_breakdown": [
+                        {
+                            "land_class": land_class,
+                            "area_hectares": round(area, 2),
+                            "percentage": round((area / total_analyzed_area * 100) if total_analyzed_area > 0 else 0, 2)
+                        }
+                        for land_class, area in land_class_breakdown
+                    ]
+                }
         except Exception as e:
             print(f"❌ GIS analytics summary error: {e}")
             return {"error": str(e)}
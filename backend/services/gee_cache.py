@@ -0,0 +1,236 @@
+# services/gee_cache.py
+"""
+Persistent cache of Earth Engine land-classification results
+
+Keyed by a canonical hash of the analyzed geometry - coordinates rounded,
+rings rotated and oriented, parts sorted, so the same boundary uploaded again
+as a Feature, FeatureCollection or re-ordered ring hashes the same - together
+with the classifier asset and version, the imagery date range and the scale.
+Entries expire after GEE_CACHE_TTL_DAYS and the least recently used are
+dropped beyond GEE_CACHE_MAX_ENTRIES.
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+GEE_CACHE_ENABLED = os.getenv("GEE_CACHE_ENABLED", "true").lower() == "true"
+GEE_CACHE_PATH = os.getenv("GEE_CACHE_PATH") or os.path.join(os.path.dirname(__file__), '..', 'gee_cache.sqlite3')
+GEE_CACHE_TTL_DAYS = int(os.getenv("GEE_CACHE_TTL_DAYS", "30"))
+GEE_CACHE_MAX_ENTRIES = int(os.getenv("GEE_CACHE_MAX_ENTRIES", "10000"))
+# getMapId tile URLs expire on the Earth Engine side before the statistics do;
+# older cached URLs are re-issued (one getMapId call, no reduceRegion)
+GEE_MAP_URL_TTL_HOURS = int(os.getenv("GEE_MAP_URL_TTL_HOURS", "12"))
+
+# 7 decimal places is about 1 cm - finer differences are digitizing noise
+COORDINATE_DECIMALS = 7
+
+Position = Tuple[float, float]
+
+
+def _geometries(geojson: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Every geometry in a FeatureCollection, Feature, GeometryCollection or bare geometry"""
+    geojson_type = geojson.get("type")
+    if geojson_type == "FeatureCollection":
+        for feature in geojson.get("features") or []:
+            yield from _geometries(feature)
+    elif geojson_type == "Feature":
+        if geojson.get("geometry"):
+            yield from _geometries(geojson["geometry"])
+    elif geojson_type == "GeometryCollection":
+        for geometry in geojson.get("geometries") or []:
+            yield from _geometries(geometry)
+    else:
+        yield geojson
+
+
+def _position(point: List[float]) -> Position:
+    return round(float(point[0]), COORDINATE_DECIMALS), round(float(point[1]), COORDINATE_DECIMALS)
+
+
+def _line(points: List[List[float]]) -> List[Position]:
+    line = []
+    for point in points:
+        position = _position(point)
+        if not line or line[-1] != position:
+            line.append(position)
+    return line
+
+
+def _ring(points: List[List[float]], counterclockwise: bool) -> List[Position]:
+    """Open ring starting at its smallest vertex, wound in the given direction"""
+    ring = _line(points)
+    if len(ring) > 1 and ring[0] == ring[-1]:
+        ring.pop()
+    area = sum(x1 * y2 - x2 * y1 for (x1, y1), (x2, y2) in zip(ring, ring[1:] + ring[:1]))
+    if (area > 0) != counterclockwise:
+        ring.reverse()
+    start = ring.index(min(ring)) if ring else 0
+    return ring[start:] + ring[:start]
+
+
+def canonical_geometry(geojson: Dict[str, Any]) -> Dict[str, list]:
+    """
+    Order- and encoding-independent form of a GeoJSON geometry: Polygon vs
+    MultiPolygon vs FeatureCollection of Polygons all reduce to one sorted list
+    (RFC 7946 winding: exteriors counterclockwise, holes clockwise)
+    """
+    points, lines, polygons = [], [], []
+    for geometry in _geometries(geojson):
+        geometry_type, coordinates = geometry.get("type"), geometry.get("coordinates") or []
+        if geometry_type == "Point":
+            points.append(_position(coordinates))
+        elif geometry_type == "MultiPoint":
+            points.extend(_position(point) for point in coordinates)
+        elif geometry_type in ("LineString", "MultiLineString"):
+            for line in [coordinates] if geometry_type == "LineString" else coordinates:
+                line = _line(line)
+                lines.append(min(line, line[::-1]))
+        elif geometry_type in ("Polygon", "MultiPolygon"):
+            for polygon in [coordinates] if geometry_type == "Polygon" else coordinates:
+                if polygon:
+                    exterior = _ring(polygon[0], counterclockwise=True)
+                    holes = sorted(_ring(ring, counterclockwise=False) for ring in polygon[1:])
+                    polygons.append([exterior, *holes])
+    return {"points": sorted(points), "lines": sorted(lines), "polygons": sorted(polygons)}
+
+
+def geometry_key(geojson: Dict[str, Any]) -> str:
+    """SHA-256 of the canonical geometry alone"""
+    return hashlib.sha256(json.dumps(canonical_geometry(geojson), separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def analysis_key(
+    geojson: Dict[str, Any],
+    model_id: str,
+    model_version: Optional[str],
+    start_date: str,
+    end_date: str,
+    scale: int
+) -> str:
+    """SHA-256 of the canonical geometry and everything else that shapes the classification"""
+    identity = {
+        "geometry": canonical_geometry(geojson),
+        "model_id": model_id,
+        "model_version": model_version or "",
+        "date_range": [start_date, end_date],
+        "scale": scale
+    }
+    return hashlib.sha256(json.dumps(identity, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+class GEEResultCache:
+    """
+    SQLite-backed result store shared by every worker process
+    Entries carry the classifier asset and version so a retrained model can drop its stale results
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        ttl_seconds: int = GEE_CACHE_TTL_DAYS * 86400,
+        max_entries: int = GEE_CACHE_MAX_ENTRIES,
+        map_url_ttl_seconds: int = GEE_MAP_URL_TTL_HOURS * 3600
+    ):
+        self.db_path = os.path.abspath(db_path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.map_url_ttl_seconds = map_url_ttl_seconds
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS gee_results (
+                key TEXT PRIMARY KEY,
+                model_id TEXT NOT NULL,
+                model_version TEXT NOT NULL,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                map_url_at REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS ix_gee_results_accessed_at ON gee_results (accessed_at)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS ix_gee_results_model ON gee_results (model_id, model_version)")
+
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        with self.lock:
+            return self.conn.execute(sql, params)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        {"result", "cached_at", "map_url_stale"} for a live entry, or None on miss/expiry
+        A hit refreshes the entry's LRU position
+        """
+        now = time.time()
+        row = self._execute("SELECT result, created_at, map_url_at FROM gee_results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        if now - row["created_at"] > self.ttl_seconds:
+            self._execute("DELETE FROM gee_results WHERE key = ?", (key,))
+            return None
+        self._execute("UPDATE gee_results SET accessed_at = ? WHERE key = ?", (now, key))
+        return {
+            "result": json.loads(row["result"]),
+            "cached_at": row["created_at"],
+            "map_url_stale": now - row["map_url_at"] > self.map_url_ttl_seconds
+        }
+
+    def put(self, key: str, model_id: str, model_version: Optional[str], result: Dict[str, Any]):
+        now = time.time()
+        self._execute(
+            "INSERT OR REPLACE INTO gee_results (key, model_id, model_version, result, created_at, accessed_at, map_url_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, model_id, model_version or "", json.dumps(result), now, now, now)
+        )
+        self.evict()
+
+    def refresh_map_url(self, key: str, result: Dict[str, Any]):
+        """Store a result with re-issued map URLs, keeping the entry's original age"""
+        self._execute(
+            "UPDATE gee_results SET result = ?, map_url_at = ? WHERE key = ?",
+            (json.dumps(result), time.time(), key)
+        )
+
+    def invalidate(self, model_id: Optional[str] = None, keep_version: Optional[str] = None) -> int:
+        """
+        Drop cached results - all of them, those of one classifier asset, or
+        (with keep_version) those computed by any other version of it
+        """
+        if model_id is None:
+            return self._execute("DELETE FROM gee_results").rowcount
+        if keep_version is None:
+            return self._execute("DELETE FROM gee_results WHERE model_id = ?", (model_id,)).rowcount
+        return self._execute(
+            "DELETE FROM gee_results WHERE model_id = ? AND model_version != ?", (model_id, keep_version)
+        ).rowcount
+
+    def evict(self):
+        """Drop expired entries, then the least recently used beyond max_entries"""
+        self._execute("DELETE FROM gee_results WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+        self._execute(
+            "DELETE FROM gee_results WHERE key IN ("
+            "SELECT key FROM gee_results ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+    def status(self) -> Dict[str, Any]:
+        row = self._execute("SELECT COUNT(*) AS entries, MIN(created_at) AS oldest FROM gee_results").fetchone()
+        return {
+            "path": self.db_path,
+            "entries": row["entries"],
+            "max_entries": self.max_entries,
+            "ttl_days": self.ttl_seconds / 86400,
+            "oldest_entry_age_hours": round((time.time() - row["oldest"]) / 3600, 1) if row["oldest"] else None
+        }
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
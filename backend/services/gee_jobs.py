@@ -0,0 +1,181 @@
+# services/gee_jobs.py
+"""
+Earth Engine analysis executor
+
+getInfo()/getMapId() block for tens of seconds, so claim analyses run on a
+dedicated thread pool sized to the Earth Engine concurrent-request quota
+instead of on the event loop. Requests for a claim and geometry that is
+already being analyzed join the in-flight job; quota rejections are retried
+with exponential backoff.
+"""
+import os
+import time
+import uuid
+import random
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+from fastapi import HTTPException
+from dotenv import load_dotenv
+
+from .gee_cache import geometry_key
+from .webgis_service import webgis_service, GEEQuotaError
+
+load_dotenv()
+
+# Earth Engine allows a limited number of concurrent interactive requests per project
+GEE_MAX_CONCURRENCY = int(os.getenv("GEE_MAX_CONCURRENCY", "4"))
+GEE_JOB_MAX_QUEUE = int(os.getenv("GEE_JOB_MAX_QUEUE", "200"))
+GEE_JOB_MAX_ATTEMPTS = int(os.getenv("GEE_JOB_MAX_ATTEMPTS", "5"))
+GEE_RETRY_BASE_SECONDS = float(os.getenv("GEE_RETRY_BASE_SECONDS", "5"))
+GEE_RETRY_MAX_SECONDS = float(os.getenv("GEE_RETRY_MAX_SECONDS", "120"))
+
+# Finished jobs stay pollable this long
+GEE_JOB_RETENTION_SECONDS = 3600
+
+ACTIVE_STATUSES = ("queued", "running", "retrying")
+
+
+def retry_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter, so throttled workers don't retry in lockstep"""
+    return random.uniform(0, min(GEE_RETRY_MAX_SECONDS, GEE_RETRY_BASE_SECONDS * 2 ** (attempt - 1)))
+
+
+class GEEAnalysisExecutor:
+    """
+    Background runner for claim land-classification analyses
+    Job state is in memory - a job lives as long as the process, results are persisted by the service
+    """
+
+    def __init__(self, service):
+        self.service = service
+        self.pool = ThreadPoolExecutor(max_workers=GEE_MAX_CONCURRENCY, thread_name_prefix="gee-analysis")
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()  # Wakes workers sleeping through a backoff
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self.futures: Dict[str, Future] = {}
+        self.in_flight: Dict[Tuple[int, str], str] = {}  # (claim_id, geometry hash) -> job_id
+
+        print(f"🛰 GEE analysis executor ready ({GEE_MAX_CONCURRENCY} workers)")
+
+    def submit(self, claim_id: int, geojson_data: dict) -> Tuple[Dict[str, Any], bool]:
+        """
+        Queue an analysis; (job, deduplicated) - deduplicated when an identical
+        analysis for this claim was already queued or running and is returned instead
+        """
+        job, deduplicated, _ = self._submit(claim_id, geojson_data)
+        return job, deduplicated
+
+    async def run(self, claim_id: int, geojson_data: dict) -> Dict[str, Any]:
+        """Submit (or join) an analysis and wait for its result without blocking the event loop"""
+        _, _, future = self._submit(claim_id, geojson_data)
+        return await asyncio.wrap_future(future)
+
+    def _submit(self, claim_id: int, geojson_data: dict) -> Tuple[Dict[str, Any], bool, Future]:
+        dedupe_key = (claim_id, geometry_key(geojson_data))
+        with self.lock:
+            job_id = self.in_flight.get(dedupe_key)
+            if job_id is not None:
+                return self._snapshot(job_id), True, self.futures[job_id]
+
+            self._purge_finished()
+            if sum(job["status"] in ACTIVE_STATUSES for job in self.jobs.values()) >= GEE_JOB_MAX_QUEUE:
+                raise HTTPException(
+                    status_code=429,
+                    detail="GEE analysis queue is full, please retry shortly",
+                    headers={"Retry-After": "60"}
+                )
+
+            job_id = uuid.uuid4().hex
+            now = datetime.now().isoformat()
+            self.jobs[job_id] = {
+                "job_id": job_id,
+                "claim_id": claim_id,
+                "status": "queued",
+                "progress": "Waiting for an Earth Engine worker",
+                "attempts": 0,
+                "created_at": now,
+                "updated_at": now
+            }
+            self.in_flight[dedupe_key] = job_id
+            future = self.futures[job_id] = self.pool.submit(self._run_job, job_id, dedupe_key, claim_id, geojson_data)
+            job = self._snapshot(job_id)
+
+        print(f"🛰 Queued GEE analysis {job_id} for claim {claim_id}")
+        return job, False, future
+
+    async def call(self, fn: Callable[..., Any], *args) -> Any:
+        """Run another Earth Engine-bound callable (batch analyses) under the same concurrency cap"""
+        return await asyncio.wrap_future(self.pool.submit(fn, *args))
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            return self._snapshot(job_id) if job_id in self.jobs else None
+
+    def status(self) -> Dict[str, Any]:
+        with self.lock:
+            counts: Dict[str, int] = {}
+            for job in self.jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+        return {"max_concurrency": GEE_MAX_CONCURRENCY, "max_queue": GEE_JOB_MAX_QUEUE, "jobs": counts}
+
+    def shutdown(self):
+        self.stopping.set()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def _snapshot(self, job_id: str) -> Dict[str, Any]:
+        """Copy of a job without unset fields (caller holds the lock)"""
+        return {key: value for key, value in self.jobs[job_id].items() if value is not None}
+
+    def _update(self, job_id: str, **fields):
+        with self.lock:
+            self.jobs[job_id].update(fields, updated_at=datetime.now().isoformat())
+
+    def _run_job(self, job_id: str, dedupe_key: Tuple[int, str], claim_id: int, geojson_data: dict) -> Dict[str, Any]:
+        try:
+            for attempt in range(1, GEE_JOB_MAX_ATTEMPTS + 1):
+                self._update(job_id, status="running", progress="Classifying with Earth Engine", attempts=attempt)
+                try:
+                    result = self.service.analyze_geojson_for_claim(geojson_data, claim_id)
+                except GEEQuotaError as e:
+                    if attempt == GEE_JOB_MAX_ATTEMPTS or self.stopping.is_set():
+                        raise HTTPException(
+                            status_code=503,
+                            detail=f"Earth Engine quota exceeded: {str(e)}",
+                            headers={"Retry-After": "60"}
+                        )
+                    delay = retry_delay(attempt)
+                    print(f"⚠ GEE analysis {job_id} hit quota (attempt {attempt}), retrying in {delay:.1f}s")
+                    self._update(job_id, status="retrying", progress="Earth Engine quota exceeded, retry scheduled", error=str(e))
+                    self.stopping.wait(delay)
+                    continue
+                self._update(job_id, status="succeeded", progress="Completed", result=result, error=None)
+                return result
+        except Exception as e:
+            error = e.detail if isinstance(e, HTTPException) else str(e)
+            self._update(job_id, status="failed", progress="Failed", error=error)
+            raise
+        finally:
+            with self.lock:
+                self.in_flight.pop(dedupe_key, None)
+                self.futures.pop(job_id, None)
+
+    def _purge_finished(self):
+        """Forget finished jobs past retention (caller holds the lock)"""
+        cutoff = datetime.fromtimestamp(time.time() - GEE_JOB_RETENTION_SECONDS).isoformat()
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job["status"] not in ACTIVE_STATUSES and job["updated_at"] < cutoff
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+
+# Global instance
+try:
+    gee_executor = GEEAnalysisExecutor(webgis_service)
+except Exception as e:
+    print(f"❌ Failed to initialize GEE analysis executor: {str(e)}")
+    gee_executor = None
@@ -0,0 +1,128 @@
+# services/geohash.py
+"""
+Geohash encoding and prefix cover for claim locations
+
+A geohash names a lat/lon cell; every character subdivides the cell into 32,
+so claims inside a cell share its hash as a prefix. Claim.geohash is indexed,
+and a viewport becomes a handful of prefix (LIKE 'abc%') range scans - the
+spatial index on databases without PostGIS, SQLite included.
+"""
+import math
+from typing import List, Tuple
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_DECODE = {char: index for index, char in enumerate(BASE32)}
+
+# Stored precision: 9 characters is a cell of about 4.8 m x 4.8 m
+GEOHASH_PRECISION = 9
+
+# A viewport is covered with at most this many cells (one prefix scan each)
+MAX_COVER_CELLS = 32
+
+EARTH_RADIUS_M = 6371008.8
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180
+
+# (south, west, north, east) in degrees
+BBox = Tuple[float, float, float, float]
+
+
+def encode(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    """Geohash of a point - identical to PostGIS ST_GeoHash"""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True  # Bits alternate longitude, latitude, starting with longitude
+    while len(chars) < precision:
+        coordinate, bounds = (longitude, lon_range) if even else (latitude, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            bounds[0] = middle
+        else:
+            bounds[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = value = 0
+    return "".join(chars)
+
+
+def decode_bbox(geohash: str) -> BBox:
+    """Bounds of a geohash cell"""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = _DECODE[char]
+        for shift in range(4, -1, -1):
+            bounds = lon_range if even else lat_range
+            middle = (bounds[0] + bounds[1]) / 2
+            if value >> shift & 1:
+                bounds[0] = middle
+            else:
+                bounds[1] = middle
+            even = not even
+    return lat_range[0], lon_range[0], lat_range[1], lon_range[1]
+
+
+def cell_size(precision: int) -> Tuple[float, float]:
+    """(height, width) in degrees of a cell at this precision"""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def _cell_span(low: float, high: float, origin: float, size: float, count: int) -> range:
+    first = int((low - origin) // size)
+    last = int((high - origin) // size)
+    return range(max(first, 0), min(last, count - 1) + 1)
+
+
+def covering_cells(south: float, west: float, north: float, east: float, max_cells: int = MAX_COVER_CELLS) -> List[str]:
+    """
+    Geohash prefixes whose cells together contain the bbox, at the finest
+    precision that needs no more than max_cells of them. Cells overhang the
+    bbox, so callers still compare coordinates exactly.
+    Empty when even single-character cells would be too many (whole world).
+    """
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        rows = _cell_span(south, north, -90.0, height, round(180 / height))
+        columns = _cell_span(west, east, -180.0, width, round(360 / width))
+        if len(rows) * len(columns) <= max_cells:
+            return [
+                encode(-90.0 + (row + 0.5) * height, -180.0 + (column + 0.5) * width, precision)
+                for row in rows for column in columns
+            ]
+    return []
+
+
+def radius_bbox(latitude: float, longitude: float, radius_m: float) -> BBox:
+    """Bounding box of a circle (small radii; no pole or antimeridian wrapping)"""
+    lat_delta = radius_m / METERS_PER_DEGREE
+    lon_delta = radius_m / (METERS_PER_DEGREE * max(math.cos(math.radians(latitude)), 1e-6))
+    return (
+        max(latitude - lat_delta, -90.0), max(longitude - lon_delta, -180.0),
+        min(latitude + lat_delta, 90.0), min(longitude + lon_delta, 180.0)
+    )
+
+
+def haversine_m(latitude1: float, longitude1: float, latitude2: float, longitude2: float) -> float:
+    """Great-circle distance in meters"""
+    phi1, phi2 = math.radians(latitude1), math.radians(latitude2)
+    a = (
+        math.sin((phi2 - phi1) / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(longitude2 - longitude1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def common_cell(south: float, west: float, north: float, east: float) -> str:
+    """Smallest geohash cell containing the whole bbox - "" when only the world does"""
+    south_west, north_east = encode(south, west), encode(north, east)
+    length = 0
+    while length < len(south_west) and south_west[length] == north_east[length]:
+        length += 1
+    return south_west[:length]
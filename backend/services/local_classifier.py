@@ -0,0 +1,186 @@
+# services/local_classifier.py
+"""
+Offline land classification from a local Sentinel-2 mosaic
+
+Used when Earth Engine is unreachable: only the blocks of a GeoTIFF/COG mosaic
+under the claim polygon are read, the pixels inside it are classified with a
+locally serialized scikit-learn Random Forest, remapped to the atlas classes
+and summed into per-class areas - CPU only, no network.
+
+The mosaic must hold the bands the model was trained on (band descriptions
+B2, B3, ... or the model's band order), in the same units as the GEE training
+composite (Sentinel-2 SR digital numbers), cloud-free. rasterio, joblib and
+scikit-learn are optional; without them, or without LOCAL_S2_MOSAIC_PATH and
+LOCAL_CLASSIFIER_PATH, the engine is disabled.
+"""
+import os
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+from dotenv import load_dotenv
+
+from .claims_service import boundary_polygons
+from .geohash import METERS_PER_DEGREE
+from .zonal_stats import ZONAL_TILE_ROWS, row_pixel_areas, zonal_class_areas
+
+try:
+    import joblib
+    import rasterio
+    from rasterio.errors import WindowError
+    from rasterio.features import geometry_mask, geometry_window
+    from rasterio.warp import transform_geom
+    from rasterio.windows import Window
+    RASTER_DEPS_AVAILABLE = True
+except ImportError:
+    RASTER_DEPS_AVAILABLE = False
+
+load_dotenv()
+
+LOCAL_S2_MOSAIC_PATH = os.getenv("LOCAL_S2_MOSAIC_PATH", "")
+# joblib file: a fitted estimator, or {"model": estimator, "bands": [...], "version": "..."}
+LOCAL_CLASSIFIER_PATH = os.getenv("LOCAL_CLASSIFIER_PATH", "")
+# Band names when the model file doesn't carry them (comma separated)
+LOCAL_CLASSIFIER_BANDS = [band.strip() for band in os.getenv("LOCAL_CLASSIFIER_BANDS", "").split(",") if band.strip()]
+# Largest AOI window classified, in pixels - bounds latency (memory is bounded by the row tiles)
+LOCAL_CLASSIFIER_MAX_PIXELS = int(os.getenv("LOCAL_CLASSIFIER_MAX_PIXELS", "20000000"))
+
+# Pixels per predict() call - bounds the float64 feature matrix
+PREDICT_CHUNK_PIXELS = 262144
+
+WGS84 = "EPSG:4326"
+
+
+def remap_table(from_classes: Sequence[int], to_classes: Sequence[int]) -> np.ndarray:
+    """Lookup array: table[model class] -> atlas class, -1 for classes outside the remap"""
+    table = np.full(max(from_classes) + 1, -1, dtype=np.int16)
+    table[np.asarray(from_classes)] = np.asarray(to_classes)
+    return table
+
+
+class LocalClassifier:
+    """Random Forest classification of a local raster mosaic, in the shape of the GEE grouped reduction"""
+
+    def __init__(self, mosaic_path: str, model_path: str, from_classes: Sequence[int], to_classes: Sequence[int]):
+        self.mosaic_path = mosaic_path
+        self.model_path = model_path
+        self.remap = remap_table(from_classes, to_classes)
+        self.class_count = max(to_classes) + 1
+        self.lock = threading.Lock()
+        self.model = None
+        self.bands: List[str] = []
+        self.model_version = os.path.splitext(os.path.basename(model_path))[0]
+
+        with rasterio.open(mosaic_path) as src:
+            self.descriptions = list(src.descriptions)
+            self.band_count = src.count
+            self.resolution_meters = round(src.res[0] * (METERS_PER_DEGREE if src.crs.is_geographic else 1), 1)
+        print(f"🖥 Local classifier ready (mosaic: {mosaic_path}, model: {model_path})")
+
+    def _load_model(self):
+        """Unpickle the model on first use - a few hundred MB for a large forest"""
+        with self.lock:
+            if self.model is not None:
+                return
+            loaded = joblib.load(self.model_path)
+            if isinstance(loaded, dict):
+                model, bands = loaded["model"], loaded.get("bands")
+                self.model_version = loaded.get("version", self.model_version)
+            else:
+                model, bands = loaded, None
+            if bands is None and hasattr(model, "feature_names_in_"):
+                bands = [str(name) for name in model.feature_names_in_]
+            self.bands = list(bands or LOCAL_CLASSIFIER_BANDS)
+            self.model = model
+
+    def _band_indexes(self) -> List[int]:
+        """1-based mosaic band indexes for the model's features"""
+        if not self.bands:
+            if getattr(self.model, "n_features_in_", self.band_count) != self.band_count:
+                raise ValueError("Model band names unknown and mosaic band count differs - set LOCAL_CLASSIFIER_BANDS")
+            return list(range(1, self.band_count + 1))
+        positions = {description: index + 1 for index, description in enumerate(self.descriptions) if description}
+        missing = [band for band in self.bands if band not in positions]
+        if missing:
+            if len(self.bands) == self.band_count and not positions:
+                return list(range(1, self.band_count + 1))  # Undescribed bands, assumed in model order
+            raise ValueError(f"Mosaic lacks bands {missing}")
+        return [positions[band] for band in self.bands]
+
+    def class_areas(self, geojson: Dict[str, Any]) -> List[Dict[str, float]]:
+        """
+        [{"class": atlas class, "sum": area in m²}] for the boundary - the same
+        groups ee.Reducer.sum().group() returns for pixelArea + classification
+        """
+        self._load_model()
+        polygons = boundary_polygons(geojson)
+        if not polygons:
+            raise ValueError("GeoJSON contains no Polygon or MultiPolygon boundary")
+        shapes = [{"type": "Polygon", "coordinates": polygon} for polygon in polygons]
+
+        with rasterio.open(self.mosaic_path) as src:
+            if src.crs != WGS84:
+                shapes = [transform_geom(WGS84, src.crs, shape) for shape in shapes]
+            try:
+                window = geometry_window(src, shapes).intersection(Window(0, 0, src.width, src.height))
+            except WindowError:
+                raise ValueError("Claim boundary lies outside the local mosaic")
+            window = window.round_offsets().round_lengths()
+            if window.width * window.height > LOCAL_CLASSIFIER_MAX_PIXELS:
+                raise ValueError(f"AOI window of {window.width}x{window.height} pixels exceeds LOCAL_CLASSIFIER_MAX_PIXELS")
+
+            transform = src.window_transform(window)
+            row_areas = row_pixel_areas(transform, window.height, src.crs.is_geographic)
+            tiles = self._classified_tiles(src, window, shapes, self._band_indexes())
+            areas = zonal_class_areas(tiles, row_areas, self.class_count)
+
+        return [{"class": atlas_class, "sum": float(area)} for atlas_class, area in enumerate(areas) if area > 0]
+
+    def _classified_tiles(self, src, window, shapes: List[Dict[str, Any]], band_indexes: List[int]) -> Iterator[Tuple[int, np.ndarray, None]]:
+        """
+        (first row, atlas classes, None) for each tile of rows of the window,
+        read and classified on demand so memory stays bounded however large the AOI
+        """
+        for row_start in range(0, window.height, ZONAL_TILE_ROWS):
+            tile = Window(window.col_off, window.row_off + row_start, window.width, min(ZONAL_TILE_ROWS, window.height - row_start))
+            # Only the internal blocks under the tile are decoded
+            pixels = src.read(band_indexes, window=tile, masked=True)
+            inside = geometry_mask(shapes, out_shape=pixels.shape[1:], transform=src.window_transform(tile), invert=True)
+            yield row_start, self._classify(pixels, inside & ~np.ma.getmaskarray(pixels).any(axis=0)), None
+
+    def _classify(self, pixels: np.ma.MaskedArray, valid: np.ndarray) -> np.ndarray:
+        """Atlas class raster of a tile, -1 outside valid or for classes outside the remap"""
+        features = pixels.data[:, valid].T  # (pixels, bands)
+        predicted = np.empty(len(features), dtype=np.int64)
+        for start in range(0, len(features), PREDICT_CHUNK_PIXELS):
+            predicted[start:start + PREDICT_CHUNK_PIXELS] = self.model.predict(features[start:start + PREDICT_CHUNK_PIXELS])
+
+        # Same FROM_CLASSES -> TO_CLASSES remap as the GEE image; unmapped classes are dropped
+        in_table = (predicted >= 0) & (predicted < len(self.remap))
+        remapped = np.full(len(predicted), -1, dtype=np.int16)
+        remapped[in_table] = self.remap[predicted[in_table]]
+        classes = np.full(valid.shape, -1, dtype=np.int16)
+        classes[valid] = remapped
+        return classes
+
+    def metadata(self) -> Dict[str, Any]:
+        return {
+            "model_version": self.model_version[:50],  # GISAnalytics.model_version width
+            "satellite_source": f"Local Sentinel-2 mosaic ({os.path.basename(self.mosaic_path)})",
+            "classifier_path": self.model_path,
+            "resolution_meters": self.resolution_meters,
+            "processing": "offline"
+        }
+
+
+def load_local_classifier(from_classes: Sequence[int], to_classes: Sequence[int]) -> Optional[LocalClassifier]:
+    """The configured local engine, or None when its files or optional dependencies are missing"""
+    if not (LOCAL_S2_MOSAIC_PATH and LOCAL_CLASSIFIER_PATH):
+        return None
+    if not RASTER_DEPS_AVAILABLE:
+        print("⚠ Local classifier configured but rasterio/joblib/scikit-learn are not installed")
+        return None
+    try:
+        return LocalClassifier(LOCAL_S2_MOSAIC_PATH, LOCAL_CLASSIFIER_PATH, from_classes, to_classes)
+    except Exception as e:
+        print(f"❌ Failed to initialize local classifier: {str(e)}")
+        return None
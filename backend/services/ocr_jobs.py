@@ -0,0 +1,332 @@
+# services/ocr_jobs.py
+import os
+import json
+import time
+import uuid
+import sqlite3
+import asyncio
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+from fastapi import UploadFile, HTTPException
+from dotenv import load_dotenv
+
+from .ai_pipeline import ai_pipeline, OCR_MAX_CONCURRENCY
+
+load_dotenv()
+
+OCR_JOBS_DIR = os.getenv("OCR_JOBS_DIR", os.path.join(os.path.dirname(__file__), '..', 'ocr_jobs'))
+OCR_JOB_WORKERS = int(os.getenv("OCR_JOB_WORKERS", str(OCR_MAX_CONCURRENCY)))
+OCR_JOB_MAX_QUEUE = int(os.getenv("OCR_JOB_MAX_QUEUE", "500"))
+OCR_JOB_MAX_ATTEMPTS = int(os.getenv("OCR_JOB_MAX_ATTEMPTS", "3"))
+OCR_JOB_RETENTION_DAYS = int(os.getenv("OCR_JOB_RETENTION_DAYS", "7"))
+
+# A running job's claim on its worker - renewed while the job is in flight (the
+# wait for an OCR thread plus the 300s LLMWhisperer wait has no fixed bound),
+# so only the lease of a worker that died runs out
+OCR_JOB_LEASE_SECONDS = 360
+OCR_JOB_LEASE_RENEW_SECONDS = OCR_JOB_LEASE_SECONDS // 3
+
+# How often running jobs are checked for an expired lease - a worker process that
+# crashed and restarted within the lease leaves jobs behind that only expire later
+OCR_JOB_SWEEP_SECONDS = 60
+
+# LLMWhisperer / upstream failures worth another attempt
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class OCRJobStore:
+    """
+    SQLite-backed OCR job state
+    Survives restarts so interrupted jobs can be picked up again
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS ocr_jobs (
+                id TEXT PRIMARY KEY,
+                filename TEXT NOT NULL,
+                form_type TEXT NOT NULL,
+                file_path TEXT NOT NULL,
+                status TEXT NOT NULL,
+                progress TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                lease_until REAL,
+                result TEXT,
+                error TEXT,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS ix_ocr_jobs_status ON ocr_jobs (status)")
+
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        with self.lock:
+            return self.conn.execute(sql, params)
+
+    def create(self, job_id: str, filename: str, form_type: str, file_path: str):
+        now = datetime.now().isoformat()
+        self._execute(
+            "INSERT INTO ocr_jobs (id, filename, form_type, file_path, status, progress, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, 'queued', 'Waiting for an OCR worker', ?, ?)",
+            (job_id, filename, form_type, file_path, now, now)
+        )
+
+    def get(self, job_id: str) -> Optional[sqlite3.Row]:
+        return self._execute("SELECT * FROM ocr_jobs WHERE id = ?", (job_id,)).fetchone()
+
+    def claim(self, job_id: str) -> Optional[int]:
+        """
+        Atomically move a queued job to running and return the attempt number
+        that now owns it; None if it is not queued (finished, or another worker has it)
+        """
+        row = self._execute(
+            "UPDATE ocr_jobs SET status = 'running', progress = 'Extracting text with LLMWhisperer', "
+            "attempts = attempts + 1, lease_until = ?, updated_at = ? WHERE id = ? AND status = 'queued' "
+            "RETURNING attempts",
+            (time.time() + OCR_JOB_LEASE_SECONDS, datetime.now().isoformat(), job_id)
+        ).fetchone()
+        return row["attempts"] if row else None
+
+    # The updates below only apply while `attempt` still owns the running job: a run
+    # whose lease expired and was requeued must not overwrite the newer attempt
+
+    def renew(self, job_id: str, attempt: int) -> bool:
+        """Extend the lease of a job in flight; False once this attempt no longer owns it"""
+        cursor = self._execute(
+            "UPDATE ocr_jobs SET lease_until = ? WHERE id = ? AND status = 'running' AND attempts = ?",
+            (time.time() + OCR_JOB_LEASE_SECONDS, job_id, attempt)
+        )
+        return cursor.rowcount == 1
+
+    def requeue(self, job_id: str, attempt: int, error: str) -> bool:
+        cursor = self._execute(
+            "UPDATE ocr_jobs SET status = 'queued', progress = 'Retry scheduled', lease_until = NULL, "
+            "error = ?, updated_at = ? WHERE id = ? AND status = 'running' AND attempts = ?",
+            (error, datetime.now().isoformat(), job_id, attempt)
+        )
+        return cursor.rowcount == 1
+
+    def finish(
+        self,
+        job_id: str,
+        attempt: int,
+        succeeded: bool,
+        result: Optional[Dict[str, Any]],
+        error: Optional[str] = None
+    ) -> bool:
+        cursor = self._execute(
+            "UPDATE ocr_jobs SET status = ?, progress = ?, lease_until = NULL, result = ?, error = ?, "
+            "updated_at = ? WHERE id = ? AND status = 'running' AND attempts = ?",
+            (
+                "succeeded" if succeeded else "failed",
+                "Completed" if succeeded else "Failed",
+                json.dumps(result) if result is not None else None,
+                error,
+                datetime.now().isoformat(),
+                job_id,
+                attempt
+            )
+        )
+        return cursor.rowcount == 1
+
+    def count_active(self) -> int:
+        return self._execute(
+            "SELECT COUNT(*) FROM ocr_jobs WHERE status IN ('queued', 'running')"
+        ).fetchone()[0]
+
+    def requeue_expired(self) -> List[str]:
+        """Requeue running jobs whose lease has run out (their worker died) and return their ids"""
+        rows = self._execute(
+            "UPDATE ocr_jobs SET status = 'queued', progress = 'Interrupted, retrying', lease_until = NULL, "
+            "updated_at = ? WHERE status = 'running' AND lease_until < ? RETURNING id",
+            (datetime.now().isoformat(), time.time())
+        ).fetchall()
+        return [row["id"] for row in rows]
+
+    def recover(self) -> List[str]:
+        """Requeue jobs whose worker died mid-run and return every queued job id"""
+        self.requeue_expired()
+        rows = self._execute("SELECT id FROM ocr_jobs WHERE status = 'queued' ORDER BY created_at").fetchall()
+        return [row["id"] for row in rows]
+
+    def purge_finished(self, older_than: datetime) -> int:
+        cursor = self._execute(
+            "DELETE FROM ocr_jobs WHERE status IN ('succeeded', 'failed') AND updated_at < ?",
+            (older_than.isoformat(),)
+        )
+        return cursor.rowcount
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class OCRJobQueue:
+    """
+    Background OCR job runner for Aṭavī Atlas
+    Uploads are spooled to disk, acknowledged with a job id and processed by a worker pool
+    """
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+        self.jobs_dir = os.path.abspath(OCR_JOBS_DIR)
+        self.spool_dir = os.path.join(self.jobs_dir, "uploads")
+        os.makedirs(self.spool_dir, exist_ok=True)
+        self.store = OCRJobStore(os.path.join(self.jobs_dir, "ocr_jobs.sqlite3"))
+        self.queue: Optional[asyncio.Queue] = None
+        self.workers: List[asyncio.Task] = []
+
+        print(f"📥 OCR job queue ready ({OCR_JOB_WORKERS} workers, store: {self.jobs_dir})")
+
+    async def start(self):
+        """Start workers and resume jobs left over from a previous run"""
+        self.queue = asyncio.Queue()
+        self.store.purge_finished(datetime.now() - timedelta(days=OCR_JOB_RETENTION_DAYS))
+        pending = self.store.recover()
+        for job_id in pending:
+            self.queue.put_nowait(job_id)
+        if pending:
+            print(f"🔁 Resuming {len(pending)} OCR jobs")
+        self.workers = [asyncio.create_task(self._worker()) for _ in range(OCR_JOB_WORKERS)]
+        self.workers.append(asyncio.create_task(self._sweep_expired_leases()))
+
+    async def stop(self):
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+        self.store.close()
+
+    async def submit(self, file: UploadFile, form_type: str) -> Dict[str, Any]:
+        """Spool an upload and queue it for OCR"""
+        if not file.filename:
+            raise HTTPException(status_code=400, detail="No file provided")
+        if self.store.count_active() >= OCR_JOB_MAX_QUEUE:
+            raise HTTPException(
+                status_code=429,
+                detail="OCR job queue is full, please retry shortly",
+                headers={"Retry-After": "60"}
+            )
+
+        job_id = uuid.uuid4().hex
+        file_path = await self.pipeline.save_upload(file, directory=self.spool_dir)
+        self.store.create(job_id, file.filename, form_type, file_path)
+        self.queue.put_nowait(job_id)
+
+        print(f"📥 Queued OCR job {job_id} for {file.filename} (Type: {form_type})")
+        return self.get_job(job_id)
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self.store.get(job_id)
+        if row is None:
+            return None
+        job = {
+            "job_id": row["id"],
+            "status": row["status"],
+            "progress": row["progress"],
+            "filename": row["filename"],
+            "form_type": row["form_type"],
+            "attempts": row["attempts"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"]
+        }
+        if row["error"]:
+            job["error"] = row["error"]
+        if row["result"]:
+            job["result"] = json.loads(row["result"])
+        return job
+
+    async def _worker(self):
+        while True:
+            job_id = await self.queue.get()
+            try:
+                await self._run_job(job_id)
+            except Exception as e:
+                print(f"🔥 OCR job {job_id} crashed: {str(e)}")
+            finally:
+                self.queue.task_done()
+
+    async def _sweep_expired_leases(self):
+        while True:
+            await asyncio.sleep(OCR_JOB_SWEEP_SECONDS)
+            try:
+                expired = self.store.requeue_expired()
+            except Exception as e:
+                print(f"⚠ OCR lease sweep failed: {str(e)}")
+                continue
+            for job_id in expired:
+                self.queue.put_nowait(job_id)
+            if expired:
+                print(f"🔁 Requeued {len(expired)} OCR jobs with expired leases")
+
+    async def _renew_lease(self, job_id: str, attempt: int):
+        while True:
+            await asyncio.sleep(OCR_JOB_LEASE_RENEW_SECONDS)
+            try:
+                if not self.store.renew(job_id, attempt):
+                    return
+            except Exception as e:
+                print(f"⚠ OCR job {job_id} lease renewal failed: {str(e)}")
+
+    async def _run_job(self, job_id: str):
+        attempt = self.store.claim(job_id)
+        if attempt is None:
+            return  # Finished, purged or taken by another worker process
+
+        row = self.store.get(job_id)
+        heartbeat = asyncio.create_task(self._renew_lease(job_id, attempt))
+        try:
+            await self._process(job_id, attempt, row)
+        except asyncio.CancelledError:
+            self.store.requeue(job_id, attempt, "Interrupted by shutdown")
+            raise
+        except Exception as e:
+            print(f"🔥 OCR job {job_id} crashed: {str(e)}")
+            self.store.finish(job_id, attempt, False, None, f"OCR job crashed: {str(e)}")
+        finally:
+            heartbeat.cancel()
+
+    async def _process(self, job_id: str, attempt: int, row: sqlite3.Row):
+        try:
+            result = await self.pipeline.ocr_service.process_fra_document(row["file_path"], row["form_type"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            result = {"success": False, "error": "Atlas OCR Processing Error", "message": str(e), "status_code": 500}
+
+        if result.get("success"):
+            if self.store.finish(job_id, attempt, True, self.pipeline.finalize_result(result, row["filename"], row["form_type"])):
+                self._discard_upload(row["file_path"])
+            return
+
+        error = f"{result.get('error')}: {result.get('message')}"
+        retryable = result.get("status_code") in RETRYABLE_STATUS_CODES
+        if retryable and attempt < OCR_JOB_MAX_ATTEMPTS:
+            delay = 30 * attempt
+            if self.store.requeue(job_id, attempt, error):
+                print(f"⚠ OCR job {job_id} failed (attempt {attempt}), retrying in {delay}s")
+                asyncio.get_running_loop().call_later(delay, self.queue.put_nowait, job_id)
+            return
+
+        if self.store.finish(job_id, attempt, False, self.pipeline.finalize_result(result, row["filename"], row["form_type"]), error):
+            self._discard_upload(row["file_path"])
+
+    def _discard_upload(self, file_path: str):
+        try:
+            os.unlink(file_path)
+        except OSError:
+            pass  # Ignore cleanup errors
+
+
+# Global instance
+try:
+    ocr_job_queue = OCRJobQueue(ai_pipeline) if ai_pipeline is not None else None
+except Exception as e:
+    print(f"❌ Failed to initialize OCR job queue: {str(e)}")
+    ocr_job_queue = None
@@ -0,0 +1,121 @@
+# services/stats_cache.py
+import os
+import json
+import asyncio
+import hashlib
+import threading
+from itertools import chain
+from typing import Any, Callable, Dict, Optional, Tuple
+from cachetools import TTLCache
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from dotenv import load_dotenv
+
+from .claims_service import Claim, GISAsset, GISAnalytics
+
+load_dotenv()
+
+STATS_CACHE_TTL_SECONDS = int(os.getenv("STATS_CACHE_TTL_SECONDS", "30"))
+
+# Writes to these models change what the stats endpoints report
+STATS_MODELS = (Claim, GISAsset, GISAnalytics)
+
+
+def compute_etag(payload: Dict[str, Any]) -> str:
+    body = json.dumps(payload, sort_keys=True, default=str)
+    return f'"{hashlib.sha256(body.encode()).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match comparison (weak, per RFC 9110)"""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+class StatsCache:
+    """
+    In-process TTL cache for the dashboard statistics endpoints
+    Entries are (payload, etag); any committed write to claims or GIS rows clears
+    the cache - the next computation still reads the claim_stats_summary table,
+    rebuilt at most every STATS_MAX_STALENESS_SECONDS under steady writes
+    """
+
+    def __init__(self, ttl: int = STATS_CACHE_TTL_SECONDS):
+        self.entries = TTLCache(maxsize=32, ttl=ttl)
+        self.lock = threading.Lock()  # Invalidation runs on threadpool and event-loop threads
+        self.compute_locks: Dict[str, asyncio.Lock] = {}
+        self.generation = 0  # Bumped by every invalidation
+
+    async def get(self, name: str, compute: Callable[[], Dict[str, Any]]) -> Tuple[Dict[str, Any], str]:
+        """
+        Cached (payload, etag) for a statistic; compute runs in the threadpool on a miss
+        Concurrent misses for the same statistic share one computation
+        """
+        with self.lock:
+            cached = self.entries.get(name)
+        if cached is not None:
+            return cached
+
+        async with self.compute_locks.setdefault(name, asyncio.Lock()):
+            with self.lock:
+                cached = self.entries.get(name)
+                if cached is not None:
+                    return cached
+                generation = self.generation
+
+            payload = await run_in_threadpool(compute)
+            entry = (payload, compute_etag(payload))
+            with self.lock:
+                # A write committed mid-computation may not be reflected - don't cache it
+                if "error" not in payload and generation == self.generation:
+                    self.entries[name] = entry
+            return entry
+
+    def invalidate(self):
+        with self.lock:
+            self.entries.clear()
+            self.generation += 1
+
+    def status(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "cached": sorted(self.entries.keys()),
+                "ttl_seconds": self.entries.ttl,
+                "generation": self.generation
+            }
+
+
+# Global instance
+stats_cache = StatsCache()
+
+
+@event.listens_for(Session, "after_flush")
+def _track_stats_writes(session, flush_context):
+    if any(isinstance(obj, STATS_MODELS) for obj in chain(session.new, session.dirty, session.deleted)):
+        session.info["stats_dirty"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_writes(orm_execute_state):
+    """Bulk INSERT/UPDATE/DELETE statements bypass the flush"""
+    mapper = orm_execute_state.bind_mapper
+    if not orm_execute_state.is_select and mapper is not None and mapper.class_ in STATS_MODELS:
+        orm_execute_state.session.info["stats_dirty"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    if session.in_nested_transaction():
+        return  # A released SAVEPOINT - nothing is visible to other sessions yet
+    if session.info.pop("stats_dirty", False):
+        stats_cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    # A rolled-back SAVEPOINT leaves earlier writes of the outer transaction pending
+    if not session.in_nested_transaction():
+        session.info.pop("stats_dirty", None)
@@ -0,0 +1,86 @@
+# services/storage_service.py
+import os
+import asyncio
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, BinaryIO, Dict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+S3_BUCKET_NAME = os.getenv("S3_BUCKET_NAME", "fra-docs")
+AWS_REGION = os.getenv("AWS_REGION")
+# Point at MinIO or another S3-compatible endpoint for local development
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL") or None
+
+# Uploads running at once, and parallel multipart parts within each upload
+S3_UPLOAD_WORKERS = int(os.getenv("S3_UPLOAD_WORKERS", "8"))
+S3_UPLOAD_CONCURRENCY = int(os.getenv("S3_UPLOAD_CONCURRENCY", "4"))
+S3_MULTIPART_CHUNK_MB = int(os.getenv("S3_MULTIPART_CHUNK_MB", "8"))
+
+# Every part of every running upload holds its own HTTP connection
+S3_MAX_POOL_CONNECTIONS = S3_UPLOAD_WORKERS * S3_UPLOAD_CONCURRENCY
+
+s3_client = boto3.client(
+    's3',
+    aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+    aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+    region_name=AWS_REGION,
+    endpoint_url=S3_ENDPOINT_URL,
+    config=Config(
+        max_pool_connections=S3_MAX_POOL_CONNECTIONS,
+        retries={"max_attempts": 5, "mode": "adaptive"},
+        connect_timeout=10,
+        read_timeout=60,
+        tcp_keepalive=True
+    )
+)
+
+
+class S3StorageService:
+    """
+    Non-blocking S3 document storage
+    boto3 transfers run on a dedicated thread pool so uploads never stall the event loop
+    """
+
+    def __init__(self, client=s3_client, bucket: str = S3_BUCKET_NAME, workers: int = S3_UPLOAD_WORKERS):
+        self.client = client
+        self.bucket = bucket
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="s3-upload")
+        self.transfer_config = TransferConfig(
+            multipart_threshold=S3_MULTIPART_CHUNK_MB * 1024 * 1024,
+            multipart_chunksize=S3_MULTIPART_CHUNK_MB * 1024 * 1024,
+            max_concurrency=S3_UPLOAD_CONCURRENCY,
+            use_threads=True
+        )
+        print(f"☁  S3 storage ready (bucket: {bucket}, {workers} upload workers)")
+
+    def object_url(self, key: str) -> str:
+        if S3_ENDPOINT_URL:
+            return f"{S3_ENDPOINT_URL.rstrip('/')}/{self.bucket}/{key}"
+        return f"https://{self.bucket}.s3.{AWS_REGION}.amazonaws.com/{key}"
+
+    def _upload(self, fileobj: BinaryIO, key: str, content_type: str):
+        self.client.upload_fileobj(
+            fileobj,
+            self.bucket,
+            key,
+            ExtraArgs={'ContentType': content_type},
+            Config=self.transfer_config
+        )
+
+    async def upload_fileobj(self, fileobj: BinaryIO, key: str, content_type: str) -> str:
+        """Upload a file object without blocking the event loop and return its URL"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, self._upload, fileobj, key, content_type)
+        return self.object_url(key)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+
+# Global instance
+s3_storage = S3StorageService()
@@ -0,0 +1,140 @@
+# services/transliteration.py
+"""
+Spelling-tolerant search keys for claimant, village and district names
+
+Names arrive from OCR in Odia or Devanagari script and from officers typed in
+whatever Latin spelling they prefer ("Sukram"/"Sookram", "Krishna"/"Krushna",
+"Bikash"/"Vikas"). Both sides are reduced to the same phonetic key - script
+romanized, aspiration and doubled letters dropped, common variants merged - and
+the keys are compared with trigram similarity.
+"""
+import re
+import unicodedata
+from typing import Iterable, List, Optional, Tuple
+
+# Devanagari (U+0900) and Odia (U+0B00) follow the same ISCII layout, so one
+# table indexed by offset within the block romanizes both scripts
+_INDEPENDENT_VOWELS = {
+    0x05: "a", 0x06: "aa", 0x07: "i", 0x08: "ii", 0x09: "u", 0x0A: "uu",
+    0x0B: "ri", 0x0C: "li", 0x0F: "e", 0x10: "ai", 0x13: "o", 0x14: "au"
+}
+_CONSONANTS = {
+    0x15: "k", 0x16: "kh", 0x17: "g", 0x18: "gh", 0x19: "ng",
+    0x1A: "ch", 0x1B: "chh", 0x1C: "j", 0x1D: "jh", 0x1E: "ny",
+    0x1F: "t", 0x20: "th", 0x21: "d", 0x22: "dh", 0x23: "n",
+    0x24: "t", 0x25: "th", 0x26: "d", 0x27: "dh", 0x28: "n",
+    0x2A: "p", 0x2B: "ph", 0x2C: "b", 0x2D: "bh", 0x2E: "m",
+    0x2F: "y", 0x30: "r", 0x32: "l", 0x33: "l", 0x35: "v",
+    0x36: "sh", 0x37: "sh", 0x38: "s", 0x39: "h",
+    0x5C: "r", 0x5D: "rh", 0x5F: "y", 0x71: "w"
+}
+_VOWEL_SIGNS = {
+    0x3E: "aa", 0x3F: "i", 0x40: "ii", 0x41: "u", 0x42: "uu", 0x43: "ri",
+    0x47: "e", 0x48: "ai", 0x4B: "o", 0x4C: "au", 0x56: "ai", 0x57: "au"
+}
+_NASALS = {0x01: "n", 0x02: "n", 0x03: "h"}
+_VIRAMA = 0x4D
+_NUKTA = 0x3C
+_NUKTA_FORMS = {"d": "r", "dh": "rh"}  # ड़ / ଡ଼ are flaps: Sundargarh
+_SCRIPT_BLOCKS = (0x0900, 0x0B00)
+
+# Latin spelling variants folded together, applied in order
+_LATIN_FOLDS = [
+    (re.compile(r"([bcdgjkprst])h"), r"\1"),  # aspirates: bh, kh, sh, th ... -> b, k, s, t
+    (re.compile(r"ee"), "i"),
+    (re.compile(r"oo"), "u"),
+    (re.compile(r"y$"), "i"),               # Mohanty / Mohanti
+    (re.compile(r"[yz]"), "j"),             # Odia ଯ is "ja": Yadav / Jadav
+    (re.compile(r"[vw]"), "b"),             # Bikash / Vikas, Biswal / Viswal
+    (re.compile(r"o"), "a"),                # Odia inherent vowel: Mohapatra / Mahapatra, Rout / Raut
+    (re.compile(r"ny"), "n"),
+    (re.compile(r"q"), "k"),
+    (re.compile(r"x"), "ks"),
+    (re.compile(r"(.)\1+"), r"\1")          # Mohapatra / Mohhapatra, Sahoo / Sahu
+]
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def _block_offset(char: str) -> Optional[int]:
+    code = ord(char)
+    for block in _SCRIPT_BLOCKS:
+        if block <= code < block + 0x80:
+            return code - block
+    return None
+
+
+def _drop_medial_schwas(units: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """
+    Inherent "a" is silent between a vowel-consonant and a consonant-vowel:
+    बुधनी is "Budhni", not "Budhani"
+    """
+    kept = []
+    for i, (text, kind) in enumerate(units):
+        if (
+            kind == "A"
+            and len(kept) >= 2 and kept[-1][1] == "C" and kept[-2][1] in ("V", "A")
+            and i + 2 < len(units) and units[i + 1][1] == "C" and units[i + 2][1] in ("V", "A")
+        ):
+            continue
+        kept.append((text, kind))
+    return kept
+
+
+def romanize(text: str) -> str:
+    """Romanize Odia and Devanagari characters; other text passes through"""
+    # (text, kind): C consonant, V vowel, A inherent vowel, O anything else
+    units: List[Tuple[str, str]] = []
+    pending_vowel = False  # Consonant written without its inherent "a" yet
+    for char in text:
+        offset = _block_offset(char)
+        if offset is None or offset not in _VOWEL_SIGNS and offset not in (_VIRAMA, _NUKTA):
+            if pending_vowel:
+                units.append(("a", "A"))
+            pending_vowel = False
+        if offset is None:
+            units.append((char, "O"))
+        elif offset in _CONSONANTS:
+            units.append((_CONSONANTS[offset], "C"))
+            pending_vowel = True
+        elif offset in _VOWEL_SIGNS:
+            units.append((_VOWEL_SIGNS[offset], "V"))
+            pending_vowel = False
+        elif offset == _VIRAMA:
+            pending_vowel = False
+        elif offset == _NUKTA:
+            if units and units[-1][1] == "C":
+                units[-1] = (_NUKTA_FORMS.get(units[-1][0], units[-1][0]), "C")
+        elif offset in _INDEPENDENT_VOWELS:
+            units.append((_INDEPENDENT_VOWELS[offset], "V"))
+        elif offset in _NASALS:
+            units.append((_NASALS[offset], "C"))
+        elif 0x66 <= offset <= 0x6F:
+            units.append((str(offset - 0x66), "O"))  # Script digits
+    if pending_vowel:
+        units.append(("a", "A"))
+    return "".join(text for text, _ in _drop_medial_schwas(units))
+
+
+def _fold_word(word: str) -> str:
+    for pattern, replacement in _LATIN_FOLDS:
+        word = pattern.sub(replacement, word)
+    # Trailing schwa is written in Latin spellings but dropped in speech (Rama / Ram)
+    if len(word) > 3 and word.endswith("a"):
+        word = word[:-1]
+    return word
+
+
+def phonetic_key(text: Optional[str]) -> str:
+    """Search key for a name or query: romanized, lower-case, spelling variants folded"""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFC", text)
+    latin = unicodedata.normalize("NFKD", romanize(text).lower())
+    latin = "".join(char for char in latin if not unicodedata.combining(char))
+    words = _NON_ALNUM.sub(" ", latin).split()
+    return " ".join(_fold_word(word) for word in words)
+
+
+def search_document(values: Iterable[Optional[str]]) -> str:
+    """Phonetic key of every searchable value, as stored in Claim.search_text"""
+    return " ".join(key for key in (phonetic_key(value) for value in values) if key)
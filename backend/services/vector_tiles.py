@@ -0,0 +1,479 @@
+# services/vector_tiles.py
+"""
+Mapbox Vector Tiles (MVT) for claim points and parcel boundaries
+
+Features are read through the spatial indexes (PostGIS or geohash), projected
+to Web Mercator tile coordinates, clipped to the tile plus a small buffer and
+simplified in tile units - so the detail kept follows the zoom level - and
+encoded with a minimal hand-written protobuf writer (spec v2.1, no extra
+dependencies). Encoded tiles are cached on disk; every commit that moves a
+claim point, changes its status or replaces its boundary deletes the cached
+tiles covering the old and new bounds.
+"""
+import os
+import math
+import struct
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+
+from .claims_service import session_scope, select_claim_points, select_claim_geometries, viewport_limit
+
+load_dotenv()
+
+MVT_CONTENT_TYPE = "application/vnd.mapbox-vector-tile"
+TILE_EXTENT = 4096
+TILE_BUFFER = 64  # Extent units drawn beyond each edge, so strokes don't break at tile seams
+TILE_MAX_ZOOM = 22
+
+# Parcels are sub-pixel below this zoom; points are capped per tile by viewport_limit(zoom)
+TILE_PARCELS_MIN_ZOOM = int(os.getenv("TILE_PARCELS_MIN_ZOOM", "10"))
+# Douglas-Peucker tolerance in extent units (1/8 px on a 256 px tile)
+TILE_SIMPLIFY_TOLERANCE = 2.0
+
+# Encoded tile cache (set TILE_CACHE_ENABLED=false to render every request)
+TILE_CACHE_ENABLED = os.getenv("TILE_CACHE_ENABLED", "true").lower() == "true"
+TILE_CACHE_DIR = os.getenv("TILE_CACHE_DIR") or os.path.join(os.path.dirname(__file__), '..', 'tile_cache')
+TILE_CACHE_MAX_MB = int(os.getenv("TILE_CACHE_MAX_MB", "256"))
+TILE_CACHE_MAX_AGE_HOURS = int(os.getenv("TILE_CACHE_MAX_AGE_HOURS", "24"))
+
+Point = Tuple[float, float]
+Ring = List[Point]
+
+
+# Protobuf wire format
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _zigzag(value: int) -> int:
+    return (value << 1) ^ (value >> 63)
+
+
+def _key(field: int, wire_type: int) -> bytes:
+    return _varint(field << 3 | wire_type)
+
+
+def _length_delimited(field: int, payload: bytes) -> bytes:
+    return _key(field, 2) + _varint(len(payload)) + payload
+
+
+def _uint_field(field: int, value: int) -> bytes:
+    return _key(field, 0) + _varint(value)
+
+
+def _packed(field: int, values: Iterable[int]) -> bytes:
+    return _length_delimited(field, b"".join(_varint(value) for value in values))
+
+
+def _encode_value(value: Any) -> bytes:
+    """Layer.Value message"""
+    if isinstance(value, bool):
+        return _uint_field(7, int(value))
+    if isinstance(value, int):
+        return _uint_field(5, value) if value >= 0 else _uint_field(6, _zigzag(value))
+    if isinstance(value, float):
+        return _key(3, 1) + struct.pack("<d", value)
+    return _length_delimited(1, str(value).encode("utf-8"))
+
+
+# Feature = (id, geometry type, geometry commands, properties)
+Feature = Tuple[int, int, List[int], Dict[str, Any]]
+GEOM_POINT = 1
+GEOM_POLYGON = 3
+
+
+def encode_layer(name: str, features: Sequence[Feature]) -> bytes:
+    """Tile.layers entry; property keys and values are shared through the layer tables"""
+    keys: Dict[str, int] = {}
+    values: Dict[Tuple[type, Any], int] = {}
+    encoded_features = []
+    for feature_id, geometry_type, geometry, properties in features:
+        tags = []
+        for key, value in properties.items():
+            if value is None:
+                continue
+            tags.append(keys.setdefault(key, len(keys)))
+            tags.append(values.setdefault((type(value), value), len(values)))
+        encoded_features.append(_length_delimited(2, (
+            _uint_field(1, feature_id)
+            + _packed(2, tags)
+            + _uint_field(3, geometry_type)
+            + _packed(4, geometry)
+        )))
+    layer = (
+        _uint_field(15, 2)
+        + _length_delimited(1, name.encode("utf-8"))
+        + b"".join(encoded_features)
+        + b"".join(_length_delimited(3, key.encode("utf-8")) for key in keys)
+        + b"".join(_length_delimited(4, _encode_value(value)) for _, value in values)
+        + _uint_field(5, TILE_EXTENT)
+    )
+    return _length_delimited(3, layer)
+
+
+def _command(command_id: int, count: int) -> int:
+    return command_id & 0x7 | count << 3
+
+
+def point_geometry(x: int, y: int) -> List[int]:
+    return [_command(1, 1), _zigzag(x), _zigzag(y)]
+
+
+def polygon_geometry(rings: Sequence[Sequence[Tuple[int, int]]]) -> List[int]:
+    """MoveTo, LineTo..., ClosePath per ring, coordinates delta-encoded across rings"""
+    commands = []
+    cursor_x = cursor_y = 0
+    for ring in rings:
+        for index, (x, y) in enumerate(ring):
+            if index == 0:
+                commands.append(_command(1, 1))
+            elif index == 1:
+                commands.append(_command(2, len(ring) - 1))
+            commands.extend((_zigzag(x - cursor_x), _zigzag(y - cursor_y)))
+            cursor_x, cursor_y = x, y
+        commands.append(_command(7, 1))
+    return commands
+
+
+# Projection, clipping and simplification in tile coordinates
+
+def tile_bounds(z: int, x: int, y: int, buffer: float = 0.0) -> Tuple[float, float, float, float]:
+    """(south, west, north, east) of a tile, grown by buffer tile widths on each side"""
+    n = 1 << z
+
+    def latitude(tile_y: float) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * tile_y / n))))
+
+    return (
+        max(latitude(y + 1 + buffer), -85.0511287798), max((x - buffer) / n * 360 - 180, -180.0),
+        min(latitude(y - buffer), 85.0511287798), min((x + 1 + buffer) / n * 360 - 180, 180.0)
+    )
+
+
+def _projector(z: int, x: int, y: int):
+    n = 1 << z
+
+    def project(longitude: float, latitude: float) -> Point:
+        latitude = max(min(latitude, 85.0511287798), -85.0511287798)
+        world_x = (longitude + 180) / 360 * n
+        world_y = (1 - math.asinh(math.tan(math.radians(latitude))) / math.pi) / 2 * n
+        return (world_x - x) * TILE_EXTENT, (world_y - y) * TILE_EXTENT
+
+    return project
+
+
+def _clip_ring(ring: Ring, low: float, high: float) -> Ring:
+    """Sutherland-Hodgman against the square [low, high] x [low, high]"""
+    edges = (
+        (lambda p: p[0] >= low, 0, low), (lambda p: p[0] <= high, 0, high),
+        (lambda p: p[1] >= low, 1, low), (lambda p: p[1] <= high, 1, high)
+    )
+    for inside, axis, bound in edges:
+        if not ring:
+            break
+        clipped = []
+        previous = ring[-1]
+        for current in ring:
+            if inside(current) != inside(previous):
+                t = (bound - previous[axis]) / (current[axis] - previous[axis])
+                crossing = (previous[0] + t * (current[0] - previous[0]), previous[1] + t * (current[1] - previous[1]))
+                clipped.append((bound, crossing[1]) if axis == 0 else (crossing[0], bound))
+            if inside(current):
+                clipped.append(current)
+            previous = current
+        ring = clipped
+    return ring
+
+
+def _simplify(points: Ring, tolerance: float) -> Ring:
+    """Douglas-Peucker, iterative"""
+    if len(points) < 3:
+        return points
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        (x1, y1), (x2, y2) = points[first], points[last]
+        dx, dy = x2 - x1, y2 - y1
+        length = math.hypot(dx, dy)
+        farthest, max_distance = None, tolerance
+        for index in range(first + 1, last):
+            px, py = points[index]
+            distance = abs(dy * (px - x1) - dx * (py - y1)) / length if length else math.hypot(px - x1, py - y1)
+            if distance > max_distance:
+                farthest, max_distance = index, distance
+        if farthest is not None:
+            keep[farthest] = True
+            stack.extend(((first, farthest), (farthest, last)))
+    return [point for point, kept in zip(points, keep) if kept]
+
+
+def _ring_area(ring: Sequence[Tuple[int, int]]) -> float:
+    """Surveyor's formula in tile coordinates - positive for MVT exterior rings"""
+    return sum(
+        x1 * y2 - x2 * y1 for (x1, y1), (x2, y2) in zip(ring, ring[1:] + ring[:1])
+    ) / 2
+
+
+def _tile_ring(ring: Sequence[Sequence[float]], project, exterior: bool) -> Optional[List[Tuple[int, int]]]:
+    """Project, clip, simplify and snap one GeoJSON ring; None if nothing visible is left"""
+    points = [project(point[0], point[1]) for point in ring]
+    if len(points) > 1 and points[0] == points[-1]:
+        points.pop()
+    points = _clip_ring(points, -TILE_BUFFER, TILE_EXTENT + TILE_BUFFER)
+    if len(points) < 3:
+        return None
+    points = _simplify(points + points[:1], TILE_SIMPLIFY_TOLERANCE)[:-1]
+    snapped = []
+    for x, y in points:
+        point = (round(x), round(y))
+        if not snapped or snapped[-1] != point:
+            snapped.append(point)
+    if len(snapped) > 1 and snapped[0] == snapped[-1]:
+        snapped.pop()
+    area = _ring_area(snapped) if len(snapped) >= 3 else 0
+    if abs(area) < 1:
+        return None
+    if (area > 0) != exterior:
+        snapped.reverse()
+    return snapped
+
+
+def _parcel_features(parcels: Iterable[Tuple[int, Dict[str, Any], Optional[str]]], project) -> List[Feature]:
+    features = []
+    for claim_id, geometry, status in parcels:
+        rings = []
+        for polygon in geometry["coordinates"]:
+            exterior = _tile_ring(polygon[0], project, exterior=True)
+            if exterior is None:
+                continue
+            rings.append(exterior)
+            rings.extend(hole for hole in (_tile_ring(ring, project, exterior=False) for ring in polygon[1:]) if hole)
+        if rings:
+            features.append((claim_id, GEOM_POLYGON, polygon_geometry(rings), {"claim_id": claim_id, "status": status}))
+    return features
+
+
+def render_tile(z: int, x: int, y: int) -> bytes:
+    """Encode the "claims" (points) and "parcels" (boundaries) layers of a tile"""
+    south, west, north, east = tile_bounds(z, x, y, buffer=TILE_BUFFER / TILE_EXTENT)
+    with session_scope() as db:
+        points = db.execute(select_claim_points(south, west, north, east, viewport_limit(z))).all()
+        parcels = db.execute(select_claim_geometries(south, west, north, east)).all() if z >= TILE_PARCELS_MIN_ZOOM else []
+
+    project = _projector(z, x, y)
+    point_features = []
+    for claim_id, latitude, longitude, status, form_subtype in points:
+        tile_x, tile_y = project(longitude, latitude)
+        point_features.append((
+            claim_id, GEOM_POINT, point_geometry(round(tile_x), round(tile_y)),
+            {"claim_id": claim_id, "status": status, "form_subtype": form_subtype}
+        ))
+    parcel_features = _parcel_features(parcels, project)
+
+    tile = b""
+    if point_features:
+        tile += encode_layer("claims", point_features)
+    if parcel_features:
+        tile += encode_layer("parcels", parcel_features)
+    return tile
+
+
+# On-disk tile cache
+
+def _tile_range(bounds: Tuple[float, float, float, float], z: int) -> Tuple[range, range]:
+    """Tiles at zoom z whose buffered area touches bounds"""
+    south, west, north, east = bounds
+    project = _projector(z, 0, 0)
+    left, top = project(west, north)
+    right, bottom = project(east, south)
+    margin = TILE_BUFFER
+    last = (1 << z) - 1
+    return (
+        range(max(int((left - margin) // TILE_EXTENT), 0), min(int((right + margin) // TILE_EXTENT), last) + 1),
+        range(max(int((top - margin) // TILE_EXTENT), 0), min(int((bottom + margin) // TILE_EXTENT), last) + 1)
+    )
+
+
+class TileCache:
+    """
+    Encoded tiles on disk as {z}/{x}/{y}.mvt, evicted by age and total size
+    invalidate() deletes the tiles covering changed bounds at every zoom, off the caller's thread
+    """
+
+    EVICT_EVERY = 256  # Writes between size checks - a full scan per tile would dominate
+
+    def __init__(self, cache_dir: str, max_bytes: int = 256 * 1024 * 1024, max_age_seconds: int = 86400):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.lock = threading.Lock()
+        self.generation = 0  # Bumped by every invalidation
+        self.writes = 0
+        self.pending: Dict[int, Tuple[float, float, float, float]] = {}  # generation -> bounds not yet deleted
+        self.invalidator = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tile-invalidate")
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _tile_path(self, z: int, x: int, y: int) -> str:
+        return os.path.join(self.cache_dir, str(z), str(x), f"{y}.mvt")
+
+    def get(self, z: int, x: int, y: int) -> Optional[bytes]:
+        path = self._tile_path(z, x, y)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age_seconds or self._pending_invalidation(z, x, y):
+                self._remove(path)
+                return None
+            with open(path, "rb") as tile_file:
+                return tile_file.read()
+        except OSError:
+            return None
+
+    def put(self, z: int, x: int, y: int, tile: bytes, generation: int):
+        """Store a tile atomically unless geometry changed since it was rendered from generation"""
+        path = self._tile_path(z, x, y)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with tempfile.NamedTemporaryFile("wb", dir=os.path.dirname(path), suffix=".tmp", delete=False) as tmp:
+                tmp.write(tile)
+            with self.lock:
+                if generation != self.generation:
+                    self._remove(tmp.name)
+                    return
+                os.replace(tmp.name, path)
+                self.writes += 1
+                evict = self.writes % self.EVICT_EVERY == 0
+            if evict:
+                self.evict()
+        except OSError as e:
+            print(f"⚠ Tile cache write failed: {str(e)}")
+
+    def invalidate(self, changed_bounds: Iterable[Tuple[float, float, float, float]]) -> Optional[Future]:
+        """
+        Stop serving and caching tiles over changed_bounds, then delete them on
+        the invalidation thread - this runs in after_commit, on the event loop
+        for async sessions; the returned future completes once they are gone
+        """
+        changed_bounds = list(changed_bounds)
+        if not changed_bounds:
+            return None
+        # One tile range per zoom for the whole commit rather than one scan per changed claim
+        union = (
+            min(bounds[0] for bounds in changed_bounds), min(bounds[1] for bounds in changed_bounds),
+            max(bounds[2] for bounds in changed_bounds), max(bounds[3] for bounds in changed_bounds)
+        )
+        with self.lock:
+            self.generation += 1
+            generation = self.generation
+            self.pending[generation] = union
+        return self.invalidator.submit(self._delete_tiles, generation, union)
+
+    def _delete_tiles(self, generation: int, bounds: Tuple[float, float, float, float]):
+        try:
+            for z in range(TILE_MAX_ZOOM + 1):
+                columns, rows = _tile_range(bounds, z)
+                zoom_dir = os.path.join(self.cache_dir, str(z))
+                if not os.path.isdir(zoom_dir):
+                    continue
+                # Walk what is cached rather than every tile in range - a parcel spans millions at z22
+                for column in os.scandir(zoom_dir):
+                    if not (column.name.isdigit() and int(column.name) in columns):
+                        continue
+                    for entry in os.scandir(column.path):
+                        y = entry.name.partition(".")[0]
+                        if y.isdigit() and int(y) in rows:
+                            self._remove(entry.path)
+        except OSError as e:
+            print(f"⚠ Tile cache invalidation failed: {str(e)}")
+        finally:
+            with self.lock:
+                self.pending.pop(generation, None)
+
+    def _pending_invalidation(self, z: int, x: int, y: int) -> bool:
+        """Whether the tile lies in bounds whose deletion is still queued"""
+        with self.lock:
+            pending = list(self.pending.values())
+        for bounds in pending:
+            columns, rows = _tile_range(bounds, z)
+            if x in columns and y in rows:
+                return True
+        return False
+
+    def evict(self):
+        """Drop expired tiles, then the least recently written until under max_bytes"""
+        now = time.time()
+        entries = []
+        total_bytes = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if now - stat.st_mtime > self.max_age_seconds:
+                    self._remove(path)
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total_bytes += stat.st_size
+
+        if total_bytes <= self.max_bytes:
+            return
+        for _, size, path in sorted(entries):
+            self._remove(path)
+            total_bytes -= size
+            if total_bytes <= self.max_bytes:
+                break
+
+    def _remove(self, path: str):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+tile_cache = TileCache(
+    cache_dir=TILE_CACHE_DIR,
+    max_bytes=TILE_CACHE_MAX_MB * 1024 * 1024,
+    max_age_seconds=TILE_CACHE_MAX_AGE_HOURS * 3600
+) if TILE_CACHE_ENABLED else None
+
+
+def get_tile(z: int, x: int, y: int) -> bytes:
+    """Cached tile, rendered on a miss (blocking - run in the threadpool)"""
+    if tile_cache is None:
+        return render_tile(z, x, y)
+    tile = tile_cache.get(z, x, y)
+    if tile is None:
+        generation = tile_cache.generation
+        tile = render_tile(z, x, y)
+        tile_cache.put(z, x, y, tile, generation)
+    return tile
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_tiles(session):
+    if session.in_nested_transaction():
+        return  # A released SAVEPOINT - the outer transaction may still roll back
+    changed_bounds = session.info.pop("geometry_changes", None)
+    if changed_bounds and tile_cache is not None:
+        tile_cache.invalidate(changed_bounds)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_geometry_changes(session):
+    # A rolled-back SAVEPOINT keeps the bounds of the rows before it; the extra ones only over-invalidate
+    if not session.in_nested_transaction():
+        session.info.pop("geometry_changes", None)
@@ -3,13 +3,22 @@ import json
 import ee
 import geemap
 from fastapi import HTTPException
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
+from sqlalchemy import select
 from datetime import datetime
-from .claims_service import claims_service, GISAsset, GISAnalytics
+from .claims_service import claims_service, session_scope, GISAsset, GISAnalytics
+from .local_classifier import load_local_classifier
+from .gee_cache import GEEResultCache, analysis_key, GEE_CACHE_ENABLED, GEE_CACHE_PATH
 
 CLOUD_PROJECT_ID = 'fra-atlas-472812'
 CLASSIFIER_ASSET_ID = 'projects/fra-atlas-472812/assets/rf_model_odisha_multiclass_v1'
 
+# Imagery and reduction parameters - part of the result cache key
+S2_COLLECTION = 'COPERNICUS/S2_SR_HARMONIZED'
+S2_START_DATE = '2022-01-01'
+S2_END_DATE = '2022-12-31'
+ANALYSIS_SCALE_METERS = 30
+
 FROM_CLASSES = [10, 20, 30, 40, 50, 60, 80, 90]
 TO_CLASSES = [0, 1, 1, 2, 3, 3, 4, 4]
 
@@ -23,9 +32,48 @@ CLASS_PALETTE_NAMES = {
 
 VIS_PALETTE_COLORS = ['#228B22', '#C2B280', '#FFD700', '#A9A9A9', '#4169E1']
 
+# Claims per batch - one reduceRegions / getInfo each (getInfo returns at most 5000 features)
+GEE_BATCH_CHUNK_SIZE = int(os.getenv("GEE_BATCH_CHUNK_SIZE", "500"))
+GEE_BATCH_MAX_CLAIMS = int(os.getenv("GEE_BATCH_MAX_CLAIMS", "5000"))
+
+# Processing modes whose numbers are placeholders - returned for display, never stored
+MOCK_MODES = ("gee_fallback", "gee_unavailable")
+
+# Earth Engine error text for quota / rate limiting (HTTP 429, RESOURCE_EXHAUSTED,
+# "Too many concurrent aggregations") - worth retrying later, not falling back
+QUOTA_ERROR_MARKERS = ("too many concurrent", "too many requests", "quota", "rate limit", "resource_exhausted", "429")
+
+
+class GEEQuotaError(Exception):
+    """Earth Engine rejected the request because of quota or rate limits"""
+
+
+def is_quota_error(error: Exception) -> bool:
+    message = str(error).lower()
+    return any(marker in message for marker in QUOTA_ERROR_MARKERS)
+
+
 class WebGISService:
     def __init__(self):
         self.gee_available = self.initialize_gee()
+        self.result_cache = GEEResultCache(GEE_CACHE_PATH) if GEE_CACHE_ENABLED else None
+        self.model_version = self._classifier_version() if self.gee_available else None
+        self.local_classifier = load_local_classifier(FROM_CLASSES, TO_CLASSES)
+        if self.result_cache and self.model_version:
+            dropped = self.result_cache.invalidate(CLASSIFIER_ASSET_ID, keep_version=self.model_version)
+            if dropped:
+                print(f"🧹 Dropped {dropped} cached GEE results from an older classifier version")
+        print(f"🗄  GEE result cache: {'✅ ' + self.result_cache.db_path if self.result_cache else '❌ Disabled'}")
+
+    def _classifier_version(self) -> Optional[str]:
+        """Classifier asset's last update time - retraining in place changes it (GEE_MODEL_VERSION overrides)"""
+        if os.getenv("GEE_MODEL_VERSION"):
+            return os.getenv("GEE_MODEL_VERSION")
+        try:
+            return ee.data.getAsset(CLASSIFIER_ASSET_ID).get("updateTime")
+        except Exception as e:
+            print(f"⚠ Could not read classifier version: {e}")
+            return None
     
     def initialize_gee(self) -> bool:
         """Initialize Google Earth Engine and return availability status"""
@@ -58,21 +106,23 @@ class WebGISService:
             if self.gee_available:
                 try:
                     # ✅ Use real Google Earth Engine processing
-                    gee_results = self._process_with_gee(geojson_data)
+                    gee_results, processing_mode = self._cached_gee_results(geojson_data)
                     print(f"✅ GEE processing completed successfully")
-                    processing_mode = "gee_active"
                 except Exception as gee_error:
-                    print(f"⚠ GEE processing failed, falling back to mock data: {str(gee_error)}")
-                    gee_results = self._get_fallback_results()
-                    processing_mode = "gee_fallback"
+                    if is_quota_error(gee_error):
+                        raise GEEQuotaError(str(gee_error)) from gee_error
+                    print(f"⚠ GEE processing failed, falling back to offline classification: {str(gee_error)}")
+                    gee_results, processing_mode = self._offline_results(geojson_data, "gee_fallback")
             else:
-                # ✅ Fallback to mock data when GEE is not available
-                print("⚠ Using fallback mock data (GEE not available)")
-                gee_results = self._get_fallback_results()
-                processing_mode = "gee_unavailable"
+                # ✅ Classify offline when GEE is not available
+                print("⚠ GEE not available, using offline classification")
+                gee_results, processing_mode = self._offline_results(geojson_data, "gee_unavailable")
             
-            # Store results in database
-            storage_result = self._store_webgis_outputs(claim_id, gee_results, geojson_data)
+            # Store results in database - mock numbers are not an analysis of this claim
+            if processing_mode in MOCK_MODES:
+                storage_result = {"type": "PostgreSQL", "status": "skipped", "reason": "Fallback mock data is not stored"}
+            else:
+                storage_result = self._store_webgis_outputs(claim_id, gee_results, geojson_data)
             
             return {
                 "success": True,
@@ -83,7 +133,7 @@ class WebGISService:
                     "processed_at": datetime.now().isoformat(),
                     "atlas_version": "1.0.0",
                     "gee_status": processing_mode,
-                    "model_used": CLASSIFIER_ASSET_ID if processing_mode == "gee_active" else "fallback_data"
+                    "model_used": self._model_used(processing_mode)
                 },
                 "claim_info": {
                     "claim_id": claim_id,
@@ -92,10 +142,196 @@ class WebGISService:
                     "form_type": claim.get("form_type", "FRA Form")
                 }
             }
+        except GEEQuotaError:
+            raise  # Retried by the analysis executor
         except Exception as e:
             print(f"❌ WebGIS analysis failed: {str(e)}")
             raise HTTPException(status_code=500, detail=f"WebGIS processing failed: {str(e)}")
     
+    def _offline_results(self, geojson_data: dict, mock_mode: str) -> Tuple[Dict[str, Any], str]:
+        """(results, processing mode) from the local classifier, or mock data when it is unavailable or fails"""
+        if self.local_classifier is not None:
+            try:
+                gee_results = self._process_locally(geojson_data)
+                print(f"✅ Offline classification complete - Total area: {gee_results['total_area_hectares']} ha")
+                return gee_results, "local_classifier"
+            except Exception as local_error:
+                print(f"⚠ Offline classification failed, using mock data: {str(local_error)}")
+        return self._get_fallback_results(), mock_mode
+
+    def _process_locally(self, geojson_data: dict) -> Dict[str, Any]:
+        """Same result shape as _process_with_gee, from the local mosaic and model (no tile URL)"""
+        gee_results = self._analysis_results(self.local_classifier.class_areas(geojson_data), None)
+        gee_results["processing_metadata"] = self.local_classifier.metadata()
+        return gee_results
+
+    def _model_used(self, processing_mode: str) -> str:
+        if processing_mode in ("gee_active", "gee_cached"):
+            return CLASSIFIER_ASSET_ID
+        if processing_mode == "local_classifier":
+            return self.local_classifier.model_path
+        return "fallback_data"
+
+    def _cached_gee_results(self, geojson_data: dict) -> Tuple[Dict[str, Any], str]:
+        """
+        (GEE results, processing mode) - from the result cache when the same
+        geometry was classified with the same model, dates and scale before
+        """
+        if self.result_cache is None:
+            return self._process_with_gee(geojson_data), "gee_active"
+
+        key = analysis_key(geojson_data, CLASSIFIER_ASSET_ID, self.model_version, S2_START_DATE, S2_END_DATE, ANALYSIS_SCALE_METERS)
+        entry = self.result_cache.get(key)
+        if entry is None:
+            gee_results = self._process_with_gee(geojson_data)
+            self.result_cache.put(key, CLASSIFIER_ASSET_ID, self.model_version, gee_results)
+            return gee_results, "gee_active"
+
+        print(f"⚡ GEE result cache hit ({key[:12]})")
+        gee_results = entry["result"]
+        if entry["map_url_stale"]:
+            # Statistics still hold, only the tile URL has expired
+            image_url = self._map_url(self._classified_image(geemap.geojson_to_ee(geojson_data)))
+            gee_results = {**gee_results, "satellite_image_url": image_url, "image_url": image_url}
+            self.result_cache.refresh_map_url(key, gee_results)
+        return gee_results, "gee_cached"
+
+    def analyze_claims_batch(
+        self,
+        claim_ids: Optional[List[int]] = None,
+        village: Optional[str] = None,
+        district: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Land classification for every claim with a stored boundary in a village,
+        district or id list - one shared composite and one reduceRegions per
+        GEE_BATCH_CHUNK_SIZE claims instead of a full analysis per claim
+        """
+        try:
+            # One row past the cap tells a selection that is too large from one that fits exactly
+            boundaries = claims_service.get_claim_boundaries(claim_ids, village, district, limit=GEE_BATCH_MAX_CLAIMS + 1)
+            if not boundaries:
+                return {"success": False, "error": "No claims match the selection"}
+            if len(boundaries) > GEE_BATCH_MAX_CLAIMS:
+                return {
+                    "success": False,
+                    "error": f"Selection matches more than {GEE_BATCH_MAX_CLAIMS} claims - narrow it or send claim_ids in batches"
+                }
+            if not self.gee_available and self.local_classifier is None:
+                return {"success": False, "error": "Neither Google Earth Engine nor the local classifier is available"}
+
+            missing_boundary = [claim_id for claim_id, geometry in boundaries if geometry is None]
+            results: Dict[int, Dict[str, Any]] = {}
+            processing_modes: Dict[int, str] = {}
+            pending = []
+            for claim_id, geometry in boundaries:
+                if geometry is None:
+                    continue
+                if not self.gee_available:
+                    pending.append((claim_id, geometry, None))
+                    continue
+                key = analysis_key(geometry, CLASSIFIER_ASSET_ID, self.model_version, S2_START_DATE, S2_END_DATE, ANALYSIS_SCALE_METERS)
+                entry = self.result_cache.get(key) if self.result_cache else None
+                if entry is not None and not entry["map_url_stale"]:
+                    results[claim_id], processing_modes[claim_id] = entry["result"], "gee_cached"
+                else:
+                    pending.append((claim_id, geometry, key))
+
+            if not self.gee_available:
+                print(f"🖥 Starting batch offline analysis of {len(pending)} claims")
+                for claim_id, geometry, _ in pending:
+                    try:
+                        results[claim_id], processing_modes[claim_id] = self._process_locally(geometry), "local_classifier"
+                    except Exception as local_error:
+                        print(f"⚠ Offline classification of claim {claim_id} failed: {str(local_error)}")
+                pending = []
+
+            print(f"🚀 Starting batch GEE analysis: {len(pending)} claims to classify, {len(results)} cached")
+            for start in range(0, len(pending), GEE_BATCH_CHUNK_SIZE):
+                chunk = pending[start:start + GEE_BATCH_CHUNK_SIZE]
+                computed = self._process_batch_with_gee([(claim_id, geometry) for claim_id, geometry, _ in chunk])
+                for claim_id, geometry, key in chunk:
+                    if claim_id in computed:
+                        results[claim_id], processing_modes[claim_id] = computed[claim_id], "gee_active"
+                        if self.result_cache:
+                            self.result_cache.put(key, CLASSIFIER_ASSET_ID, self.model_version, computed[claim_id])
+
+            cached_ids = [claim_id for claim_id, mode in processing_modes.items() if mode == "gee_cached"]
+            storage_result = self._store_batch_outputs(results, cached_ids) if results else None
+            return {
+                "success": True,
+                "claims_selected": len(boundaries),
+                "claims_analyzed": len(results),
+                "missing_boundary": missing_boundary,
+                "results": {
+                    claim_id: {"gee_analysis": gee_results, "gee_status": processing_modes[claim_id]}
+                    for claim_id, gee_results in results.items()
+                },
+                "output_storage": storage_result,
+                "processing_info": {
+                    "processed_at": datetime.now().isoformat(),
+                    "atlas_version": "1.0.0",
+                    "model_used": self._model_used("gee_active" if self.gee_available else "local_classifier"),
+                    "gee_round_trips": 2 * -(-len(pending) // GEE_BATCH_CHUNK_SIZE)
+                }
+            }
+        except Exception as e:
+            if is_quota_error(e):
+                raise GEEQuotaError(str(e)) from e
+            print(f"❌ Batch WebGIS analysis failed: {str(e)}")
+            return {"success": False, "error": str(e)}
+
+    def _process_batch_with_gee(self, boundaries: List[Tuple[int, dict]]) -> Dict[int, Dict[str, Any]]:
+        """
+        {claim_id: GEE results} for many boundaries - the composite over their
+        union is classified once, then one grouped reduceRegions sums the class
+        areas of every claim in a single getInfo
+        """
+        claims_fc = ee.FeatureCollection([
+            ee.Feature(geemap.geojson_to_ee(geometry), {"claim_id": claim_id})
+            for claim_id, geometry in boundaries
+        ])
+        remapped_image = self._classified_image(claims_fc)
+
+        area_by_claim = ee.Image.pixelArea().addBands(remapped_image).reduceRegions(
+            collection=claims_fc,
+            reducer=ee.Reducer.sum().group(groupField=1, groupName='class'),
+            scale=ANALYSIS_SCALE_METERS,
+            tileScale=4
+        )
+        # Properties only - the claim geometries are already known
+        features = area_by_claim.select(["claim_id", "groups"], None, False).getInfo()["features"]
+
+        # One tile layer for the whole batch, clipped to the union of the claims
+        image_url = self._map_url(remapped_image)
+        return {
+            int(feature["properties"]["claim_id"]): self._analysis_results(feature["properties"].get("groups", []), image_url)
+            for feature in features
+        }
+
+    def _classified_image(self, user_aoi):
+        """Sentinel-2 composite over the AOI, classified and remapped to the atlas classes (lazy - no GEE call)"""
+        composite_image = (
+            ee.ImageCollection(S2_COLLECTION)
+            .filterBounds(user_aoi)
+            .filterDate(S2_START_DATE, S2_END_DATE)
+            .map(lambda img: img.updateMask(img.select('QA60').bitwiseAnd(1<<10).eq(0)))
+            .median()
+            .clip(user_aoi)
+        )
+        trained_classifier = ee.Classifier.load(CLASSIFIER_ASSET_ID)
+        classified_image = composite_image.classify(trained_classifier).clip(user_aoi)
+        return classified_image.remap(FROM_CLASSES, TO_CLASSES)
+
+    def _map_url(self, remapped_image) -> str:
+        vis_params = {
+            'min': 0,
+            'max': 4,
+            'palette': VIS_PALETTE_COLORS
+        }
+        map_id = remapped_image.getMapId(vis_params)
+        return map_id['tile_fetcher'].url_format
+
     def _process_with_gee(self, geojson_data: dict) -> Dict[str, Any]:
         """Process GeoJSON with actual Google Earth Engine - FIXED VERSION"""
         try:
@@ -104,28 +340,9 @@ class WebGISService:
             # Convert GeoJSON to Earth Engine geometry
             user_aoi = geemap.geojson_to_ee(geojson_data)
             
-            print("🛰 Loading Sentinel-2 imagery...")
-            
-            # FIXED: Use the same cloud masking as your original working code
-            composite_image = (
-                ee.ImageCollection('COPERNICUS/S2_SR_HARMONIZED')
-                .filterBounds(user_aoi)
-                .filterDate('2022-01-01', '2022-12-31')
-                .map(lambda img: img.updateMask(img.select('QA60').bitwiseAnd(1<<10).eq(0)))
-                .median()
-                .clip(user_aoi)
-            )
+            print(f"🛰 Loading Sentinel-2 imagery and classifier: {CLASSIFIER_ASSET_ID}")
             
-            print(f"🤖 Loading trained classifier: {CLASSIFIER_ASSET_ID}")
-            
-            # Load your trained Random Forest model
-            trained_classifier = ee.Classifier.load(CLASSIFIER_ASSET_ID)
-            
-            print("🔍 Running land classification...")
-            
-            # Classify the image and remap to your classes
-            classified_image = composite_image.classify(trained_classifier).clip(user_aoi)
-            remapped_image = classified_image.remap(FROM_CLASSES, TO_CLASSES)
+            remapped_image = self._classified_image(user_aoi)
             
             print("📊 Calculating area statistics...")
             
@@ -134,69 +351,63 @@ class WebGISService:
             area_by_class = pixel_area.addBands(remapped_image).reduceRegion(
                 reducer=ee.Reducer.sum().group(groupField=1, groupName='class'),
                 geometry=user_aoi,
-                scale=30,
+                scale=ANALYSIS_SCALE_METERS,
                 maxPixels=1e9
             )
             
             # Get the results
             analytics_result = area_by_class.getInfo()
             
-            print("🗂 Processing analytics results...")
-            
-            # FIXED: Process analytics exactly like original code
-            final_analytics = {}
-            total_area = 0
-            
-            if 'groups' in analytics_result:
-                for group in analytics_result['groups']:
-                    class_id = group['class']
-                    class_name = CLASS_PALETTE_NAMES.get(class_id, 'Unknown')
-                    area_m2 = group['sum']
-                    area_hectares = area_m2 / 10000  # Convert to hectares
-                    
-                    # FIXED: Return as number, not string (like original)
-                    final_analytics[class_name] = round(area_hectares, 2)
-                    total_area += area_hectares
-            
             print("🗺 Generating visualization...")
             
-            # FIXED: Use exact same visualization parameters as original
-            vis_params = {
-                'min': 0,
-                'max': 4,  # Changed from len(TO_CLASSES)-1 to match original
-                'palette': VIS_PALETTE_COLORS
-            }
-            
             # Get map tiles URL
-            map_id = remapped_image.getMapId(vis_params)
-            image_url = map_id['tile_fetcher'].url_format
+            image_url = self._map_url(remapped_image)
             
-            # Calculate forest coverage percentage
-            forest_area = final_analytics.get('Forest', 0)
-            forest_coverage_percent = round((forest_area / total_area * 100) if total_area > 0 else 0, 2)
+            gee_results = self._analysis_results(analytics_result.get('groups', []), image_url)
             
-            print(f"✅ Analysis complete - Total area: {round(total_area, 2)} ha, Forest: {forest_coverage_percent}%")
+            print(f"✅ Analysis complete - Total area: {gee_results['total_area_hectares']} ha, Forest: {gee_results['forest_coverage_percent']}%")
             
-            return {
-                "analytics": final_analytics,
-                "satellite_image_url": image_url,  # FIXED: Match expected field name
-                "image_url": image_url,  # Keep both for compatibility
-                "total_area_hectares": round(total_area, 2),
-                "forest_coverage_percent": forest_coverage_percent,
-                "processing_metadata": {
-                    "model_version": "rf_model_odisha_multiclass_v1",
-                    "satellite_source": "Sentinel-2 SR Harmonized",
-                    "date_range": "2022-01-01 to 2022-12-31",
-                    "resolution_meters": 30,
-                    "cloud_filter": "QA60 bit 10 masked"
-                }
-            }
+            return gee_results
             
         except Exception as e:
             print(f"❌ GEE processing error: {str(e)}")
             # Re-raise the exception so it can be caught in the calling method
             raise Exception(f"Google Earth Engine processing failed: {str(e)}")
     
+    def _analysis_results(self, groups: List[Dict[str, Any]], image_url: str) -> Dict[str, Any]:
+        """GEE results for one AOI from its grouped pixel-area sums ([{"class", "sum"}])"""
+        final_analytics = {}
+        total_area = 0
+        
+        for group in groups:
+            class_id = group['class']
+            class_name = CLASS_PALETTE_NAMES.get(class_id, 'Unknown')
+            area_m2 = group['sum']
+            area_hectares = area_m2 / 10000  # Convert to hectares
+            
+            # FIXED: Return as number, not string (like original)
+            final_analytics[class_name] = round(area_hectares, 2)
+            total_area += area_hectares
+        
+        # Calculate forest coverage percentage
+        forest_area = final_analytics.get('Forest', 0)
+        forest_coverage_percent = round((forest_area / total_area * 100) if total_area > 0 else 0, 2)
+        
+        return {
+            "analytics": final_analytics,
+            "satellite_image_url": image_url,  # FIXED: Match expected field name
+            "image_url": image_url,  # Keep both for compatibility
+            "total_area_hectares": round(total_area, 2),
+            "forest_coverage_percent": forest_coverage_percent,
+            "processing_metadata": {
+                "model_version": "rf_model_odisha_multiclass_v1",
+                "satellite_source": "Sentinel-2 SR Harmonized",
+                "date_range": f"{S2_START_DATE} to {S2_END_DATE}",
+                "resolution_meters": ANALYSIS_SCALE_METERS,
+                "cloud_filter": "QA60 bit 10 masked"
+            }
+        }
+    
     def _get_fallback_results(self) -> Dict[str, Any]:
         """Fallback results when GEE is not available"""
         return {
@@ -220,58 +431,91 @@ class WebGISService:
             }
         }
     
+    def _gis_asset(self, claim_id: int, gee_results: dict) -> GISAsset:
+        return GISAsset(
+            claim_id=claim_id,
+            asset_type="satellite_analysis",
+            asset_name=f"Sentinel-2 Land Classification - Claim {claim_id}",
+            asset_description="ML-based satellite land use classification using Random Forest model",
+            satellite_image_url=gee_results["satellite_image_url"],
+            land_classification_results=gee_results["analytics"],
+            processing_metadata=gee_results.get("processing_metadata", {}),
+            satellite_data_source=gee_results.get("processing_metadata", {}).get("satellite_source", "Sentinel-2 SR Harmonized"),
+            processing_date_range=f"{S2_START_DATE} to {S2_END_DATE}",
+            gee_project_id=CLOUD_PROJECT_ID if gee_results.get("satellite_image_url") else None
+        )
+
+    def _gis_analytics(self, claim_id: int, asset_id: int, gee_results: dict) -> List[GISAnalytics]:
+        """Per-class analytics rows of a stored asset"""
+        total_area = gee_results["total_area_hectares"]
+        return [
+            GISAnalytics(
+                claim_id=claim_id,
+                asset_id=asset_id,
+                land_class_name=land_class,
+                area_hectares=area_hectares,
+                percentage_of_total=round((area_hectares / total_area * 100) if total_area > 0 else 0, 2),
+                confidence_score=0.85,  # Default confidence for RF model
+                model_version=gee_results.get("processing_metadata", {}).get("model_version", "rf_model_odisha_multiclass_v1")
+            )
+            for land_class, area_hectares in gee_results["analytics"].items()
+        ]
+
     def _store_webgis_outputs(self, claim_id: int, gee_results: dict, geojson_data: dict) -> Dict[str, Any]:
         """Store WebGIS analysis results in PostgreSQL"""
         try:
-            db = claims_service.db
-            
-            # Create GIS Asset record
-            gis_asset = GISAsset(
-                claim_id=claim_id,
-                asset_type="satellite_analysis",
-                asset_name=f"Sentinel-2 Land Classification - Claim {claim_id}",
-                asset_description="ML-based satellite land use classification using Random Forest model",
-                satellite_image_url=gee_results["satellite_image_url"],
-                land_classification_results=gee_results["analytics"],
-                processing_metadata=gee_results.get("processing_metadata", {}),
-                satellite_data_source="Sentinel-2 SR Harmonized",
-                processing_date_range="2022-01-01 to 2022-12-31",
-                gee_project_id=CLOUD_PROJECT_ID
-            )
-            
-            db.add(gis_asset)
-            db.commit()
-            db.refresh(gis_asset)
-            
-            # Store detailed analytics
-            total_area = gee_results["total_area_hectares"]
-            
-            for land_class, area_hectares in gee_results["analytics"].items():
-                percentage = (area_hectares / total_area * 100) if total_area > 0 else 0
-                
-                analytics_record = GISAnalytics(
-                    claim_id=claim_id,
-                    asset_id=gis_asset.id,
-                    land_class_name=land_class,
-                    area_hectares=area_hectares,
-                    percentage_of_total=round(percentage, 2),
-                    confidence_score=0.85,  # Default confidence for RF model
-                    model_version="rf_model_odisha_multiclass_v1"
-                )
-                
-                db.add(analytics_record)
-            
-            db.commit()
+            with session_scope() as db:
+                gis_asset = self._gis_asset(claim_id, gee_results)
+                db.add(gis_asset)
+                db.flush()
+            
+                # Store detailed analytics
+                db.add_all(self._gis_analytics(claim_id, gis_asset.id, gee_results))
+            
+                return {
+                    "type": "PostgreSQL",
+                    "status": "success",
+                    "asset_id": gis_asset.id,
+                    "analytics_records": len(gee_results["analytics"])
+                }
             
+        except Exception as e:
+            print(f"❌ Database storage error: {str(e)}")
             return {
                 "type": "PostgreSQL",
-                "status": "success",
-                "asset_id": gis_asset.id,
-                "analytics_records": len(gee_results["analytics"])
+                "status": "failed",
+                "error": str(e)
             }
-            
+
+    def _store_batch_outputs(self, results: Dict[int, dict], cached_ids: List[int]) -> Dict[str, Any]:
+        """
+        Store many claims' results in one transaction - one flush for the assets, one for the analytics
+        Cache hits are stored only for claims without a stored analysis (the hit may
+        come from another claim with the same boundary), so re-running a batch adds no rows
+        """
+        try:
+            with session_scope() as db:
+                if cached_ids:
+                    stored = set(db.scalars(select(GISAsset.claim_id).where(GISAsset.claim_id.in_(cached_ids)).distinct()))
+                    results = {claim_id: gee_results for claim_id, gee_results in results.items() if claim_id not in stored}
+                assets = {claim_id: self._gis_asset(claim_id, gee_results) for claim_id, gee_results in results.items()}
+                db.add_all(assets.values())
+                db.flush()
+                analytics = [
+                    row
+                    for claim_id, gee_results in results.items()
+                    for row in self._gis_analytics(claim_id, assets[claim_id].id, gee_results)
+                ]
+                db.add_all(analytics)
+                db.flush()
+                return {
+                    "type": "PostgreSQL",
+                    "status": "success",
+                    "asset_ids": {claim_id: asset.id for claim_id, asset in assets.items()},
+                    "analytics_records": len(analytics),
+                    "already_stored": len(cached_ids) - len(set(cached_ids) & assets.keys())
+                }
         except Exception as e:
-            db.rollback()
             print(f"❌ Database storage error: {str(e)}")
             return {
                 "type": "PostgreSQL",
@@ -282,40 +526,39 @@ class WebGISService:
     def get_claim_webgis_data(self, claim_id: int) -> Dict[str, Any]:
         """Retrieve complete WebGIS data for a claim"""
         try:
-            db = claims_service.db
-            
-            assets = db.query(GISAsset).filter(GISAsset.claim_id == claim_id).all()
-            analytics = db.query(GISAnalytics).filter(GISAnalytics.claim_id == claim_id).all()
+            with session_scope() as db:
+                assets = db.query(GISAsset).filter(GISAsset.claim_id == claim_id).all()
+                analytics = db.query(GISAnalytics).filter(GISAnalytics.claim_id == claim_id).all()
             
-            return {
-                "claim_id": claim_id,
-                "has_webgis_data": len(assets) > 0,
-                "gee_status": "active" if self.gee_available else "fallback",
-                "analysis_outputs": [
-                    {
-                        "asset_id": asset.id,
-                        "type": asset.asset_type,
-                        "name": asset.asset_name,
-                        "satellite_image_url": asset.satellite_image_url,
-                        "land_classification": asset.land_classification_results,
-                        "processing_date": asset.created_date.isoformat() if asset.created_date else None,
-                        "satellite_source": asset.satellite_data_source,
-                        "model_metadata": asset.processing_metadata
-                    }
-                    for asset in assets
-                ],
-                "detailed_analytics": [
-                    {
-                        "land_class": analytic.land_class_name,
-                        "area_hectares": analytic.area_hectares,
-                        "percentage": analytic.percentage_of_total,
-                        "confidence": analytic.confidence_score,
-                        "analysis_date": analytic.analysis_date.isoformat() if analytic.analysis_date else None,
-                        "model_version": analytic.model_version
-                    }
-                    for analytic in analytics
-                ]
-            }
+                return {
+                    "claim_id": claim_id,
+                    "has_webgis_data": len(assets) > 0,
+                    "gee_status": "active" if self.gee_available else ("offline" if self.local_classifier else "fallback"),
+                    "analysis_outputs": [
+                        {
+                            "asset_id": asset.id,
+                            "type": asset.asset_type,
+                            "name": asset.asset_name,
+                            "satellite_image_url": asset.satellite_image_url,
+                            "land_classification": asset.land_classification_results,
+                            "processing_date": asset.created_date.isoformat() if asset.created_date else None,
+                            "satellite_source": asset.satellite_data_source,
+                            "model_metadata": asset.processing_metadata
+                        }
+                        for asset in assets
+                    ],
+                    "detailed_analytics": [
+                        {
+                            "land_class": analytic.land_class_name,
+                            "area_hectares": analytic.area_hectares,
+                            "percentage": analytic.percentage_of_total,
+                            "confidence": analytic.confidence_score,
+                            "analysis_date": analytic.analysis_date.isoformat() if analytic.analysis_date else None,
+                            "model_version": analytic.model_version
+                        }
+                        for analytic in analytics
+                    ]
+                }
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error retrieving WebGIS data: {str(e)}")
 
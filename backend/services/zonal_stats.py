@@ -0,0 +1,86 @@
+# services/zonal_stats.py
+"""
+Per-class area statistics for classified rasters (NumPy only)
+
+The local counterpart of ee.Image.pixelArea() + ee.Reducer.sum().group():
+pixels inside a polygon mask are counted per (row, class) with one bincount
+per tile of rows, and the counts are weighted by the area of a pixel in each
+row. On a geographic (lat/lon) grid that area shrinks with latitude, so it is
+the exact WGS84 ellipsoid area of the cell, computed once per row; on a
+projected grid it is the constant cell size.
+"""
+import math
+from typing import Iterable, Iterator, Optional, Tuple
+import numpy as np
+
+# Rows per bincount - bounds the temporaries to a few tens of MB on wide rasters
+ZONAL_TILE_ROWS = 512
+
+# WGS84 ellipsoid
+WGS84_A = 6378137.0
+WGS84_F = 1 / 298.257223563
+WGS84_B = WGS84_A * (1 - WGS84_F)
+WGS84_E = math.sqrt(WGS84_F * (2 - WGS84_F))
+
+
+def _authalic_q(latitudes: np.ndarray) -> np.ndarray:
+    """q(φ) of the ellipsoidal area formula: area between parallels is b²/2 · Δλ · Δq"""
+    sin_lat = np.sin(latitudes)
+    e_sin = WGS84_E * sin_lat
+    return sin_lat / (1 - e_sin ** 2) + np.log((1 + e_sin) / (1 - e_sin)) / (2 * WGS84_E)
+
+
+def row_pixel_areas(transform, height: int, geographic: bool) -> np.ndarray:
+    """
+    Area in m² of one pixel in each of `height` rows of a north-up grid
+    (transform: affine with .a pixel width, .e pixel height, .f top edge)
+    """
+    if transform.b or transform.d:
+        raise ValueError("Rotated grids are not supported")
+    if not geographic:
+        return np.full(height, abs(transform.a * transform.e))
+    edges = np.radians(np.clip(transform.f + transform.e * np.arange(height + 1), -90.0, 90.0))
+    return WGS84_B ** 2 / 2 * math.radians(abs(transform.a)) * np.abs(np.diff(_authalic_q(edges)))
+
+
+def class_counts_by_row(classes: np.ndarray, mask: Optional[np.ndarray], class_count: int) -> np.ndarray:
+    """
+    (rows, class_count) pixel counts of classes 0..class_count-1 where mask is
+    True; other class values (nodata, unmapped) are not counted
+    """
+    rows, columns = classes.shape
+    # Excluded pixels go to an overflow bin per row instead of being compacted out
+    bins = class_count + 1
+    in_range = (classes >= 0) & (classes < class_count)
+    if mask is not None:
+        in_range &= mask
+    labels = np.where(in_range, classes, class_count).astype(np.int64, copy=False)
+    labels += (np.arange(rows, dtype=np.int64) * bins)[:, None]
+    counts = np.bincount(labels.ravel(), minlength=rows * bins)
+    return counts.reshape(rows, bins)[:, :class_count]
+
+
+def row_tiles(
+    classes: np.ndarray,
+    mask: Optional[np.ndarray],
+    tile_rows: int = ZONAL_TILE_ROWS
+) -> Iterator[Tuple[int, np.ndarray, Optional[np.ndarray]]]:
+    """(first row, classes, mask) tiles of an in-memory class raster - classes may be a memmap"""
+    for start in range(0, classes.shape[0], tile_rows):
+        yield start, classes[start:start + tile_rows], None if mask is None else mask[start:start + tile_rows]
+
+
+def zonal_class_areas(
+    tiles: Iterable[Tuple[int, np.ndarray, Optional[np.ndarray]]],
+    row_areas: np.ndarray,
+    class_count: int
+) -> np.ndarray:
+    """
+    m² per class (index = class value) inside the mask, summed over
+    (first row, classes, mask) tiles of rows - see row_tiles; a producer that
+    reads or classifies each tile lazily keeps one tile in memory at a time
+    """
+    areas = np.zeros(class_count)
+    for row_start, classes, mask in tiles:
+        areas += row_areas[row_start:row_start + classes.shape[0]] @ class_counts_by_row(classes, mask, class_count)
+    return areas
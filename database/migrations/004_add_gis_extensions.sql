@@ -0,0 +1,28 @@
+-- Spatial index for map viewport and radius queries
+-- claims.geom is a generated point column kept in step with latitude/longitude
+-- by PostgreSQL itself, indexed with GiST; set CLAIMS_SPATIAL_INDEX=postgis once
+-- this has run. claims.geohash is maintained by the application
+-- (services/geohash.py) and serves the same queries without PostGIS; the
+-- UPDATE below fills it for existing rows - ST_GeoHash matches geohash.encode.
+-- Run with psql outside a transaction (no -1): CONCURRENTLY requires it.
+
+CREATE EXTENSION IF NOT EXISTS postgis;
+
+ALTER TABLE claims ADD COLUMN IF NOT EXISTS geom geometry(Point, 4326)
+    GENERATED ALWAYS AS (
+        CASE WHEN latitude IS NOT NULL AND longitude IS NOT NULL
+            THEN ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)
+        END
+    ) STORED;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_claims_geom
+    ON claims USING gist (geom);
+
+ALTER TABLE claims ADD COLUMN IF NOT EXISTS geohash VARCHAR(12);
+
+UPDATE claims SET geohash = ST_GeoHash(geom, 9)
+    WHERE geom IS NOT NULL AND geohash IS NULL;
+
+-- varchar_pattern_ops lets LIKE 'prefix%' use the index under any collation
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_claims_geohash
+    ON claims (geohash varchar_pattern_ops);
@@ -0,0 +1,11 @@
+-- Keyset pagination for claim listings: ORDER BY submission_date DESC, id DESC
+-- seeks on (submission_date, id) instead of scanning past OFFSET rows.
+-- The row-value comparison used by the cursor never matches NULL dates,
+-- so backfill them before making the column NOT NULL.
+-- Run with psql outside a transaction (no -1): CONCURRENTLY requires it.
+
+UPDATE claims SET submission_date = NOW() WHERE submission_date IS NULL;
+ALTER TABLE claims ALTER COLUMN submission_date SET NOT NULL;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_claims_submission_date_id
+    ON claims (submission_date, id);
@@ -0,0 +1,13 @@
+-- Indexed, spelling-tolerant claim search
+-- search_text holds the phonetic keys of claimant_name, village_name, district
+-- and document_filename (services/transliteration.py). The application keeps it
+-- current on insert/update; populate existing rows afterwards with
+--     python scripts/backfill_search_text.py
+-- Run with psql outside a transaction (no -1): CONCURRENTLY requires it.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE claims ADD COLUMN IF NOT EXISTS search_text TEXT;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_claims_search_text_trgm
+    ON claims USING gin (search_text gin_trgm_ops);
@@ -0,0 +1,25 @@
+-- Dashboard statistics summary
+-- claim_stats_summary holds claim counts per (status, district, form_subtype,
+-- priority); the API rebuilds it with a single FILTER-aggregate query once it is
+-- older than STATS_MAX_STALENESS_SECONDS. claim_stats_refresh is a one-row
+-- marker locked while rebuilding so concurrent workers don't rebuild together.
+
+CREATE TABLE IF NOT EXISTS claim_stats_summary (
+    id SERIAL PRIMARY KEY,
+    status VARCHAR(50),
+    district VARCHAR(100),
+    form_subtype VARCHAR(50),
+    priority VARCHAR(20),
+    total INTEGER NOT NULL DEFAULT 0,
+    verified INTEGER NOT NULL DEFAULT 0,
+    recent INTEGER NOT NULL DEFAULT 0,
+    gis_analyzed INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS claim_stats_refresh (
+    id INTEGER PRIMARY KEY,
+    refreshed_at TIMESTAMP
+);
+
+INSERT INTO claim_stats_refresh (id, refreshed_at) VALUES (1, NULL)
+    ON CONFLICT (id) DO NOTHING;
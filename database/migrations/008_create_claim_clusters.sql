@@ -0,0 +1,26 @@
+-- Pre-aggregated map clusters
+-- claim_clusters holds the claim count and coordinate sums per geohash cell and
+-- status, at every geohash length from 1 to 7 (CLUSTER_PRECISIONS). The API
+-- keeps it current on each claim insert, update and delete; the INSERT below
+-- populates it for existing claims (python scripts/rebuild_claim_clusters.py
+-- does the same). Needs claims.geohash from 004_add_gis_extensions.sql.
+
+CREATE TABLE IF NOT EXISTS claim_clusters (
+    precision INTEGER NOT NULL,
+    cell VARCHAR(12) NOT NULL,
+    status VARCHAR(50) NOT NULL,
+    claim_count INTEGER NOT NULL DEFAULT 0,
+    latitude_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    longitude_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    PRIMARY KEY (precision, cell, status)
+);
+
+CREATE INDEX IF NOT EXISTS ix_claim_clusters_precision_cell
+    ON claim_clusters (precision, cell varchar_pattern_ops);
+
+INSERT INTO claim_clusters (precision, cell, status, claim_count, latitude_sum, longitude_sum)
+SELECT p, substr(geohash, 1, p), COALESCE(status, 'Unknown'), count(*), sum(latitude), sum(longitude)
+    FROM claims CROSS JOIN generate_series(1, 7) AS p
+    WHERE geohash IS NOT NULL
+    GROUP BY 1, 2, 3
+ON CONFLICT (precision, cell, status) DO NOTHING;
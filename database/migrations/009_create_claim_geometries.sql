@@ -0,0 +1,19 @@
+-- Parcel boundaries for the vector tile endpoint (/tiles/{z}/{x}/{y}.mvt)
+-- One GeoJSON MultiPolygon per claim, with its bounding box and the smallest
+-- geohash cell containing it; tiles find boundaries by cell prefix, then by
+-- bounding-box overlap. Boundaries are stored through
+-- PUT /api/v1/claims/{claim_id}/geometry and the WebGIS analysis endpoints.
+
+CREATE TABLE IF NOT EXISTS claim_geometries (
+    claim_id INTEGER PRIMARY KEY REFERENCES claims (id) ON DELETE CASCADE,
+    geometry JSON NOT NULL,
+    min_latitude DOUBLE PRECISION NOT NULL,
+    min_longitude DOUBLE PRECISION NOT NULL,
+    max_latitude DOUBLE PRECISION NOT NULL,
+    max_longitude DOUBLE PRECISION NOT NULL,
+    cell VARCHAR(12) NOT NULL,
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS ix_claim_geometries_cell
+    ON claim_geometries (cell varchar_pattern_ops);
@@ -0,0 +1,50 @@
+"""
+Populate Claim.search_text for claims created before the search index existed
+
+Streams claims in primary-key order and writes the phonetic search keys back
+with one bulk UPDATE per chunk. Safe to re-run; only stale rows are written.
+
+Usage: python scripts/backfill_search_text.py [--chunk-size 5000]
+"""
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from services.claims_service import engine, Claim, SEARCHABLE_FIELDS
+from services.transliteration import search_document
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill claim search keys")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Claims fetched and committed per batch")
+    args = parser.parse_args()
+
+    columns = [getattr(Claim, field) for field in SEARCHABLE_FIELDS]
+    query = select(Claim.id, Claim.search_text, *columns).order_by(Claim.id)
+
+    processed = updated = 0
+    with engine.connect() as read_conn, Session(engine) as write_session:
+        result = read_conn.execution_options(stream_results=True, yield_per=args.chunk_size).execute(query)
+        for partition in result.partitions():
+            changed = []
+            for claim_id, search_text, *values in partition:
+                document = search_document(values)
+                if document != search_text:
+                    changed.append({"id": claim_id, "search_text": document})
+            if changed:
+                write_session.execute(update(Claim), changed)
+                write_session.commit()
+            processed += len(partition)
+            updated += len(changed)
+            print(f"⏳ {processed} claims scanned, {updated} updated")
+
+    print(f"✅ Search keys backfilled: {processed} scanned, {updated} updated")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Throughput benchmark: sync ClaimsService vs AsyncClaimsService behind FastAPI
+
+Both services are mounted on a throwaway app - the sync one in a plain `def`
+route (Starlette's threadpool), the async one in an `async def` route - and
+driven in-process with httpx at a fixed concurrency. Runs against DATABASE_URL;
+use a scratch database, --seed inserts rows.
+
+Usage: python scripts/benchmark_claims_api.py [--requests 2000] [--concurrency 50]
+                                              [--limit 100] [--seed 0]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import httpx
+from fastapi import FastAPI
+
+from services.claims_service import Base, engine, claims_service
+from services.async_claims_service import async_engine, async_claims_service
+
+
+def build_app(limit: int) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/sync/claims")
+    def sync_claims():
+        return claims_service.get_all_claims(limit=limit)
+
+    @app.get("/async/claims")
+    async def async_claims():
+        return await async_claims_service.get_all_claims(limit=limit)
+
+    return app
+
+
+def seed(count: int):
+    Base.metadata.create_all(bind=engine)
+    for i in range(count):
+        claims_service.create_claim({
+            "claimant_name": f"Benchmark Claimant {i}",
+            "village": "Jashipur",
+            "district": "Mayurbhanj",
+            "state": "Odisha",
+            "form_type": "IFR",
+            "extracted_fields": {"claimant_name": f"Benchmark Claimant {i}"}
+        })
+
+
+async def run(client: httpx.AsyncClient, path: str, requests: int, concurrency: int) -> float:
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            response = await client.get(path)
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return requests / (time.perf_counter() - started)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=100, help="Claims returned per request")
+    parser.add_argument("--seed", type=int, default=0, help="Insert this many claims first")
+    args = parser.parse_args()
+
+    if args.seed:
+        seed(args.seed)
+
+    transport = httpx.ASGITransport(app=build_app(args.limit))
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        for path in ("/sync/claims", "/async/claims"):
+            await run(client, path, min(args.requests, 100), args.concurrency)  # Warm pools
+            rate = await run(client, path, args.requests, args.concurrency)
+            print(f"{path:<15} {args.requests} requests @ {args.concurrency} concurrent: {rate:8.1f} req/s")
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,92 @@
+"""
+Micro-benchmark: compiled FieldExtractor vs the original per-field re.search loop
+
+Usage: python scripts/benchmark_field_extraction.py [--iterations 2000]
+"""
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'ai-pipeline'))
+
+from ocr_service import FRAOCRService
+from field_extractor import FieldExtractor
+
+# Layout-preserving LLMWhisperer output for a 3-page FORM - A (IFR) claim
+FORM_A_PAGE = """
+                                      FORM - A
+                                 [See rule 6(1)]
+                    CLAIM FORM FOR RIGHTS TO FOREST LAND
+
+ 1. Name of the claimant (s):      Sukram Munda
+ 2. Name of the spouse :           Budhni Munda
+ 3. Name of father/ mother :       Late Mangal Munda
+ 4. Address:                       At/Po - Jashipur, Near Haat Bazaar
+ 5. Village:                       Jashipur                 Gram Panchayat:   Jashipur
+ 6. Tehsil/ Taluka:                Jashipur                 District:         Mayurbhanj
+    State:                         Odisha
+ 7. (a) Scheduled Tribe:           Yes
+    (b) Other Traditional Forest Dweller:   No
+ 8. Name of other members in the family with age:   Sita Munda (34), Ravi Munda (12)
+
+ Nature of claim on land:
+    (a) Extent of forest land occupied
+        (i)  for habitation :      0.12 ha
+        (ii) for self-cultivation, if any :   1.40 ha
+    (b) Disputed lands if any:     None
+    (c) Pattas/ leases/ grants, if any:   Nil
+ 9. Evidence in support:           Voter ID, elders' statement, 1978 survey map
+{filler}
+"""
+
+FILLER_LINE = "    Signature/ Thumb impression of the claimant (s) ........................................\n"
+
+
+def legacy_extract(result_text: str, target_fields: dict):
+    """Pre-FieldExtractor implementation, kept for comparison"""
+    extracted = {}
+    for field, pattern in target_fields.items():
+        match = re.search(pattern, result_text, re.IGNORECASE)
+        extracted[field] = match.group(1).strip() if match else ""
+
+    if re.search(r"FORM\s*-\s*A", result_text, re.IGNORECASE):
+        subtype = "IFR"
+    elif re.search(r"FORM\s*-\s*B", result_text, re.IGNORECASE):
+        subtype = "CR"
+    elif re.search(r"FORM\s*-\s*C", result_text, re.IGNORECASE):
+        subtype = "CFR"
+    else:
+        subtype = None
+    return extracted, subtype
+
+
+def build_document(pages: int) -> str:
+    return "".join(FORM_A_PAGE.format(filler=FILLER_LINE * 20) for _ in range(pages))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    patterns = FRAOCRService.NEW_CLAIM_FIELDS
+    extractor = FieldExtractor(patterns, detect_subtype=True)
+
+    for pages in (1, 3, 10):
+        text = build_document(pages)
+        assert extractor.extract(text) == legacy_extract(text, patterns), "extractors disagree"
+
+        legacy = timeit.timeit(lambda: legacy_extract(text, patterns), number=args.iterations)
+        compiled = timeit.timeit(lambda: extractor.extract(text), number=args.iterations)
+        print(
+            f"{pages:>2} page(s), {len(text):>6} chars: "
+            f"legacy {legacy / args.iterations * 1e6:8.1f} µs/doc | "
+            f"compiled {compiled / args.iterations * 1e6:8.1f} µs/doc | "
+            f"{legacy / compiled:4.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
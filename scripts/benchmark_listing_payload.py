@@ -0,0 +1,89 @@
+"""
+Payload benchmark: claim summary listing with and without deferred JSON columns
+
+Runs the summary listing query (include_full_data=False) once as it used to be,
+selecting every column, and once through the shared builders, which leave
+ocr_metadata/extracted_fields in the database. Reports the bytes of column data
+returned by the database and the Python memory held by the loaded page.
+Runs against DATABASE_URL; use a scratch database, --seed inserts claims with
+OCR text of realistic size.
+
+Usage: python scripts/benchmark_listing_payload.py [--limit 100] [--seed 0] [--raw-text-kb 8]
+"""
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from sqlalchemy import desc, select
+
+from services.claims_service import Base, Claim, engine, claims_service, session_scope, select_all_claims
+
+FORM_TEXT_LINE = " 8. Name of other members in the family with age:   Sita Munda (34), Ravi Munda (12)\n"
+
+
+def seed(count: int, raw_text_kb: int):
+    Base.metadata.create_all(bind=engine)
+    raw_text = FORM_TEXT_LINE * (raw_text_kb * 1024 // len(FORM_TEXT_LINE))
+    for i in range(count):
+        claims_service.create_claim({
+            "claimant_name": f"Benchmark Claimant {i}",
+            "village_name": "Jashipur",
+            "district": "Mayurbhanj",
+            "form_type": "IFR",
+            "ocr_metadata": {"raw_text": raw_text, "confidence": 0.92, "form_type": "new_claim"},
+            "extracted_fields": {f"Field{n}": f"value {n} for claimant {i}" for n in range(25)}
+        })
+
+
+def wire_bytes(stmt) -> int:
+    """Size of the column data the database sends back for a statement"""
+    with engine.connect() as conn:
+        return sum(
+            len(str(value).encode()) for row in conn.execute(stmt) for value in row if value is not None
+        )
+
+
+def page_memory(stmt, limit: int) -> int:
+    """Peak Python memory while loading and serializing one summary page"""
+    tracemalloc.start()
+    with session_scope() as db:
+        claims = db.execute(stmt).scalars().all()
+        page = [claim.to_dict() for claim in claims[:limit]]
+        _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del page
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--limit", type=int, default=100, help="Claims per listing page")
+    parser.add_argument("--seed", type=int, default=0, help="Insert this many claims first")
+    parser.add_argument("--raw-text-kb", type=int, default=8, help="OCR text size of seeded claims")
+    args = parser.parse_args()
+
+    if args.seed:
+        seed(args.seed, args.raw_text_kb)
+
+    all_columns = select(Claim).order_by(desc(Claim.submission_date)).limit(args.limit)
+    deferred = select_all_claims(limit=args.limit)
+
+    results = {
+        "all columns": (wire_bytes(all_columns), page_memory(all_columns, args.limit)),
+        "deferred JSON": (wire_bytes(deferred), page_memory(deferred, args.limit))
+    }
+    for label, (transferred, memory) in results.items():
+        print(f"{label:<14} {transferred / 1024:10.1f} KiB from database | {memory / 1024:10.1f} KiB peak Python memory")
+
+    (before_bytes, before_memory), (after_bytes, after_memory) = results.values()
+    print(
+        f"Reduction: {100 * (1 - after_bytes / before_bytes):.1f}% bytes transferred, "
+        f"{100 * (1 - after_memory / before_memory):.1f}% memory per {args.limit}-claim page"
+    )
+
+
+if __name__ == "__main__":
+    main()
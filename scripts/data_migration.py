@@ -0,0 +1,165 @@
+"""
+Re-derive Claim.extracted_fields from the OCR raw_text stored in ocr_metadata
+
+Claims are streamed in primary-key order through a server-side cursor, field
+extraction is re-run in a process pool and only rows whose fields changed are
+written back, one bulk UPDATE per chunk. The last committed claim id is
+checkpointed so an interrupted sweep resumes where it stopped.
+
+Usage:
+    python scripts/data_migration.py [--chunk-size 2000] [--workers 4]
+                                     [--checkpoint reextract_checkpoint.json]
+                                     [--fill-empty-only] [--dry-run] [--restart]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'ai-pipeline'))
+
+from ocr_service import FRAOCRService
+from field_extractor import FieldExtractor
+
+EXTRACTORS = {
+    "new_claim": FieldExtractor(FRAOCRService.NEW_CLAIM_FIELDS),
+    "legacy_claim": FieldExtractor(FRAOCRService.LEGACY_CLAIM_FIELDS)
+}
+
+# Display form types written by map_to_atlas_claim_structure
+NEW_CLAIM_DISPLAY_TYPES = {"IFR", "CR", "CFR", "New Claim"}
+
+ClaimRow = Tuple[int, str, str, Dict[str, Any]]
+
+
+def resolve_form_type(claim_form_type: Optional[str], ocr_metadata: Dict[str, Any]) -> Optional[str]:
+    """Map stored form type values back to an OCR form type"""
+    for candidate in (ocr_metadata.get("form_type"), claim_form_type):
+        if candidate in EXTRACTORS:
+            return candidate
+        if candidate in NEW_CLAIM_DISPLAY_TYPES:
+            return "new_claim"
+        if candidate and candidate.startswith("Legacy"):
+            return "legacy_claim"
+    return None
+
+
+def reextract_batch(rows: List[ClaimRow], fill_empty_only: bool = False) -> List[Dict[str, Any]]:
+    """Worker: re-run extraction and return bulk-update rows for claims that changed"""
+    changed = []
+    for claim_id, form_type, raw_text, current in rows:
+        fields, _ = EXTRACTORS[form_type].extract(raw_text)
+        if fill_empty_only:
+            fields = {field: value for field, value in fields.items() if value and not current.get(field)}
+        # Keep keys the extractor doesn't own (coordinates, manual additions)
+        merged = {**current, **fields}
+        if merged != current:
+            changed.append({"id": claim_id, "extracted_fields": merged})
+    return changed
+
+
+def load_checkpoint(path: str) -> Dict[str, Any]:
+    if not os.path.exists(path):
+        return {"last_id": 0, "processed": 0, "changed": 0, "skipped": 0}
+    with open(path, "r") as checkpoint_file:
+        return json.load(checkpoint_file)
+
+
+def save_checkpoint(path: str, state: Dict[str, Any]):
+    state["updated_at"] = datetime.now().isoformat()
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as checkpoint_file:
+        json.dump(state, checkpoint_file, indent=2)
+    os.replace(tmp_path, path)
+
+
+def split(rows: List[ClaimRow], parts: int) -> List[List[ClaimRow]]:
+    size = max(1, -(-len(rows) // parts))
+    return [rows[i:i + size] for i in range(0, len(rows), size)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-extract claim fields from stored OCR text")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="Claims fetched and committed per batch")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Extraction processes")
+    parser.add_argument("--checkpoint", default="reextract_checkpoint.json", help="Resume state file")
+    parser.add_argument("--fill-empty-only", action="store_true", help="Only fill fields that are currently empty")
+    parser.add_argument("--dry-run", action="store_true", help="Report changes without writing them")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and start from the first claim")
+    args = parser.parse_args()
+
+    # Imported here so pool workers don't open database connections
+    from sqlalchemy import select, update, func
+    from sqlalchemy.orm import Session
+    from services.claims_service import engine, Claim
+
+    state = {"last_id": 0, "processed": 0, "changed": 0, "skipped": 0} if args.restart else load_checkpoint(args.checkpoint)
+    if state["last_id"]:
+        print(f"🔁 Resuming after claim {state['last_id']} ({state['processed']} already processed)")
+
+    with Session(engine) as session:
+        remaining = session.scalar(select(func.count(Claim.id)).where(Claim.id > state["last_id"]))
+    print(f"📄 {remaining} claims to re-extract with {args.workers} workers")
+
+    query = (
+        select(Claim.id, Claim.form_type, Claim.ocr_metadata, Claim.extracted_fields)
+        .where(Claim.id > state["last_id"])
+        .order_by(Claim.id)
+    )
+
+    started = time.time()
+    done = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool, \
+            engine.connect() as read_conn, \
+            Session(engine) as write_session:
+        result = read_conn.execution_options(stream_results=True, yield_per=args.chunk_size).execute(query)
+
+        for partition in result.partitions():
+            rows: List[ClaimRow] = []
+            for claim_id, claim_form_type, ocr_metadata, extracted_fields in partition:
+                ocr_metadata = ocr_metadata or {}
+                raw_text = ocr_metadata.get("raw_text")
+                form_type = resolve_form_type(claim_form_type, ocr_metadata)
+                if not raw_text or form_type is None:
+                    state["skipped"] += 1
+                    continue
+                rows.append((claim_id, form_type, raw_text, extracted_fields or {}))
+
+            changed = []
+            for batch_changes in pool.map(
+                reextract_batch,
+                split(rows, args.workers),
+                [args.fill_empty_only] * args.workers
+            ):
+                changed.extend(batch_changes)
+
+            if changed and not args.dry_run:
+                write_session.execute(update(Claim), changed)
+                write_session.commit()
+
+            done += len(partition)
+            state["last_id"] = partition[-1][0]
+            state["processed"] += len(partition)
+            state["changed"] += len(changed)
+            if not args.dry_run:
+                save_checkpoint(args.checkpoint, state)
+
+            elapsed = time.time() - started
+            rate = done / elapsed if elapsed else 0
+            eta = (remaining - done) / rate if rate else 0
+            print(
+                f"⏳ {done}/{remaining} claims | {len(changed)} changed in chunk, {state['changed']} total | "
+                f"{rate:.0f} claims/s | ETA {eta:.0f}s"
+            )
+
+    action = "would change" if args.dry_run else "updated"
+    print(f"✅ Re-extraction finished: {state['processed']} processed, {state['changed']} {action}, {state['skipped']} skipped")
+
+
+if __name__ == "__main__":
+    main()
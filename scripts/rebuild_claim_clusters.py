@@ -0,0 +1,30 @@
+"""
+Recompute the claim_clusters map aggregates from the claims table
+
+The API keeps claim_clusters current as claims are created, updated and
+deleted; run this after editing claims with plain SQL, or to populate the
+table on a database that already holds claims. Runs in one transaction, so
+cluster queries see either the old or the new aggregates.
+
+Usage: python scripts/rebuild_claim_clusters.py
+"""
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from sqlalchemy import func, select
+
+from services.claims_service import Base, ClaimCluster, engine, session_scope, rebuild_claim_clusters
+
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    with session_scope() as db:
+        rebuild_claim_clusters(db)
+        cells = db.execute(select(func.count()).select_from(ClaimCluster)).scalar_one()
+    print(f"✅ Claim clusters rebuilt: {cells} cluster rows")
+
+
+if __name__ == "__main__":
+    main()
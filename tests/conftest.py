@@ -0,0 +1,19 @@
+"""
+Shared setup for the backend unit tests
+
+The backend services configure their database engines at import time, so a
+scratch SQLite database is selected before anything under backend/ is imported.
+"""
+import os
+import sys
+import tempfile
+
+_scratch = tempfile.mkdtemp(prefix="atavi-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_scratch, 'claims.sqlite3')}"
+os.environ["ASYNC_DATABASE_URL"] = ""
+os.environ.setdefault("OCR_JOBS_DIR", os.path.join(_scratch, "ocr_jobs"))
+os.environ.setdefault("OCR_CACHE_DIR", os.path.join(_scratch, "ocr_cache"))
+os.environ.setdefault("TILE_CACHE_DIR", os.path.join(_scratch, "tile_cache"))
+os.environ.setdefault("GEE_CACHE_PATH", os.path.join(_scratch, "gee_cache.sqlite3"))
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
@@ -0,0 +1,61 @@
+from contextlib import contextmanager
+
+from sqlalchemy import delete, event
+
+from services.claims_service import Claim, GISAnalytics, GISAsset, claims_service, engine, session_scope
+
+CLAIMS = 5
+
+
+def _reset_claims_with_gis():
+    with session_scope() as db:
+        for model in (GISAnalytics, GISAsset, Claim):
+            db.execute(delete(model))
+        for i in range(CLAIMS):
+            claim = Claim(
+                claimant_name=f"Claimant {i}", district="Mayurbhanj", form_type="IFR",
+                ocr_metadata={"raw_text": "x" * (i + 1), "confidence": 0.9}
+            )
+            for j in range(i + 1):
+                asset = GISAsset(asset_type="land_classification", asset_name=f"Analysis {j}")
+                claim.gis_assets.append(asset)
+                claim.gis_analytics.append(GISAnalytics(asset=asset, land_class_name="Forest", area_hectares=1.0, percentage_of_total=100.0))
+            db.add(claim)
+
+
+@contextmanager
+def _count_selects():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def _assert_full_data(claims):
+    assert len(claims) == CLAIMS
+    for claim in claims:
+        gis = claim["gis_analysis"]
+        assert gis["assets_count"] == gis["analytics_count"] == claim["processing_info"]["raw_text_length"] > 0
+
+
+def test_full_data_listing_is_one_select():
+    _reset_claims_with_gis()
+    with _count_selects() as statements:
+        page = claims_service.get_claims_page(limit=CLAIMS, include_full_data=True)
+    assert len(statements) == 1, statements
+    _assert_full_data(page["claims"])
+
+
+def test_gis_claims_listing_is_one_select():
+    _reset_claims_with_gis()
+    with _count_selects() as statements:
+        claims = claims_service.get_claims_with_gis_analysis()
+    assert len(statements) == 1, statements
+    _assert_full_data(claims)
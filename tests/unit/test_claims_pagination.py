@@ -0,0 +1,33 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import delete
+
+import main
+from services.claims_service import Claim, claims_service, session_scope
+
+
+def _reset_claims(count: int):
+    with session_scope() as db:
+        db.execute(delete(Claim))
+    # Created back to back: many claims share a submission_date second
+    return {
+        claims_service.create_claim({"claimant_name": f"Claimant {i}", "district": "Mayurbhanj", "form_type": "IFR"})["claim_id"]
+        for i in range(count)
+    }
+
+
+def test_cursor_pages_through_every_claim_once():
+    claim_ids = _reset_claims(25)
+    seen = []
+    # No lifespan: its shutdown would stop the module-level executors other tests use
+    client = TestClient(main.app)
+    cursor = None
+    for _ in range(10):
+        params = {"limit": 10, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/v1/claims", params=params).json()
+        seen.extend(claim["id"] for claim in page["claims"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert cursor is None, "pagination did not terminate"
+    assert len(seen) == len(set(seen)) == 25
+    assert set(seen) == claim_ids
@@ -0,0 +1,83 @@
+import asyncio
+import time
+
+import pytest
+
+from services import ocr_jobs
+from services.ocr_jobs import OCRJobStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = OCRJobStore(str(tmp_path / "ocr_jobs.sqlite3"))
+    store.create("job", "form.pdf", "IFR", str(tmp_path / "form.pdf"))
+    yield store
+    store.close()
+
+
+def _expire_lease(store: OCRJobStore):
+    store._execute("UPDATE ocr_jobs SET lease_until = ? WHERE id = 'job'", (time.time() - 1,))
+
+
+def test_stale_attempt_cannot_overwrite_the_run_that_replaced_it(store):
+    first = store.claim("job")
+    assert first == 1
+    assert store.claim("job") is None
+
+    _expire_lease(store)
+    assert store.requeue_expired() == ["job"]
+    second = store.claim("job")
+    assert second == 2
+
+    # The first run finishes late: none of its updates may touch the second run
+    assert not store.renew("job", first)
+    assert not store.finish("job", first, True, {"success": True})
+    assert not store.requeue("job", first, "Upstream 500")
+    assert store.get("job")["status"] == "running"
+
+    assert store.finish("job", second, True, {"success": True})
+    assert not store.requeue("job", second, "Late retry")
+    assert store.get("job")["status"] == "succeeded"
+
+
+def test_renewed_lease_is_not_swept(store):
+    attempt = store.claim("job")
+    _expire_lease(store)
+    assert store.renew("job", attempt)
+    assert store.requeue_expired() == []
+    assert store.get("job")["lease_until"] > time.time() + ocr_jobs.OCR_JOB_LEASE_SECONDS - 60
+
+
+class SlowPipeline:
+    """Holds the job longer than its lease, checking the sweep can't take it meanwhile"""
+
+    def __init__(self, store: OCRJobStore):
+        self.ocr_service = self
+        self.store = store
+        self.requeued = None
+
+    async def process_fra_document(self, file_path: str, form_type: str):
+        _expire_lease(self.store)
+        await asyncio.sleep(0.1)  # Several renewals
+        self.requeued = self.store.requeue_expired()
+        return {"success": True}
+
+    def finalize_result(self, result, filename: str, form_type: str):
+        return result
+
+
+def test_job_in_flight_keeps_its_lease(tmp_path, monkeypatch):
+    monkeypatch.setattr(ocr_jobs, "OCR_JOBS_DIR", str(tmp_path))
+    monkeypatch.setattr(ocr_jobs, "OCR_JOB_LEASE_RENEW_SECONDS", 0.01)
+    queue = ocr_jobs.OCRJobQueue(None)
+    queue.pipeline = pipeline = SlowPipeline(queue.store)
+    upload = tmp_path / "form.pdf"
+    upload.write_bytes(b"%PDF")
+    queue.store.create("job", "form.pdf", "IFR", str(upload))
+
+    asyncio.run(queue._run_job("job"))
+
+    assert pipeline.requeued == []
+    assert queue.store.get("job")["status"] == "succeeded"
+    assert not upload.exists()
+    queue.store.close()
@@ -0,0 +1,86 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, event
+from sqlalchemy.exc import IntegrityError
+
+import main
+from services.claims_service import Claim, ClaimStatsRefresh, SessionLocal, engine, refresh_claim_stats
+from services.stats_cache import stats_cache
+
+
+def _claim(**values) -> Claim:
+    return Claim(claimant_name="Claimant", district="Mayurbhanj", form_type="IFR", **values)
+
+
+def test_savepoint_release_does_not_invalidate_before_outer_commit():
+    generation = stats_cache.generation
+    with SessionLocal() as db:
+        with db.begin_nested():
+            db.add(_claim())
+        assert stats_cache.generation == generation
+        db.commit()
+    assert stats_cache.generation == generation + 1
+
+
+def test_savepoint_rollback_keeps_earlier_writes_dirty():
+    generation = stats_cache.generation
+    with SessionLocal() as db:
+        with db.begin_nested():
+            claim = _claim()
+            db.add(claim)
+            db.flush()
+            existing_id = claim.id
+        with pytest.raises(IntegrityError):
+            with db.begin_nested():
+                db.add(_claim(id=existing_id))
+                db.flush()
+        assert stats_cache.generation == generation
+        db.commit()
+    assert stats_cache.generation == generation + 1
+
+
+def test_write_refreshes_the_cache_but_not_the_summary_table_within_staleness():
+    def refreshed_at():
+        with SessionLocal() as db:
+            return db.get(ClaimStatsRefresh, 1).refreshed_at
+
+    client = TestClient(main.app)  # No lifespan - see test_claims_pagination
+    first = client.get("/api/v1/stats/summary")
+    assert first.status_code == 200
+    rebuilt_at = refreshed_at()
+
+    with SessionLocal() as db:
+        db.add(_claim())
+        db.commit()
+    second = client.get("/api/v1/stats/summary", headers={"If-None-Match": first.headers["ETag"]})
+
+    # The entry was recomputed after the write, from the summary table as of the last rebuild
+    assert second.status_code == 304
+    assert refreshed_at() == rebuilt_at
+
+
+def test_first_refresh_tolerates_a_concurrent_marker_insert():
+    with SessionLocal() as db:
+        db.execute(delete(ClaimStatsRefresh))
+        db.commit()
+
+    # The other worker's marker lands between our read and our insert (on our SQLite
+    # connection - a second writer would just wait for the file lock)
+    raced = []
+
+    def other_worker_inserts_first(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO claim_stats_refresh") and not raced:
+            raced.append(statement)
+            cursor.connection.execute("INSERT INTO claim_stats_refresh (id) VALUES (1)")
+
+    event.listen(engine, "before_cursor_execute", other_worker_inserts_first)
+    try:
+        with SessionLocal() as db:
+            refreshed_at = refresh_claim_stats(db)
+            db.commit()
+    finally:
+        event.remove(engine, "before_cursor_execute", other_worker_inserts_first)
+
+    assert raced
+    with SessionLocal() as db:
+        assert db.get(ClaimStatsRefresh, 1).refreshed_at == refreshed_at
@@ -0,0 +1,53 @@
+import asyncio
+import io
+import os
+import threading
+
+import boto3
+import pytest
+from moto import mock_aws
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+
+from services.storage_service import S3_MULTIPART_CHUNK_MB, S3StorageService
+
+BUCKET = "fra-docs-test"
+UPLOADS = 4
+
+
+@pytest.fixture
+def storage():
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        service = S3StorageService(client=client, bucket=BUCKET, workers=UPLOADS)
+        yield service
+        service.shutdown()
+
+
+def test_multipart_uploads_overlap(storage):
+    # Every upload must have started its multipart upload before any may proceed:
+    # with uploads serialized on the event loop the barrier times out
+    started = threading.Barrier(UPLOADS, timeout=10)
+
+    def wait_for_other_uploads(**kwargs):
+        started.wait()  # Returning a value here would short-circuit the call
+
+    storage.client.meta.events.register("before-call.s3.CreateMultipartUpload", wait_for_other_uploads)
+    size = (S3_MULTIPART_CHUNK_MB + 1) * 1024 * 1024  # Two parts each
+    documents = {f"claims/{index}/form.pdf": bytes([index]) * size for index in range(UPLOADS)}
+
+    async def upload_all():
+        return await asyncio.gather(*(
+            storage.upload_fileobj(io.BytesIO(body), key, "application/pdf")
+            for key, body in documents.items()
+        ))
+
+    urls = asyncio.run(upload_all())
+
+    assert urls == [storage.object_url(key) for key in documents]
+    for key, body in documents.items():
+        stored = storage.client.get_object(Bucket=BUCKET, Key=key)
+        assert stored["ContentType"] == "application/pdf"
+        assert stored["Body"].read() == body
@@ -0,0 +1,45 @@
+from services.claims_service import Claim, SessionLocal
+from services.vector_tiles import TileCache, tile_cache
+
+
+def _claim(latitude: float, longitude: float) -> Claim:
+    return Claim(claimant_name="Claimant", district="Mayurbhanj", form_type="IFR", latitude=latitude, longitude=longitude)
+
+
+def test_savepoint_release_defers_tile_invalidation_to_outer_commit():
+    generation = tile_cache.generation
+    with SessionLocal() as db:
+        with db.begin_nested():
+            db.add(_claim(21.93, 86.73))
+        assert tile_cache.generation == generation
+        db.commit()
+    assert tile_cache.generation == generation + 1
+
+
+def test_savepoint_rollback_keeps_earlier_changes():
+    generation = tile_cache.generation
+    with SessionLocal() as db:
+        with db.begin_nested():
+            db.add(_claim(21.93, 86.73))
+        nested = db.begin_nested()
+        db.add(_claim(21.5, 86.1))
+        db.flush()
+        nested.rollback()
+        assert db.info.get("geometry_changes")
+        db.commit()
+    assert tile_cache.generation == generation + 1
+
+
+def test_invalidation_deletes_tiles_of_all_changed_bounds_off_the_calling_thread(tmp_path):
+    cache = TileCache(str(tmp_path))
+    near, far, untouched = (12, 3024, 1812), (12, 3003, 1797), (12, 10, 10)  # Bhubaneswar, Sambalpur, the Atlantic
+    for tile in (near, far, untouched):
+        cache.put(*tile, b"tile", cache.generation)
+
+    future = cache.invalidate([(20.29, 85.82, 20.30, 85.83), (21.46, 83.97, 21.47, 83.98)])
+    future.result(timeout=10)
+
+    assert cache.get(*near) is None
+    assert cache.get(*far) is None
+    assert cache.get(*untouched) == b"tile"
+    assert not cache.pending
@@ -0,0 +1,92 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+import main
+from services import webgis_service as webgis
+from services.claims_service import GISAsset, SessionLocal, claims_service
+from services.gee_cache import analysis_key
+
+BOUNDARY = {
+    "type": "Polygon",
+    "coordinates": [[[86.70, 21.90], [86.72, 21.90], [86.72, 21.92], [86.70, 21.92], [86.70, 21.90]]]
+}
+
+
+@pytest.fixture
+def quota_exhausted(monkeypatch):
+    """GEE rejects every request and there is no executor to retry it"""
+    def analyze(geojson_data, claim_id):
+        raise main.GEEQuotaError("Too many concurrent aggregations")
+
+    monkeypatch.setattr(main, "GEE_JOBS_AVAILABLE", False)
+    monkeypatch.setattr(main.webgis_service, "analyze_geojson_for_claim", analyze)
+
+
+def test_quota_rejection_without_executor_is_503(quota_exhausted):
+    claim_id = claims_service.create_claim({"claimant_name": "Claimant", "district": "Mayurbhanj", "form_type": "IFR"})["claim_id"]
+    response = TestClient(main.app).post(
+        f"/api/v1/webgis/analyze-for-claim/{claim_id}",
+        files={"file": ("boundary.geojson", json.dumps(BOUNDARY), "application/geo+json")}
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "60"
+    assert "quota" in response.json()["detail"]
+
+
+def _claims_with_boundaries(count: int):
+    claim_ids = []
+    for i in range(count):
+        claim_id = claims_service.create_claim({"claimant_name": f"Claimant {i}", "village_name": "Batch Village", "district": "Mayurbhanj", "form_type": "IFR"})["claim_id"]
+        boundary = {**BOUNDARY, "coordinates": [[[x + i, y] for x, y in BOUNDARY["coordinates"][0]]]}
+        claims_service.set_claim_geometry(claim_id, boundary)
+        claim_ids.append((claim_id, boundary))
+    return claim_ids
+
+
+@pytest.fixture
+def cached_gee(monkeypatch, tmp_path):
+    """GEE 'available' with every boundary already in the result cache - no Earth Engine calls"""
+    service = main.webgis_service
+    monkeypatch.setattr(service, "gee_available", True)
+    monkeypatch.setattr(service, "result_cache", webgis.GEEResultCache(str(tmp_path / "gee_cache.sqlite3")))
+
+    def cache(geometry):
+        key = analysis_key(geometry, webgis.CLASSIFIER_ASSET_ID, service.model_version, webgis.S2_START_DATE, webgis.S2_END_DATE, webgis.ANALYSIS_SCALE_METERS)
+        service.result_cache.put(key, webgis.CLASSIFIER_ASSET_ID, service.model_version, service._analysis_results([{"class": 0, "sum": 50000.0}], "tiles"))
+    return cache
+
+
+def test_rerunning_a_cached_batch_stores_each_analysis_once(cached_gee):
+    claims = _claims_with_boundaries(3)
+    for _, boundary in claims:
+        cached_gee(boundary)
+    claim_ids = [claim_id for claim_id, _ in claims]
+
+    first = main.webgis_service.analyze_claims_batch(claim_ids)
+    second = main.webgis_service.analyze_claims_batch(claim_ids)
+
+    assert first["claims_analyzed"] == second["claims_analyzed"] == 3
+    assert second["output_storage"]["already_stored"] == 3
+    with SessionLocal() as db:
+        counts = db.execute(
+            select(func.count()).select_from(GISAsset).where(GISAsset.claim_id.in_(claim_ids)).group_by(GISAsset.claim_id)
+        ).scalars().all()
+    assert counts == [1, 1, 1]
+
+
+def test_batch_over_the_cap_is_rejected(cached_gee, monkeypatch):
+    claims = _claims_with_boundaries(3)
+    for _, boundary in claims:
+        cached_gee(boundary)
+    claim_ids = [claim_id for claim_id, _ in claims]
+    monkeypatch.setattr(webgis, "GEE_BATCH_MAX_CLAIMS", 2)
+
+    response = TestClient(main.app).post("/api/v1/webgis/analyze-batch", json={"claim_ids": claim_ids})
+    assert response.status_code == 422
+    assert "more than 2 claims" in response.json()["detail"]
+
+    monkeypatch.setattr(webgis, "GEE_BATCH_MAX_CLAIMS", 3)
+    assert main.webgis_service.analyze_claims_batch(claim_ids)["claims_selected"] == 3
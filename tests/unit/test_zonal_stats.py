@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from affine import Affine
+
+from services.zonal_stats import class_counts_by_row, row_pixel_areas, row_tiles, zonal_class_areas
+
+WGS84_SURFACE_M2 = 5.10066e14
+CLASS_COUNT = 4
+
+
+def _masked_raster(shape=(301, 157), seed=0):
+    rng = np.random.default_rng(seed)
+    classes = rng.integers(-1, CLASS_COUNT + 2, shape).astype(np.int16)  # Includes nodata and unmapped values
+    mask = rng.random(shape) < 0.7
+    return classes, mask
+
+
+def test_whole_globe_sums_to_the_wgs84_surface():
+    transform = Affine(1.0, 0.0, -180.0, 0.0, -1.0, 90.0)
+    row_areas = row_pixel_areas(transform, 180, geographic=True)
+    classes = np.zeros((180, 360), dtype=np.int16)
+
+    areas = zonal_class_areas(row_tiles(classes, None, tile_rows=64), row_areas, 1)
+
+    assert areas[0] == pytest.approx(WGS84_SURFACE_M2, rel=1e-5)
+    assert np.allclose(row_areas, row_areas[::-1])  # Symmetric about the equator
+
+
+def test_projected_grid_uses_the_cell_size():
+    assert np.array_equal(row_pixel_areas(Affine(10.0, 0.0, 0.0, 0.0, -10.0, 0.0), 3, geographic=False), [100.0, 100.0, 100.0])
+
+
+@pytest.mark.parametrize("tile_rows", [1, 7, 64, 512])
+def test_tiled_bincount_matches_per_pixel_areas(tile_rows):
+    classes, mask = _masked_raster()
+    row_areas = row_pixel_areas(Affine(0.0001, 0.0, 85.0, 0.0, -0.0001, 20.5), classes.shape[0], geographic=True)
+
+    valid = mask & (classes >= 0) & (classes < CLASS_COUNT)
+    pixel_areas = np.broadcast_to(row_areas[:, None], classes.shape)
+    expected = np.bincount(classes[valid], weights=pixel_areas[valid], minlength=CLASS_COUNT)
+
+    areas = zonal_class_areas(row_tiles(classes, mask, tile_rows), row_areas, CLASS_COUNT)
+    assert np.allclose(areas, expected, rtol=1e-12)
+
+
+def test_counts_by_row_skip_masked_and_out_of_range_classes():
+    classes = np.array([[0, 1, -1, 4], [2, 2, 3, 0]], dtype=np.int16)
+    mask = np.array([[True, False, True, True], [True, True, True, False]])
+    assert class_counts_by_row(classes, mask, CLASS_COUNT).tolist() == [[1, 0, 0, 0], [0, 0, 2, 1]]